@@ -0,0 +1 @@
+"""Benchmarks of the statusio package, run against a local stand-in server."""
@@ -0,0 +1,254 @@
+#!/usr/bin/env python
+
+"""Benchmark suite with JSON baselines and regression gating
+
+Run everything and print the results:
+
+    python -m benchmarks.run
+
+Save a baseline, then compare a later run against it, failing (exit status
+1) if any result got worse by more than the threshold:
+
+    python -m benchmarks.run --save baseline.json
+    python -m benchmarks.run --compare baseline.json --threshold 0.2
+
+Baselines depend on the machine; compare runs made on the same one.
+"""
+from __future__ import division
+from __future__ import print_function
+
+import argparse
+import gc
+import io
+import platform
+import subprocess
+import sys
+import time
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+import statusio
+from statusio import json
+from benchmarks.server import serve_in_process
+from benchmarks.threads import throughput
+
+STATUSPAGE_ID = '568d8a3e3cada8c2490000dd'
+
+# name -> (function, unit, whether lower is better), filled by @benchmark.
+BENCHMARKS = []
+
+
+def benchmark(unit, lower_is_better=True):
+    def register(func):
+        BENCHMARKS.append((func.__name__, func, unit, lower_is_better))
+        return func
+    return register
+
+
+def best_of(func, repeat=5, number=1):
+    """Return the fastest of repeat runs of func() number times, per call."""
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.time()
+        for _ in range(number):
+            func()
+        times.append((time.time() - started) / number)
+    return min(times)
+
+
+def incident_list(count=2000):
+    incident = {
+        '_id': '%024x', 'name': 'Database connectivity issues',
+        'datetime_open': '2030-01-01T00:00:00.000Z',
+        'components': [{'_id': '568d8a3e3cada8c2490000ed',
+                        'name': 'Website'}],
+        'containers': [{'_id': '568d8a3e3cada8c2490000ec',
+                        'name': 'US East'}],
+        'messages': [{'details': 'We are investigating. ' * 10,
+                      'state': 100, 'status': 500}] * 3,
+    }
+    return {'status': {'error': 'no', 'message': 'OK'}, 'result': {
+        'active_incidents': [dict(incident, _id='%024x' % i)
+                             for i in range(count)],
+        'resolved_incidents': []}}
+
+
+def subscriber_list(count=20000):
+    return {'status': {'error': 'no', 'message': 'OK'}, 'result': {
+        'email': [{'_id': '%024x' % i, 'address': 'user%d@example.com' % i,
+                   'granular': []} for i in range(count)],
+        'sms': [], 'webhook': []}}
+
+
+def stub_api(payload=None):
+    stub = statusio.StubTransport()
+    stub.Add('*', '', payload or {'status': {'error': 'no'}, 'result': {}})
+    return statusio.Api('id', 'key', transport=stub)
+
+
+@benchmark('us')
+def call_overhead():
+    """Client overhead of one call, with an in-memory transport."""
+    api = stub_api()
+    return best_of(lambda: api.StatusSummary(STATUSPAGE_ID),
+                   number=2000) * 1e6
+
+
+@benchmark('us')
+def call_overhead_post():
+    api = stub_api()
+    return best_of(lambda: api.ComponentStatusUpdate(
+        STATUSPAGE_ID, 'component', 'container', 'details', 300),
+        number=2000) * 1e6
+
+
+def _LocalCall(transport):
+    process, url = serve_in_process()
+    try:
+        api = statusio.Api('id', 'key', base_url=url, transport=transport,
+                           warmup=1)
+        return best_of(lambda: api.StatusSummary(STATUSPAGE_ID),
+                       number=200) * 1e6
+    finally:
+        process.terminate()
+
+
+@benchmark('us')
+def local_call_requests():
+    """One call to the local stand-in server with each HTTP transport."""
+    return _LocalCall('requests')
+
+
+@benchmark('us')
+def local_call_urllib3():
+    return _LocalCall('urllib3')
+
+
+@benchmark('req/s', lower_is_better=False)
+def throughput_16_threads():
+    """Requests per second of one Api shared by 16 threads."""
+    process, url = serve_in_process(latency=0.005)
+    try:
+        return max(throughput(url, 'urllib3', 16, 1600) for _ in range(3))
+    finally:
+        process.terminate()
+
+
+@benchmark('ms')
+def decode_incident_list():
+    """Decoding a large IncidentList response through the Api."""
+    api = stub_api(incident_list())
+    return best_of(lambda: api.IncidentList(STATUSPAGE_ID)) * 1e3
+
+
+@benchmark('ms')
+def decode_subscriber_list():
+    api = stub_api(subscriber_list())
+    return best_of(lambda: api.SubscriberList(STATUSPAGE_ID)) * 1e3
+
+
+@benchmark('ms')
+def encode_incident_list():
+    data = incident_list()
+    return best_of(lambda: json.dumps(data)) * 1e3
+
+
+@benchmark('MiB')
+def memory_peak_subscriber_list():
+    """Peak memory allocated while fetching a large SubscriberList."""
+    if tracemalloc is None:
+        return None
+    api = stub_api(subscriber_list())
+    gc.collect()
+    tracemalloc.start()
+    try:
+        api.SubscriberList(STATUSPAGE_ID)
+        return tracemalloc.get_traced_memory()[1] / 2 ** 20
+    finally:
+        tracemalloc.stop()
+
+
+@benchmark('ms')
+def import_time():
+    """Time to import statusio in a fresh interpreter."""
+    def run():
+        subprocess.check_call([sys.executable, '-c', 'import statusio'])
+    baseline = best_of(lambda: subprocess.check_call(
+        [sys.executable, '-c', 'pass']))
+    return (best_of(run) - baseline) * 1e3
+
+
+def run(names=None):
+    results = {}
+    for name, func, unit, lower_is_better in BENCHMARKS:
+        if names and name not in names:
+            continue
+        value = func()
+        if value is None:
+            continue
+        results[name] = {'value': round(value, 3), 'unit': unit,
+                         'lower_is_better': lower_is_better}
+        print('%-30s %12.3f %s' % (name, value, unit))
+        sys.stdout.flush()
+    return results
+
+
+def compare(baseline, results, threshold):
+    """Print the change of every result; return the names that regressed."""
+    regressed = []
+    print()
+    print('%-30s %12s %12s %8s' % ('benchmark', 'baseline', 'current',
+                                   'change'))
+    for name in sorted(results):
+        if name not in baseline:
+            continue
+        old = baseline[name]['value']
+        new = results[name]['value']
+        change = (new - old) / old if old else 0.0
+        worse = change if results[name]['lower_is_better'] else -change
+        flag = ''
+        if worse > threshold:
+            regressed.append(name)
+            flag = '  REGRESSION'
+        print('%-30s %12.3f %12.3f %+7.1f%%%s' % (name, old, new,
+                                                  change * 100, flag))
+    return regressed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('names', nargs='*', help='benchmarks to run')
+    parser.add_argument('--save', metavar='FILE',
+                        help='write the results as a JSON baseline')
+    parser.add_argument('--compare', metavar='FILE',
+                        help='compare against a JSON baseline')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='relative change counted as a regression')
+    args = parser.parse_args(argv)
+
+    results = run(args.names)
+    if args.save:
+        with io.open(args.save, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'statusio': statusio.__version__,
+                'results': results,
+            }, indent=2, sort_keys=True))
+    if args.compare:
+        with io.open(args.compare, encoding='utf-8') as f:
+            baseline = json.loads(f.read())['results']
+        regressed = compare(baseline, results, args.threshold)
+        if regressed:
+            print('%d regression(s) past %d%%: %s' % (
+                len(regressed), args.threshold * 100, ', '.join(regressed)))
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
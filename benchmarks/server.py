@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+
+"""A local stand-in for the Status.io API used by the benchmarks
+
+Every request gets a successful Status.io style JSON response. The cost of
+setting up a connection (DNS, TCP and TLS on the real API) is simulated by
+delaying the first response on each new connection by ``connect_delay``.
+"""
+from __future__ import print_function
+
+import multiprocessing
+import socket
+import threading
+import time
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+
+from statusio import json
+
+_BODY = json.dumps({'status': {'error': 'no', 'message': 'OK'},
+                    'result': {}}).encode('utf-8')
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    wbufsize = -1
+
+    def setup(self):
+        BaseHTTPRequestHandler.setup(self)
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.timeout = self.server.idle_timeout
+        self.connection.settimeout(self.timeout)
+        self._fresh = True
+        with self.server.lock:
+            self.server.connections += 1
+
+    def _Respond(self, body=True):
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            self.rfile.read(length)
+        delay = self.server.latency
+        if self._fresh:
+            delay += self.server.connect_delay
+            self._fresh = False
+        if delay:
+            time.sleep(delay)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(_BODY)))
+        self.end_headers()
+        if body:
+            self.wfile.write(_BODY)
+        with self.server.lock:
+            self.server.requests += 1
+
+    def do_GET(self):
+        self._Respond()
+
+    do_POST = do_PATCH = do_DELETE = do_GET
+
+    def do_HEAD(self):
+        self._Respond(body=False)
+
+    def log_message(self, *args):
+        pass
+
+
+class StandInServer(ThreadingMixIn, HTTPServer):
+    """A threaded HTTP/1.1 server answering like the Status.io API.
+
+    Example usage:
+
+        >>> server = StandInServer(connect_delay=0.05)
+        >>> server.Start()
+        >>> api = statusio.Api('id', 'key', base_url=server.url)
+    """
+
+    daemon_threads = True
+
+    def __init__(self, port=0, latency=0.0, connect_delay=0.0,
+                 idle_timeout=None):
+        """Instantiate a new StandInServer.
+
+        Args:
+          port:
+            Port to listen on, 0 for any free one. [Optional]
+          latency:
+            Seconds added to every response. [Optional]
+          connect_delay:
+            Seconds added to the first response of a connection. [Optional]
+          idle_timeout:
+            Seconds after which idle connections are closed. [Optional]
+        """
+        HTTPServer.__init__(self, ('127.0.0.1', port), _Handler)
+        self.latency = latency
+        self.connect_delay = connect_delay
+        self.idle_timeout = idle_timeout
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.requests = 0
+        self._thread = None
+
+    @property
+    def url(self):
+        return 'http://127.0.0.1:%d' % self.server_address[1]
+
+    def Start(self):
+        self._thread = threading.Thread(target=self.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        return self.url
+
+    def Stop(self):
+        self.shutdown()
+        self.server_close()
+        self._thread.join()
+
+
+def _Serve(conn, kwargs):
+    server = StandInServer(**kwargs)
+    conn.send(server.url)
+    server.serve_forever()
+
+
+def serve_in_process(**kwargs):
+    """Run a StandInServer in a child process, off the benchmark's GIL.
+
+       Keyword arguments are as for StandInServer.
+
+       Returns:
+         The (process, url) of the server. Terminate the process when done.
+    """
+    parent, child = multiprocessing.Pipe()
+    process = multiprocessing.Process(target=_Serve, args=(child, kwargs))
+    process.daemon = True
+    process.start()
+    return process, parent.recv()
+
+
+if __name__ == '__main__':
+    server = StandInServer(port=8089)
+    print('Serving on %s' % server.url)
+    server.serve_forever()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+
+"""Throughput of one shared Api as the number of threads grows
+
+Run with:
+
+    python -m benchmarks.threads [--latency 0.005] [--requests 2000]
+"""
+from __future__ import division
+from __future__ import print_function
+
+import argparse
+import threading
+import time
+
+import statusio
+from benchmarks.server import serve_in_process
+
+STATUSPAGE_ID = '568d8a3e3cada8c2490000dd'
+THREADS = (1, 2, 4, 8, 16, 32, 64)
+
+
+def throughput(url, transport, threads, requests):
+    api = statusio.Api('id', 'key', base_url=url, transport=transport,
+                       pool_size=threads, warmup=threads)
+    per_thread = requests // threads
+    errors = []
+
+    def work():
+        for _ in range(per_thread):
+            if api.StatusSummary(STATUSPAGE_ID)['status']['error'] != 'no':
+                errors.append(1)
+
+    workers = [threading.Thread(target=work) for _ in range(threads)]
+    started = time.time()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.time() - started
+    api.transport.Close()
+    if errors:
+        raise RuntimeError('%d requests failed' % len(errors))
+    return per_thread * threads / elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--latency', type=float, default=0.005,
+                        help='simulated server latency in seconds')
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    server, url = serve_in_process(latency=args.latency)
+    try:
+        print('%-8s %12s %12s' % ('threads', 'requests/s', 'urllib3/s'))
+        for threads in THREADS:
+            print('%-8d %12.0f %12.0f' % (
+                threads,
+                throughput(url, 'requests', threads, args.requests),
+                throughput(url, 'urllib3', threads, args.requests)))
+    finally:
+        server.terminate()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+
+"""First call latency with and without connection warm-up
+
+Run with:
+
+    python -m benchmarks.warmup [--connect-delay 0.05] [--runs 20]
+"""
+from __future__ import division
+from __future__ import print_function
+
+import argparse
+import time
+
+import statusio
+from benchmarks.server import StandInServer
+
+STATUSPAGE_ID = '568d8a3e3cada8c2490000dd'
+
+
+def first_call(url, transport, warmup):
+    api = statusio.Api('id', 'key', base_url=url, transport=transport,
+                       warmup=warmup)
+    started = time.time()
+    api.IncidentCreate(STATUSPAGE_ID, [], 'Outage', 'Details', 500, 100)
+    elapsed = time.time() - started
+    api.transport.Close()
+    return elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--connect-delay', type=float, default=0.05,
+                        help='simulated connection setup in seconds')
+    parser.add_argument('--runs', type=int, default=20)
+    args = parser.parse_args(argv)
+
+    server = StandInServer(connect_delay=args.connect_delay)
+    server.Start()
+    try:
+        print('%-10s %-6s %12s' % ('transport', 'warmup', 'first call'))
+        for transport in ('requests', 'urllib3'):
+            for warmup in (0, 1):
+                times = sorted(first_call(server.url, transport, warmup)
+                               for _ in range(args.runs))
+                print('%-10s %-6s %10.2fms' % (
+                    transport, 'yes' if warmup else 'no',
+                    times[len(times) // 2] * 1000))
+    finally:
+        server.Stop()
+
+
+if __name__ == '__main__':
+    main()
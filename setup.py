@@ -22,8 +22,11 @@ setup(
     keywords='status.io api statusio',
     description='A Python wrapper around the Status.io API',
     long_description=(read('README.rst')),
-    packages=find_packages(exclude=['tests*']),
-    install_requires=['future', 'requests'],
+    packages=find_packages(exclude=['tests*', 'benchmarks*']),
+    install_requires=['future', 'requests', 'futures; python_version < "3"'],
+    entry_points={
+        'console_scripts': ['statusio = statusio.cli:main'],
+    },
     classifiers=[
         'Development Status :: 5 - Production/Stable',
         'Intended Audience :: Developers',
@@ -9,3 +9,25 @@ __version__ = '1.2'
 import json                                 # noqa
 
 from .api import Api                        # noqa
+from .bulk import BulkReport, BulkIncidents, MaintenanceScheduler  # noqa
+from .concurrency import AdaptiveLimiter    # noqa
+from .components import ComponentIndex      # noqa
+from .errors import StatusioError           # noqa
+from .hub import Hub                        # noqa
+from .httpcache import HttpCache            # noqa
+from .maintenance import MaintenanceIndex   # noqa
+from .messages import MessageCache          # noqa
+from .metrics import MetricBackfill         # noqa
+from .mirror import Mirror                  # noqa
+from .pool import ClientPool                # noqa
+from .poller import Poller                  # noqa
+from .ratelimit import RateLimiter, SharedRateLimiter  # noqa
+from .response import LazyResponse          # noqa
+from .scheduler import RequestScheduler     # noqa
+from .stats import ApiStats                 # noqa
+from .transport import (Transport, RequestsTransport,  # noqa
+                        Urllib3Transport, StubTransport,
+                        RecordingTransport, ReplayTransport)
+from .state import StatusCache, StatusEvent  # noqa
+from .updater import ComponentStatusUpdater  # noqa
+from .webhook import WebhookReceiver        # noqa
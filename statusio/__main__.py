@@ -0,0 +1,9 @@
+#!/usr/bin/env python
+
+"""Allow running the command line interface with python -m statusio"""
+
+import sys
+
+from statusio.cli import main
+
+sys.exit(main())
@@ -5,14 +5,16 @@ from __future__ import division
 from __future__ import print_function
 
 import sys
+import copy
+import functools
 import gzip
+import threading
 import time
 import types
 import base64
 import re
 import datetime
 from calendar import timegm
-import requests
 import io
 
 from past.utils import old_div
@@ -29,6 +31,49 @@ except ImportError:
     from urllib import __version__ as urllib_version
 
 from statusio import (__version__, json)
+from statusio.components import ComponentIndex
+from statusio.errors import TransportError
+from statusio.httpcache import HttpCache
+from statusio.response import LazyResponse
+from statusio.stats import ApiStats
+from statusio.transport import make_transport
+from statusio.validation import validate
+
+_RESPONSE_MODES = ('json', 'raw', 'lazy')
+
+# Default of _SendRequest(cached=...): look the request up in http_cache.
+_LOOKUP = object()
+
+
+# (verb, path prefix, endpoint name) used to identify requests, in matching
+# order. The statuspage ID follows the prefix for GET and DELETE requests.
+_ENDPOINTS = (
+    ('GET', 'component/list/', 'ComponentList'),
+    ('POST', 'component/status/update', 'ComponentStatusUpdate'),
+    ('GET', 'incident/list/', 'IncidentList'),
+    ('GET', 'incidents/', 'IncidentListByID'),
+    ('GET', 'incident/message/', 'IncidentMessage'),
+    ('GET', 'incident/', 'IncidentSingle'),
+    ('POST', 'incident/create', 'IncidentCreate'),
+    ('POST', 'incident/update', 'IncidentUpdate'),
+    ('POST', 'incident/resolve', 'IncidentResolve'),
+    ('POST', 'incident/delete', 'IncidentDelete'),
+    ('GET', 'maintenance/list/', 'MaintenanceList'),
+    ('GET', 'maintenances/', 'MaintenanceListByID'),
+    ('GET', 'maintenance/message/', 'MaintenanceMessage'),
+    ('GET', 'maintenance/', 'MaintenanceSingle'),
+    ('POST', 'maintenance/schedule', 'MaintenanceSchedule'),
+    ('POST', 'maintenance/start', 'MaintenanceStart'),
+    ('POST', 'maintenance/update', 'MaintenanceUpdate'),
+    ('POST', 'maintenance/finish', 'MaintenanceFinish'),
+    ('POST', 'maintenance/delete', 'MaintenanceDelete'),
+    ('POST', 'metric/update', 'MetricUpdate'),
+    ('GET', 'status/summary/', 'StatusSummary'),
+    ('GET', 'subscriber/list/', 'SubscriberList'),
+    ('POST', 'subscriber/add', 'SubscriberAdd'),
+    ('PATCH', 'subscriber/update', 'SubscriberUpdate'),
+    ('DELETE', 'subscriber/remove/', 'SubscriberRemove'),
+)
 
 
 class Api(object):
@@ -70,13 +115,28 @@ class Api(object):
         >>> api.SubscriberAdd(statuspage_id, method, address, silent='1', granular='')
         >>> api.SubscriberUpdate(statuspage_id, subscriber_id, address, granular='')
         >>> api.SubscriberRemove(statuspage_id, subscriber_id)
+
+      An Api instance is safe to share between threads. Give it a pool_size
+      of at least the number of threads so none waits for a connection.
     """
 
     def __init__(self,
                  api_id,
                  api_key,
                  version=2,
-                 base_url='https://api.status.io'
+                 base_url='https://api.status.io',
+                 pool_size=10,
+                 rate_limiter=None,
+                 scheduler=None,
+                 response_mode='json',
+                 transport=None,
+                 concurrency_limiter=None,
+                 warmup=0,
+                 keepalive=None,
+                 stats=None,
+                 validate=True,
+                 resolve_names=False,
+                 http_cache=None
                  ):
         """Instantiate a new statusio.Api object.
 
@@ -89,10 +149,75 @@ class Api(object):
             API version number. [Optional]
           base_url:
             API base URL. [Optional]
+          pool_size:
+            Number of connections kept open for reuse. [Optional]
+          rate_limiter:
+            A statusio.RateLimiter throttling requests. [Optional]
+          scheduler:
+            A statusio.RequestScheduler running requests by priority, e.g.
+            incident updates before metric updates. [Optional]
+          response_mode:
+            What the methods return: 'json' for the decoded JSON object,
+            'raw' for the undecoded response body as bytes, or 'lazy' for a
+            statusio.LazyResponse decoded on first access. [Optional]
+          transport:
+            A statusio.Transport sending the requests, or the name of a
+            built-in one: 'requests' (default, a pooled requests session),
+            'urllib3' (a leaner urllib3 pool) or 'stub' (in memory).
+            [Optional]
+          concurrency_limiter:
+            A statusio.AdaptiveLimiter bounding the requests in flight
+            across threads, adapting to latency and 429/5xx responses.
+            [Optional]
+          warmup:
+            Number of connections to open right away, see Warmup().
+            [Optional]
+          keepalive:
+            Seconds between keep-alive probes, see StartKeepalive().
+            [Optional]
+          stats:
+            A statusio.ApiStats collecting request counts and latencies,
+            e.g. one shared by several Api instances. Defaults to a new one;
+            False disables it. [Optional]
+          validate:
+            Check arguments locally and raise statusio.errors.ValidationError
+            instead of sending a request the API would reject. [Optional]
+          resolve_names:
+            Accept component and container names wherever IDs are taken,
+            looking them up in a statusio.ComponentIndex kept in
+            ``components``. [Optional]
+          http_cache:
+            A statusio.HttpCache keeping GET responses on disk and
+            revalidating them, or the directory to keep one in. [Optional]
         """
         self._api_id = api_id
         self._api_key = api_key
         self.base_url = '%s/v%d' % (base_url, version)
+        self._transport = make_transport(transport or 'requests', pool_size)
+        self._rate_limiter = rate_limiter
+        self._scheduler = scheduler
+        self._concurrency_limiter = concurrency_limiter
+        if stats is None:
+            stats = ApiStats()
+        self.stats = stats or None
+        self.validate = validate
+        self.components = None
+        if isinstance(http_cache, (str, type(u''))):
+            http_cache = HttpCache(http_cache)
+        self.http_cache = http_cache
+        if response_mode not in _RESPONSE_MODES:
+            raise ValueError('Unknown response_mode: %r' % (response_mode,))
+        self.response_mode = response_mode
+        self._keepalive = None
+        self._keepalive_lock = threading.Lock()
+        if resolve_names:
+            # The index decodes ComponentList itself, whatever this Api's
+            # response_mode; its copy leaves names unresolved.
+            self.components = ComponentIndex(self.WithResponseMode('json'))
+        if warmup:
+            self.Warmup(warmup)
+        if keepalive:
+            self.StartKeepalive(keepalive, max(warmup, 1))
 
     def ComponentList(self, statuspage_id):
         """List all components.
@@ -106,8 +231,7 @@ class Api(object):
         """
         url = '%s/component/list/%s' % (self.base_url, statuspage_id)
         resp = self._RequestUrl(url, 'GET')
-        data = json.loads(resp.content.decode('utf-8'))
-        return data
+        return self._ParseResponse(resp)
 
     def ComponentStatusUpdate(self,
                               statuspage_id,
@@ -121,9 +245,9 @@ class Api(object):
              statuspage_id:
                Status page ID
              component:
-               ID of affected component
+               ID of affected component, or its name with resolve_names
              container:
-               ID of affected container
+               ID of affected container, or its name with resolve_names
              details:
                A brief message describing this update
              current_status:
@@ -140,8 +264,7 @@ class Api(object):
             'details': details,
             'current_status': current_status
         })
-        data = json.loads(resp.content.decode('utf-8'))
-        return data
+        return self._ParseResponse(resp)
 
     def IncidentList(self, statuspage_id):
         """List all active and resolved incidents.
@@ -155,8 +278,7 @@ class Api(object):
         """
         url = '%s/incident/list/%s' % (self.base_url, statuspage_id)
         resp = self._RequestUrl(url, 'GET')
-        data = json.loads(resp.content.decode('utf-8'))
-        return data
+        return self._ParseResponse(resp)
 
     def IncidentListByID(self, statuspage_id):
         """List all active and resolved incidents by ID.
@@ -170,8 +292,7 @@ class Api(object):
         """
         url = '%s/incidents/%s' % (self.base_url, statuspage_id)
         resp = self._RequestUrl(url, 'GET')
-        data = json.loads(resp.content.decode('utf-8'))
-        return data
+        return self._ParseResponse(resp)
 
     def IncidentMessage(self,
                         statuspage_id,
@@ -190,8 +311,7 @@ class Api(object):
         url = '%s/incident/message/%s/%s' % (self.base_url,
                                              statuspage_id, message_id)
         resp = self._RequestUrl(url, 'GET')
-        data = json.loads(resp.content.decode('utf-8'))
-        return data
+        return self._ParseResponse(resp)
 
     def IncidentSingle(self,
                         statuspage_id,
@@ -210,8 +330,7 @@ class Api(object):
         url = '%s/incident/%s/%s' % (self.base_url,
                                              statuspage_id, incident_id)
         resp = self._RequestUrl(url, 'GET')
-        data = json.loads(resp.content.decode('utf-8'))
-        return data
+        return self._ParseResponse(resp)
 
     def IncidentCreate(self,
                        statuspage_id,
@@ -288,8 +407,7 @@ class Api(object):
             'all_infrastructure_affected': all_infrastructure_affected,
             'message_subject': message_subject
         })
-        data = json.loads(resp.content.decode('utf-8'))
-        return data
+        return self._ParseResponse(resp)
 
     def IncidentUpdate(self,
                        statuspage_id,
@@ -358,8 +476,7 @@ class Api(object):
             'slack': slack,
             'message_subject': message_subject
         })
-        data = json.loads(resp.content.decode('utf-8'))
-        return data
+        return self._ParseResponse(resp)
 
     def IncidentResolve(self,
                         statuspage_id,
@@ -428,8 +545,7 @@ class Api(object):
             'slack': slack,
             'message_subject': message_subject
         })
-        data = json.loads(resp.content.decode('utf-8'))
-        return data
+        return self._ParseResponse(resp)
 
     def IncidentDelete(self,
                        statuspage_id,
@@ -450,8 +566,7 @@ class Api(object):
             'statuspage_id': statuspage_id,
             'incident_id': incident_id
         })
-        data = json.loads(resp.content.decode('utf-8'))
-        return data
+        return self._ParseResponse(resp)
 
     def MaintenanceList(self, statuspage_id):
         """List all active, resolved and upcoming maintenances
@@ -465,8 +580,7 @@ class Api(object):
         """
         url = '%s/maintenance/list/%s' % (self.base_url, statuspage_id)
         resp = self._RequestUrl(url, 'GET')
-        data = json.loads(resp.content.decode('utf-8'))
-        return data
+        return self._ParseResponse(resp)
 
     def MaintenanceListByID(self, statuspage_id):
         """List all active, resolved and upcoming maintenances by ID
@@ -480,8 +594,7 @@ class Api(object):
         """
         url = '%s/maintenances/%s' % (self.base_url, statuspage_id)
         resp = self._RequestUrl(url, 'GET')
-        data = json.loads(resp.content.decode('utf-8'))
-        return data
+        return self._ParseResponse(resp)
 
     def MaintenanceMessage(self,
                            statuspage_id,
@@ -500,8 +613,7 @@ class Api(object):
         url = '%s/maintenance/message/%s/%s' % (
             self.base_url, statuspage_id, message_id)
         resp = self._RequestUrl(url, 'GET')
-        data = json.loads(resp.content.decode('utf-8'))
-        return data
+        return self._ParseResponse(resp)
 
     def MaintenanceSingle(self,
                            statuspage_id,
@@ -520,8 +632,7 @@ class Api(object):
         url = '%s/maintenance/%s/%s' % (
             self.base_url, statuspage_id, maintenance_id)
         resp = self._RequestUrl(url, 'GET')
-        data = json.loads(resp.content.decode('utf-8'))
-        return data
+        return self._ParseResponse(resp)
 
     def MaintenanceSchedule(self,
                             statuspage_id,
@@ -594,8 +705,7 @@ class Api(object):
             'maintenance_notify_72_hr': maintenance_notify_72_hr,
             'message_subject': message_subject
         })
-        data = json.loads(resp.content.decode('utf-8'))
-        return data
+        return self._ParseResponse(resp)
 
     def MaintenanceStart(self,
                          statuspage_id,
@@ -656,8 +766,7 @@ class Api(object):
             'slack': slack,
             'message_subject': message_subject
         })
-        data = json.loads(resp.content.decode('utf-8'))
-        return data
+        return self._ParseResponse(resp)
 
     def MaintenanceUpdate(self,
                           statuspage_id,
@@ -718,8 +827,7 @@ class Api(object):
             'slack': slack,
             'message_subject': message_subject
         })
-        data = json.loads(resp.content.decode('utf-8'))
-        return data
+        return self._ParseResponse(resp)
 
     def MaintenanceFinish(self,
                           statuspage_id,
@@ -780,8 +888,7 @@ class Api(object):
             'slack': slack,
             'message_subject': message_subject
         })
-        data = json.loads(resp.content.decode('utf-8'))
-        return data
+        return self._ParseResponse(resp)
 
     def MaintenanceDelete(self,
                           statuspage_id,
@@ -802,8 +909,7 @@ class Api(object):
             'statuspage_id': statuspage_id,
             'maintenance_id': maintenance_id
         })
-        data = json.loads(resp.content.decode('utf-8'))
-        return data
+        return self._ParseResponse(resp)
 
     def MetricUpdate(self,
                      statuspage_id,
@@ -872,8 +978,7 @@ class Api(object):
             'month_dates': month_dates,
             'month_values': month_values
         })
-        data = json.loads(resp.content.decode('utf-8'))
-        return data
+        return self._ParseResponse(resp)
 
     def StatusSummary(self, statuspage_id):
         """Show the summary status for all components and containers
@@ -887,8 +992,7 @@ class Api(object):
         """
         url = '%s/status/summary/%s' % (self.base_url, statuspage_id)
         resp = self._RequestUrl(url, 'GET')
-        data = json.loads(resp.content.decode('utf-8'))
-        return data
+        return self._ParseResponse(resp)
 
     def SubscriberList(self, statuspage_id):
         """List all subscribers
@@ -902,8 +1006,7 @@ class Api(object):
         """
         url = '%s/subscriber/list/%s' % (self.base_url, statuspage_id)
         resp = self._RequestUrl(url, 'GET')
-        data = json.loads(resp.content.decode('utf-8'))
-        return data
+        return self._ParseResponse(resp)
 
     def SubscriberAdd(self,
                       statuspage_id,
@@ -936,8 +1039,7 @@ class Api(object):
             'silent': silent,
             'granular': granular,
         })
-        data = json.loads(resp.content.decode('utf-8'))
-        return data
+        return self._ParseResponse(resp)
 
     def SubscriberUpdate(self,
                          statuspage_id,
@@ -966,8 +1068,7 @@ class Api(object):
             'address': address,
             'granular': granular,
         })
-        data = json.loads(resp.content.decode('utf-8'))
-        return data
+        return self._ParseResponse(resp)
 
     def SubscriberRemove(self,
                          statuspage_id,
@@ -986,8 +1087,7 @@ class Api(object):
         url = '%s/subscriber/remove/%s/%s' % (
             self.base_url, statuspage_id, subscriber_id)
         resp = self._RequestUrl(url, 'DELETE')
-        data = json.loads(resp.content.decode('utf-8'))
-        return data
+        return self._ParseResponse(resp)
 
     def _BuildUrl(self, url, path_elements=None, extra_params=None):
         # Break url into constituent parts
@@ -1058,8 +1158,105 @@ class Api(object):
             return urlencode(dict([(k, self._Encode(v))
                                    for k, v in list(post_data.items())]))
 
+    def Warmup(self, connections=1):
+        """Connect to the API ahead of the first request.
+
+           DNS, TCP and TLS setup then happen here rather than on the first,
+           often urgent, call.
+
+           Args:
+             connections:
+               Number of connections to open, at most pool_size. [Optional]
+
+           Returns:
+             The number of connections opened.
+        """
+        return self._transport.Warmup(self.base_url, connections)
+
+    def StartKeepalive(self, interval=30, connections=1):
+        """Probe the API in a background thread to keep connections open.
+
+           Servers and proxies close idle connections; a probe every
+           interval seconds, shorter than their idle timeout, keeps the
+           warm connections in the pool.
+
+           Args:
+             interval:
+               Seconds between probes. [Optional]
+             connections:
+               Number of connections to keep open. [Optional]
+        """
+        self.StopKeepalive()
+        stop = threading.Event()
+
+        def probe():
+            while not stop.wait(interval):
+                self.Warmup(connections)
+
+        thread = threading.Thread(target=probe, name='statusio-keepalive')
+        thread.daemon = True
+        with self._keepalive_lock:
+            thread.start()
+            self._keepalive = (stop, thread)
+
+    def StopKeepalive(self):
+        """Stop the keep-alive probes."""
+        with self._keepalive_lock:
+            keepalive, self._keepalive = self._keepalive, None
+        if keepalive is not None:
+            stop, thread = keepalive
+            stop.set()
+            thread.join()
+
+    @property
+    def transport(self):
+        """The statusio.Transport sending requests."""
+        return self._transport
+
+    def WithResponseMode(self, response_mode):
+        """Return a copy of this Api returning responses in another mode.
+
+           The copy shares connections, rate limiter and scheduler with this
+           Api, so it is cheap to create per call site:
+
+             >>> body = api.WithResponseMode('raw').IncidentList(statuspage_id)
+
+           Args:
+             response_mode:
+               One of 'json', 'raw' or 'lazy'.
+
+           Returns:
+             A statusio.Api instance.
+        """
+        if response_mode not in _RESPONSE_MODES:
+            raise ValueError('Unknown response_mode: %r' % (response_mode,))
+        api = copy.copy(self)
+        api.response_mode = response_mode
+        return api
+
+    def _ParseResponse(self, resp):
+        """Turn a response into the return value for the response mode."""
+        if self.response_mode == 'raw':
+            return resp.content
+        if self.response_mode == 'lazy':
+            return LazyResponse(resp.content)
+        return json.loads(resp.content.decode('utf-8'))
+
+    def _Endpoint(self, url, verb):
+        """Identify the endpoint of a request.
+
+           Returns:
+             A (endpoint name, statuspage ID) tuple. Either may be None.
+        """
+        path = url[len(self.base_url) + 1:]
+        for endpoint_verb, prefix, name in _ENDPOINTS:
+            if endpoint_verb == verb and path.startswith(prefix):
+                statuspage_id = path[len(prefix):].split('/')[0] or None
+                return name, statuspage_id
+        return None, None
+
     def _RequestUrl(self, url, verb, data=None):
-        """Request a url.
+        """Request a url, honoring the rate limiter and scheduler.
 
            Args:
              url:
@@ -1072,56 +1269,111 @@ class Api(object):
            Returns:
              A JSON object.
         """
-        if verb == 'POST':
-            try:
-                return requests.post(
-                    url,
-                    data=json.dumps(data),
-                    headers={
-                        'x-api-id': self._api_id,
-                        'x-api-key': self._api_key,
-                        'content-type': 'application/json'
-                    }
-                )
-            except requests.RequestException as e:
-                print('Error: ' + str(e))
-        elif verb == 'GET':
-            url = self._BuildUrl(url, extra_params=data)
-            try:
-                return requests.get(
-                    url,
-                    headers={
-                        'x-api-id': self._api_id,
-                        'x-api-key': self._api_key
-                    }
-                )
-            except requests.RequestException as e:
-                print('Error: ' + str(e))
-        elif verb == 'PATCH':
-            try:
-                return requests.patch(
-                    url,
-                    data=json.dumps(data),
-                    headers={
-                        'x-api-id': self._api_id,
-                        'x-api-key': self._api_key,
-                        'content-type': 'application/json'
-                    }
-                )
-            except requests.RequestException as e:
-                print('Error: ' + str(e))
-        elif verb == 'DELETE':
+        endpoint, statuspage_id = self._Endpoint(url, verb)
+        if self.components is not None and data:
+            data = self.components.Resolve(endpoint, data)
+        if self.validate and data:
+            validate(endpoint, data)
+        send = functools.partial(self._SendRequest, url, verb, data,
+                                 endpoint)
+        cache = self.http_cache
+        if verb == 'GET' and cache is not None and cache.max_age:
+            # Fresh cached responses take no rate limit or scheduler slot,
+            # stale ones are passed on to be revalidated.
+            cached = cache.Get(cache.Key(
+                self._api_id, self._api_key,
+                self._BuildUrl(url, extra_params=data)))
+            if cached is not None and cache.Fresh(cached):
+                if self.stats is not None:
+                    self.stats.Increment(endpoint, 'cache_hits')
+                return cached.Response()
+            send = functools.partial(send, cached=cached)
+        if self._scheduler is None and self._rate_limiter is None:
+            return send()
+        if data and data.get('statuspage_id'):
+            statuspage_id = data['statuspage_id']
+        if self._scheduler is not None:
+            return self._scheduler.Call(
+                send,
+                endpoint=endpoint,
+                statuspage_id=statuspage_id,
+                limiter=self._rate_limiter)
+        self._rate_limiter.Acquire()
+        return send()
+
+    def _SendRequest(self, url, verb, data=None, endpoint=None,
+                     cached=_LOOKUP):
+        """Request a url.
+
+           Args:
+             url:
+               The web location we want to retrieve.
+             verb:
+               One of POST, GET, PATCH or DELETE.
+             data:
+               A dict of (str, unicode) key/value pairs.
+             endpoint:
+               The endpoint name, for statistics. [Optional]
+             cached:
+               The http_cache entry of a GET if already looked up, None if
+               there is none. [Optional]
+
+           Returns:
+             A statusio.response.Response, or 0 if the request failed.
+        """
+        headers = {
+            'x-api-id': self._api_id,
+            'x-api-key': self._api_key
+        }
+        endpoint = endpoint or 'unknown'
+        body = None
+        if verb in ('POST', 'PATCH'):
+            body = json.dumps(data)
+            headers['content-type'] = 'application/json'
+        elif verb in ('GET', 'DELETE'):
             url = self._BuildUrl(url, extra_params=data)
-            try:
-                return requests.delete(
-                    url,
-                    headers={
-                        'x-api-id': self._api_id,
-                        'x-api-key': self._api_key,
-                        'content-type': 'application/json'
-                    }
-                )
-            except requests.RequestException as e:
-                print('Error: ' + str(e))
-
-        return 0
+            if verb == 'DELETE':
+                headers['content-type'] = 'application/json'
+        else:
+            return 0
+        cache = self.http_cache if verb == 'GET' else None
+        if cache is None:
+            cached = None
+        else:
+            key = cache.Key(self._api_id, self._api_key, url)
+            if cached is _LOOKUP:
+                cached = cache.Get(key)
+            if cached is not None:
+                headers.update(cached.Validators())
+        limiter = self._concurrency_limiter
+        if limiter is not None:
+            limiter.Acquire()
+        started = time.time()
+        # Any failure, not only a TransportError, counts as overloaded and
+        # must release the limiter slot.
+        overloaded = True
+        try:
+            resp = self._transport.Request(verb, url, body, headers)
+            overloaded = resp.status_code == 429 or resp.status_code >= 500
+        except TransportError as e:
+            if self.stats is not None:
+                self.stats.Record(endpoint, time.time() - started,
+                                  len(body or ''), error=True)
+            print('Error: ' + str(e))
+            return 0
+        finally:
+            if limiter is not None:
+                limiter.Release(time.time() - started, overloaded=overloaded)
+        elapsed = time.time() - started
+        if self.stats is not None:
+            self.stats.Record(endpoint, elapsed, len(body or ''),
+                              len(resp.content), resp.status_code >= 400)
+        if cache is not None:
+            if resp.status_code == 304 and cached is not None:
+                if self.stats is not None:
+                    self.stats.Increment(endpoint, 'cache_hits')
+                cache.Revalidated(key)
+                return cached.Response(elapsed)
+            if resp.status_code == 200:
+                cache.Put(key, url, resp)
+        return resp
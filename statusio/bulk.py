@@ -0,0 +1,403 @@
+#!/usr/bin/env python
+
+"""Bulk operations over many Status.io objects"""
+from __future__ import print_function
+
+import csv
+import io
+import re
+import time
+
+from statusio import json
+from statusio.concurrency import run_concurrently
+from statusio.errors import StatusioError, check_result
+from statusio.maintenance import (ALL, IntervalIndex, MaintenanceWindow,
+                                  fetch_windows, to_timestamp)
+
+# Incident states listed by Api.IncidentListByID.
+INCIDENT_STATES = ('active', 'resolved')
+
+
+# Optional MaintenanceSchedule arguments passed through from a window.
+_SCHEDULE_OPTIONS = (
+    'automation',
+    'all_infrastructure_affected',
+    'maintenance_notify_now',
+    'maintenance_notify_1_hr',
+    'maintenance_notify_24_hr',
+    'maintenance_notify_72_hr',
+    'message_subject',
+)
+
+
+class BulkReport(object):
+    """The outcome of a bulk operation.
+
+    Each of succeeded, skipped and failed is a list of dicts holding the
+    ``item`` and either its ``result``, the ``reason`` it was skipped or the
+    ``error`` it failed with.
+    """
+
+    def __init__(self):
+        self.succeeded = []
+        self.skipped = []
+        self.failed = []
+
+    def AsDict(self):
+        return {
+            'succeeded': self.succeeded,
+            'skipped': self.skipped,
+            'failed': self.failed,
+        }
+
+    def __repr__(self):
+        return '<BulkReport succeeded=%d skipped=%d failed=%d>' % (
+            len(self.succeeded), len(self.skipped), len(self.failed))
+
+
+def load_items(path):
+    """Load a batch of dicts from a JSON, JSON lines or CSV file.
+
+       List values in CSV files are separated by whitespace or commas.
+    """
+    with io.open(path, encoding='utf-8') as f:
+        if path.endswith('.csv'):
+            return list(csv.DictReader(f))
+        text = f.read()
+    if path.endswith('.jsonl'):
+        return [json.loads(line) for line in text.splitlines()
+                if line.strip()]
+    return json.loads(text)
+
+
+class MaintenanceScheduler(object):
+    """Schedule many maintenance windows at once.
+
+    Windows are checked against the page's active and upcoming maintenances
+    and against each other; a window overlapping another window on any of
+    the same components is skipped. The rest are scheduled concurrently.
+
+    Example usage:
+
+        >>> scheduler = statusio.MaintenanceScheduler(api, STATUSPAGE_ID)
+        >>> report = scheduler.Schedule([{
+        ...     'name': 'Database patching',
+        ...     'details': 'Monthly patch cycle',
+        ...     'infrastructure_affected': [COMPONENT + '-' + CONTAINER],
+        ...     'start': '2030-01-01T02:00:00Z',
+        ...     'end': '2030-01-01T04:00:00Z'}])
+        >>> report.succeeded
+
+      A window can be given as a dict with:
+
+        name, details, infrastructure_affected:
+          As for Api.MaintenanceSchedule. infrastructure_affected may be a
+          list or a whitespace/comma separated string of combos.
+        start, end:
+          Anything statusio.maintenance.to_timestamp() accepts. The split
+          date_planned_start/time_planned_start/... fields work as well.
+        automation, all_infrastructure_affected, maintenance_notify_*, message_subject:
+          Passed through to Api.MaintenanceSchedule. [Optional]
+    """
+
+    def __init__(self,
+                 api,
+                 statuspage_id,
+                 max_workers=8,
+                 date_format='%Y/%m/%d',
+                 time_format='%H:%M'):
+        """Instantiate a new statusio.MaintenanceScheduler object.
+
+        Args:
+          api:
+            A statusio.Api instance.
+          statuspage_id:
+            Status page ID
+          max_workers:
+            Maximum number of MaintenanceSchedule calls in flight. [Optional]
+          date_format:
+            strftime format of the dates sent to the API (UTC). [Optional]
+          time_format:
+            strftime format of the times sent to the API (UTC). [Optional]
+        """
+        self._api = api
+        self.statuspage_id = statuspage_id
+        self.max_workers = max_workers
+        self.date_format = date_format
+        self.time_format = time_format
+
+    def Load(self, path):
+        """Load windows from a JSON, JSON lines or CSV file."""
+        return load_items(path)
+
+    def Plan(self, windows, existing=None):
+        """Normalize windows and detect overlaps without scheduling anything.
+
+           Args:
+             windows:
+               An iterable of window dicts.
+             existing:
+               MaintenanceWindow list to check against. Fetched from the API
+               when not given. [Optional]
+
+           Returns:
+             A BulkReport whose succeeded entries hold the normalized
+             MaintenanceSchedule arguments as ``result``.
+        """
+        if existing is None:
+            existing = fetch_windows(self._api, self.statuspage_id,
+                                     max_workers=self.max_workers)
+        index = IntervalIndex()
+        for window in existing:
+            for key in window.components or (ALL,):
+                index.Add(key, window.start, window.end, window)
+
+        report = BulkReport()
+        for window in windows:
+            try:
+                args, planned = self._Normalize(window)
+            except (StatusioError, KeyError, ValueError) as e:
+                report.skipped.append({'item': window,
+                                       'reason': 'invalid: %s' % e})
+                continue
+            conflicts = self._Conflicts(index, planned)
+            if conflicts:
+                report.skipped.append({'item': window, 'reason': (
+                    'overlaps %s' % ', '.join(
+                        repr(c.name or c.id) for c in conflicts))})
+                continue
+            for key in planned.components or (ALL,):
+                index.Add(key, planned.start, planned.end, planned)
+            report.succeeded.append({'item': window, 'result': args})
+        return report
+
+    def Schedule(self, windows, dry_run=False, existing=None):
+        """Schedule all windows that do not overlap an existing one.
+
+           Args:
+             windows:
+               An iterable of window dicts.
+             dry_run:
+               Only plan, do not call the API. [Optional]
+             existing:
+               MaintenanceWindow list to check against. [Optional]
+
+           Returns:
+             A BulkReport whose succeeded entries hold the new maintenance ID
+             as ``result``.
+        """
+        plan = self.Plan(windows, existing)
+        if dry_run:
+            return plan
+        report = BulkReport()
+        report.skipped = plan.skipped
+        for entry, result, err in run_concurrently(
+                lambda e: check_result(
+                    self._api.MaintenanceSchedule(**e['result'])),
+                plan.succeeded, self.max_workers):
+            if err is None:
+                report.succeeded.append({'item': entry['item'],
+                                         'result': result})
+            else:
+                report.failed.append({'item': entry['item'],
+                                      'error': str(err)})
+        return report
+
+    def _Normalize(self, window):
+        start = self._Time(window, 'start')
+        end = self._Time(window, 'end')
+        if end <= start:
+            raise StatusioError('window ends before it starts')
+        if end <= time.time():
+            raise StatusioError('window is in the past')
+        combos = window.get('infrastructure_affected') or []
+        if not isinstance(combos, (list, tuple)):
+            combos = combos.replace(',', ' ').split()
+        args = {
+            'statuspage_id': self.statuspage_id,
+            'infrastructure_affected': list(combos),
+            'maintenance_name': window.get('name') or window['maintenance_name'],
+            'maintenance_details': (window.get('details') or
+                                    window.get('maintenance_details') or ''),
+            'date_planned_start': self._Format(start, self.date_format),
+            'time_planned_start': self._Format(start, self.time_format),
+            'date_planned_end': self._Format(end, self.date_format),
+            'time_planned_end': self._Format(end, self.time_format),
+        }
+        for option in _SCHEDULE_OPTIONS:
+            if window.get(option) not in (None, ''):
+                args[option] = str(window[option])
+        if args.get('all_infrastructure_affected') == '1':
+            components = ()
+        else:
+            components = tuple(sorted(set(c.split('-')[0] for c in combos)))
+            if not components:
+                raise StatusioError('no infrastructure_affected')
+        return args, MaintenanceWindow(None, args['maintenance_name'], start,
+                                       end, components, (), None)
+
+    def _Time(self, window, which):
+        if window.get(which) not in (None, ''):
+            return to_timestamp(window[which])
+        return to_timestamp('%s %s' % (window['date_planned_%s' % which],
+                                       window['time_planned_%s' % which]))
+
+    @staticmethod
+    def _Format(stamp, fmt):
+        return time.strftime(fmt, time.gmtime(stamp))
+
+    @staticmethod
+    def _Conflicts(index, planned):
+        if planned.components:
+            keys = planned.components + (ALL,)
+        else:
+            keys = index.Keys()
+        conflicts = []
+        for key in keys:
+            for window in index.Overlapping(key, planned.start, planned.end):
+                if window not in conflicts:
+                    conflicts.append(window)
+        return conflicts
+
+
+class BulkIncidents(object):
+    """Update, resolve or delete many incidents at once.
+
+    Incidents are selected by state, affected component or container and
+    name, then the same call is made for each of them concurrently. Every
+    operation returns a BulkReport and can be run as a dry run first.
+
+    Example usage:
+
+        >>> bulk = statusio.BulkIncidents(api, STATUSPAGE_ID)
+        >>> incidents = bulk.Select(component=COMPONENT, name='^Outage')
+        >>> report = bulk.Resolve(incidents, 'All systems are back', 100,
+        ...                       300, notify_email='1')
+        >>> report.failed
+    """
+
+    def __init__(self, api, statuspage_id, max_workers=8):
+        """Instantiate a new statusio.BulkIncidents object.
+
+        Args:
+          api:
+            A statusio.Api instance.
+          statuspage_id:
+            Status page ID
+          max_workers:
+            Maximum number of API calls in flight. [Optional]
+        """
+        self._api = api
+        self.statuspage_id = statuspage_id
+        self.max_workers = max_workers
+
+    def Select(self, state='active', component=None, container=None,
+               name=None):
+        """Fetch the incidents matching all of the given filters.
+
+           Args:
+             state:
+               'active', 'resolved' or None for both. [Optional]
+             component:
+               Only incidents affecting this component ID. [Optional]
+             container:
+               Only incidents affecting this container ID. [Optional]
+             name:
+               Regular expression searched for in the incident name,
+               ignoring case. [Optional]
+
+           Returns:
+             A list of incident dicts as returned by Api.IncidentSingle.
+        """
+        states = INCIDENT_STATES if state is None else (state,)
+        listing = check_result(
+            self._api.IncidentListByID(self.statuspage_id)) or {}
+        incidents, ids = [], []
+        for which in states:
+            for item in listing.get('%s_incidents' % which) or []:
+                if isinstance(item, dict):
+                    incidents.append(item)
+                else:
+                    ids.append(item)
+        for _, data, err in run_concurrently(
+                lambda i: check_result(
+                    self._api.IncidentSingle(self.statuspage_id, i)),
+                ids, self.max_workers):
+            if err is not None:
+                raise err
+            incidents.append(data)
+        pattern = re.compile(name, re.I) if name else None
+        return [i for i in incidents
+                if (component is None or
+                    component in _IDs(i.get('components'))) and
+                (container is None or
+                 container in _IDs(i.get('containers'))) and
+                (pattern is None or pattern.search(i.get('name') or ''))]
+
+    def Update(self, incidents, incident_details, current_status,
+               current_state, dry_run=False, **options):
+        """Post the same update to every incident.
+
+           Args:
+             incidents:
+               Incident dicts or IDs.
+             incident_details, current_status, current_state:
+               As for Api.IncidentUpdate.
+             dry_run:
+               Only report the calls that would be made. [Optional]
+             options:
+               Further Api.IncidentUpdate arguments, e.g. notify_email.
+
+           Returns:
+             A BulkReport. Its succeeded entries hold the API result, or the
+             call arguments on a dry run, as ``result``.
+        """
+        options.update(incident_details=incident_details,
+                       current_status=current_status,
+                       current_state=current_state)
+        return self._Run(self._api.IncidentUpdate, incidents, options,
+                         dry_run)
+
+    def Resolve(self, incidents, incident_details, current_status,
+                current_state, dry_run=False, **options):
+        """Resolve every incident with the same details.
+
+           Arguments and return value are as for Update().
+        """
+        options.update(incident_details=incident_details,
+                       current_status=current_status,
+                       current_state=current_state)
+        return self._Run(self._api.IncidentResolve, incidents, options,
+                         dry_run)
+
+    def Delete(self, incidents, dry_run=False):
+        """Delete every incident.
+
+           Arguments and return value are as for Update().
+        """
+        return self._Run(self._api.IncidentDelete, incidents, {}, dry_run)
+
+    def _Run(self, method, incidents, options, dry_run):
+        calls = []
+        for incident in incidents:
+            args = dict(options, statuspage_id=self.statuspage_id,
+                        incident_id=_IDs([incident])[0])
+            calls.append((incident, args))
+        report = BulkReport()
+        if dry_run:
+            report.succeeded = [{'item': incident, 'result': args}
+                                for incident, args in calls]
+            return report
+        for (incident, _), result, err in run_concurrently(
+                lambda c: check_result(method(**c[1])), calls,
+                self.max_workers):
+            if err is None:
+                report.succeeded.append({'item': incident, 'result': result})
+            else:
+                report.failed.append({'item': incident, 'error': str(err)})
+        return report
+
+
+def _IDs(items):
+    return [(i.get('_id') or i.get('id')) if isinstance(i, dict) else i
+            for i in items or []]
@@ -0,0 +1,217 @@
+#!/usr/bin/env python
+
+"""Command line interface to the Status.io API
+
+Run many operations through one process and one connection pool:
+
+    $ statusio batch operations.jsonl > results.jsonl
+
+Each input line is a JSON object naming a statusio.Api method and its
+arguments:
+
+    {"id": "1", "method": "ComponentStatusUpdate",
+     "args": ["568d8a3e3cada8c2490000dd", "...", "...", "Degraded", 300]}
+    {"id": "2", "method": "StatusSummary",
+     "kwargs": {"statuspage_id": "568d8a3e3cada8c2490000dd"}}
+
+Operations for the same status page run in input order, operations for
+different pages run concurrently. Each output line holds the ``id`` (or
+input line number), the ``method`` and either its ``result`` or ``error``.
+"""
+from __future__ import print_function
+
+import argparse
+import collections
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from statusio import json
+from statusio.api import Api, _ENDPOINTS
+from statusio.errors import StatusioError
+
+
+def _Methods():
+    # Only the endpoint methods; Warmup, WithResponseMode and the like are
+    # not operations.
+    return set(name for _, _, name in _ENDPOINTS)
+
+
+class BatchRunner(object):
+    """Run a stream of operations through a single statusio.Api.
+
+    Operations are dicts with a ``method`` and optional ``args``, ``kwargs``
+    and ``id``. They are run with bounded concurrency while keeping the order
+    of operations targeting the same status page.
+    """
+
+    def __init__(self, api, concurrency=8, output=None, max_pending=None):
+        """Instantiate a new BatchRunner.
+
+        Args:
+          api:
+            The statusio.Api to run operations with.
+          concurrency:
+            Maximum number of operations in flight. [Optional]
+          output:
+            Callable receiving each result dict, in completion order.
+            [Optional]
+          max_pending:
+            Maximum number of operations read ahead before blocking the
+            reader. Defaults to 100 per worker. [Optional]
+        """
+        self._api = api
+        self.concurrency = concurrency
+        self._output = output or (lambda result: None)
+        self._methods = _Methods()
+        self._pending = threading.BoundedSemaphore(
+            max_pending or concurrency * 100)
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._queues = {}
+        self._pool = None
+        self._in_flight = 0
+        self.failed = 0
+
+    def Run(self, operations):
+        """Run every operation and wait for all of them to finish.
+
+           Args:
+             operations:
+               An iterable of operation dicts or JSON strings.
+
+           Returns:
+             The number of operations that failed.
+        """
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            self._pool = pool
+            for number, operation in enumerate(operations, 1):
+                self._pending.acquire()
+                self._Submit(number, operation)
+            with self._idle:
+                while self._in_flight:
+                    self._idle.wait()
+        return self.failed
+
+    def _Submit(self, number, operation):
+        try:
+            if not isinstance(operation, dict):
+                operation = json.loads(operation)
+            if not isinstance(operation, dict):
+                raise StatusioError('Operation must be a JSON object')
+            key = self._Key(operation)
+        except (StatusioError, ValueError) as e:
+            self._Finish({'id': number, 'error': str(e)})
+            self._pending.release()
+            return
+        with self._lock:
+            self._in_flight += 1
+            queue = self._queues.get(key)
+            if queue is not None:
+                queue.append((number, operation))
+                return
+            self._queues[key] = collections.deque()
+        self._pool.submit(self._Call, key, number, operation)
+
+    def _Call(self, key, number, operation):
+        while True:
+            result = {'id': operation.get('id', number),
+                      'method': operation.get('method')}
+            try:
+                method = operation['method']
+                if method not in self._methods:
+                    raise StatusioError('Unknown method: %s' % method)
+                result['result'] = getattr(self._api, method)(
+                    *operation.get('args') or [],
+                    **operation.get('kwargs') or {})
+            except Exception as e:
+                result['error'] = str(e) or e.__class__.__name__
+            try:
+                self._Finish(result)
+            finally:
+                self._pending.release()
+                with self._lock:
+                    self._in_flight -= 1
+                    queue = self._queues[key]
+                    if not queue:
+                        del self._queues[key]
+                        self._idle.notify_all()
+                        return
+                    number, operation = queue.popleft()
+
+    def _Finish(self, result):
+        error = result.get('error')
+        response = result.get('result')
+        if error is None and isinstance(response, dict):
+            status = response.get('status') or {}
+            if isinstance(status, dict) and status.get('error') == 'yes':
+                error = status.get('message')
+        with self._lock:
+            if error is not None:
+                self.failed += 1
+            self._output(result)
+
+    @staticmethod
+    def _Key(operation):
+        kwargs = operation.get('kwargs') or {}
+        args = operation.get('args') or []
+        if not isinstance(kwargs, dict) or not isinstance(args, list):
+            raise StatusioError('args must be a list and kwargs an object')
+        if 'statuspage_id' in kwargs:
+            key = kwargs['statuspage_id']
+        elif args:
+            key = args[0]
+        else:
+            raise StatusioError('Operation without statuspage_id')
+        if not isinstance(key, (str, type(u''))):
+            raise StatusioError('statuspage_id must be a string: %r' % (key,))
+        return key
+
+
+def _ParseArgs(argv):
+    parser = argparse.ArgumentParser(
+        prog='statusio', description='Command line interface to Status.io')
+    parser.add_argument('--api-id', default=os.environ.get('STATUSIO_API_ID'),
+                        help='API ID (default: $STATUSIO_API_ID)')
+    parser.add_argument('--api-key',
+                        default=os.environ.get('STATUSIO_API_KEY'),
+                        help='API key (default: $STATUSIO_API_KEY)')
+    parser.add_argument('--base-url', default='https://api.status.io',
+                        help='API base URL')
+    commands = parser.add_subparsers(dest='command')
+    batch = commands.add_parser(
+        'batch', help='run operations from a JSON lines file or stdin')
+    batch.add_argument('file', nargs='?', default='-',
+                       help='JSON lines file (default: stdin)')
+    batch.add_argument('-c', '--concurrency', type=int, default=8,
+                       help='operations in flight (default: 8)')
+    args = parser.parse_args(argv)
+    if args.command is None:
+        parser.error('a command is required')
+    if not args.api_id or not args.api_key:
+        parser.error('--api-id and --api-key are required')
+    return args
+
+
+def main(argv=None):
+    args = _ParseArgs(argv)
+    api = Api(args.api_id, args.api_key, base_url=args.base_url,
+              pool_size=args.concurrency)
+
+    def output(result):
+        sys.stdout.write(json.dumps(result) + '\n')
+        sys.stdout.flush()
+
+    runner = BatchRunner(api, args.concurrency, output)
+    source = sys.stdin if args.file == '-' else open(args.file)
+    try:
+        failed = runner.Run(line for line in source if line.strip())
+    finally:
+        if source is not sys.stdin:
+            source.close()
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,31 @@
+#!/usr/bin/env python
+
+"""Status and state codes used by the Status.io API"""
+
+# Component, container and incident status codes (current_status).
+STATUS = {
+    100: 'Operational',
+    200: 'Planned Maintenance',
+    300: 'Degraded Performance',
+    400: 'Partial Service Disruption',
+    500: 'Service Disruption',
+    600: 'Security Event',
+}
+
+# Incident state codes (current_state).
+STATE = {
+    100: 'Investigating',
+    200: 'Identified',
+    300: 'Monitoring',
+}
+
+STATUS_BY_NAME = dict((name.lower(), code) for code, name in STATUS.items())
+STATE_BY_NAME = dict((name.lower(), code) for code, name in STATE.items())
+
+
+def status_code(value):
+    """Return the numeric status code for a code or status name, or None."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return STATUS_BY_NAME.get(str(value).strip().lower())
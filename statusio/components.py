@@ -0,0 +1,227 @@
+#!/usr/bin/env python
+
+"""Resolution of component and container names to their IDs"""
+
+import fnmatch
+import re
+import threading
+import time
+
+from statusio.errors import ValidationError, check_result
+
+# IDs are passed through without looking anything up.
+_ID = re.compile(r'^[0-9a-fA-F]{24}$')
+_COMBO_ID = re.compile(r'^[0-9a-fA-F]{24}-[0-9a-fA-F]{24}$')
+
+# Endpoint name -> ((field, kind), ...) of the arguments taking IDs.
+NAME_FIELDS = {
+    'ComponentStatusUpdate': (('component', 'component'),
+                              ('container', 'container')),
+    'IncidentCreate': (('infrastructure_affected', 'combos'),),
+    'MaintenanceSchedule': (('infrastructure_affected', 'combos'),),
+    'SubscriberAdd': (('granular', 'combos'),),
+    'SubscriberUpdate': (('granular', 'combos'),),
+}
+
+
+class _Page(object):
+    """The immutable name index of one status page."""
+
+    def __init__(self, components, fetched_at):
+        self.fetched_at = fetched_at
+        self.components = {}     # lower case name -> [component ID]
+        self.containers = {}     # lower case name -> [container ID]
+        self.names = {}          # component ID -> (name, [(name, ID)])
+        for component in components or []:
+            cid = component.get('_id') or component.get('id')
+            name = component.get('name') or ''
+            _Add(self.components, name.lower(), cid)
+            containers = []
+            for container in component.get('containers') or []:
+                kid = container.get('_id') or container.get('id')
+                kname = container.get('name') or ''
+                _Add(self.containers, kname.lower(), kid)
+                containers.append((kname.lower(), kid))
+            self.names[cid] = (name.lower(), containers)
+
+
+def _Add(index, key, value):
+    values = index.setdefault(key, [])
+    if value not in values:
+        values.append(value)
+
+
+class ComponentIndex(object):
+    """Look up component and container IDs by name, from a cached
+    ComponentList.
+
+    Names are matched ignoring case in a dict, so lookups are O(1); glob
+    patterns (``*``, ``?``, ``[...]``) scan the page's components. Each
+    page's ComponentList is fetched on first use and again once it is older
+    than ``ttl`` seconds. Values that already are IDs are returned as is
+    without fetching anything.
+
+    Combos are given as 'Component/Container' with either part a name, an
+    ID or a glob; a component alone stands for all of its containers.
+
+    Example usage:
+
+        >>> index = statusio.ComponentIndex(api)
+        >>> index.Component(STATUSPAGE_ID, 'Website')
+        '568d8a3e3cada8c2490000ed'
+        >>> index.Combos(STATUSPAGE_ID, ['Website/US East', 'API'])
+
+      Or let the Api resolve names in every call:
+
+        >>> api = statusio.Api(API_ID, API_KEY, resolve_names=True)
+        >>> api.ComponentStatusUpdate(STATUSPAGE_ID, 'Website', 'US East',
+        ...                           'Degraded', 300)
+    """
+
+    def __init__(self, api, ttl=300, clock=time.time):
+        """Instantiate a new statusio.ComponentIndex object.
+
+        Args:
+          api:
+            A statusio.Api instance.
+          ttl:
+            Seconds a fetched ComponentList is used for. [Optional]
+          clock:
+            Function returning the time in seconds. [Optional]
+        """
+        self._api = api
+        self.ttl = ttl
+        self._clock = clock
+        self._pages = {}
+        self._lock = threading.Lock()
+
+    def Refresh(self, statuspage_id):
+        """Fetch the ComponentList of a status page now."""
+        components = check_result(self._api.ComponentList(statuspage_id))
+        page = _Page(components, self._clock())
+        with self._lock:
+            self._pages[statuspage_id] = page
+        return page
+
+    def Invalidate(self, statuspage_id=None):
+        """Drop the cached ComponentList of one or all status pages."""
+        with self._lock:
+            if statuspage_id is None:
+                self._pages = {}
+            else:
+                self._pages.pop(statuspage_id, None)
+
+    def Component(self, statuspage_id, name):
+        """Return the ID of a component given its name or ID."""
+        if _ID.match(name):
+            return name
+        return self._One(self._Page(statuspage_id).components, name,
+                         'component')
+
+    def Container(self, statuspage_id, name):
+        """Return the ID of a container given its name or ID."""
+        if _ID.match(name):
+            return name
+        return self._One(self._Page(statuspage_id).containers, name,
+                         'container')
+
+    def Combos(self, statuspage_id, specs):
+        """Return the 'component-container' ID combos matching specs.
+
+           Args:
+             statuspage_id:
+               Status page ID
+             specs:
+               A list of combos, each 'Component/Container', 'Component' or
+               an ID combo, or a string of them separated by commas.
+
+           Returns:
+             A list of ID combos without duplicates, in order.
+        """
+        if not isinstance(specs, (list, tuple)):
+            specs = [s for s in specs.split(',') if s.strip()]
+        combos = []
+        page = None
+        for spec in specs:
+            spec = spec.strip()
+            if _COMBO_ID.match(spec):
+                matched = [spec]
+            else:
+                page = page or self._Page(statuspage_id)
+                matched = self._Match(page, spec)
+                if not matched:
+                    raise ValidationError('Unknown combo %r' % (spec,),
+                                          field='infrastructure_affected')
+            for combo in matched:
+                if combo not in combos:
+                    combos.append(combo)
+        return combos
+
+    def Resolve(self, endpoint, data):
+        """Return a copy of a request payload with names replaced by IDs."""
+        fields = NAME_FIELDS.get(endpoint)
+        if not fields:
+            return data
+        data = dict(data)
+        statuspage_id = data.get('statuspage_id')
+        for field, kind in fields:
+            value = data.get(field)
+            if not value:
+                continue
+            try:
+                if kind == 'combos':
+                    data[field] = self.Combos(statuspage_id, value)
+                elif kind == 'component':
+                    data[field] = self.Component(statuspage_id, value)
+                else:
+                    data[field] = self.Container(statuspage_id, value)
+            except ValidationError as e:
+                e.endpoint, e.field = endpoint, field
+                raise
+        return data
+
+    def _Page(self, statuspage_id):
+        with self._lock:
+            page = self._pages.get(statuspage_id)
+        if page is None or self._clock() - page.fetched_at >= self.ttl:
+            page = self.Refresh(statuspage_id)
+        return page
+
+    @staticmethod
+    def _One(index, name, what):
+        if _IsGlob(name):
+            ids = []
+            for key in fnmatch.filter(index, name.lower()):
+                ids.extend(i for i in index[key] if i not in ids)
+        else:
+            ids = index.get(name.lower()) or []
+        if len(ids) != 1:
+            raise ValidationError('%s %s %r' % (
+                'Ambiguous' if ids else 'Unknown', what, name), field=what)
+        return ids[0]
+
+    @staticmethod
+    def _Match(page, spec):
+        component, _, container = spec.partition('/')
+        component = component.strip().lower()
+        container = container.strip().lower() or '*'
+        matched = []
+        for cid, (name, containers) in page.names.items():
+            if not _NameMatches(cid, name, component):
+                continue
+            for kname, kid in containers:
+                if _NameMatches(kid, kname, container):
+                    matched.append('%s-%s' % (cid, kid))
+        return sorted(matched)
+
+
+def _IsGlob(name):
+    return any(c in name for c in '*?[')
+
+
+def _NameMatches(item_id, name, pattern):
+    if pattern == item_id.lower():
+        return True
+    if _IsGlob(pattern):
+        return fnmatch.fnmatchcase(name, pattern)
+    return name == pattern
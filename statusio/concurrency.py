@@ -0,0 +1,164 @@
+#!/usr/bin/env python
+
+"""Helpers for running many API calls concurrently"""
+from __future__ import division
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+def run_concurrently(func, items, max_workers=8):
+    """Call func(item) for every item using a bounded thread pool.
+
+       Args:
+         func:
+           A callable taking a single item.
+         items:
+           An iterable of items.
+         max_workers:
+           Maximum number of calls in flight, or an AdaptiveLimiter to use
+           as many threads as it may allow. The limiter must also be given
+           to the statusio.Api making the calls. [Optional]
+
+       Returns:
+         A list of (item, result, error) tuples in input order. error is the
+         exception raised by func, or None if the call succeeded.
+    """
+    if isinstance(max_workers, AdaptiveLimiter):
+        max_workers = max_workers.maximum
+    items = list(items)
+    if not items:
+        return []
+
+    def call(item):
+        try:
+            return item, func(item), None
+        except Exception as e:
+            return item, None, e
+
+    if max_workers <= 1 or len(items) == 1:
+        return [call(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as pool:
+        return list(pool.map(call, items))
+
+
+class AdaptiveLimiter(object):
+    """Limit requests in flight, adapting the limit to the server (AIMD).
+
+    While responses come back about as fast as the fastest ones seen and
+    at least half the limit is in use, each round of ``limit`` successful
+    requests raises the limit by about one. A 429 or
+    5xx response, a failed request, or latency above ``tolerance`` times
+    the baseline cuts the limit by ``backoff``, at most once per round trip
+    so a burst of failures in flight counts as one.
+
+    Example usage:
+
+        >>> limiter = statusio.AdaptiveLimiter(maximum=32)
+        >>> api = statusio.Api(API_ID, API_KEY, concurrency_limiter=limiter)
+        >>> bulk = statusio.BulkIncidents(api, STATUSPAGE_ID,
+        ...                               max_workers=limiter)
+        >>> limiter.limit
+    """
+
+    def __init__(self, initial=4, minimum=1, maximum=64, backoff=0.5,
+                 tolerance=2.0, clock=time.time):
+        """Instantiate a new statusio.AdaptiveLimiter object.
+
+        Args:
+          initial:
+            Requests allowed in flight at first. [Optional]
+          minimum:
+            Lowest the limit may go. [Optional]
+          maximum:
+            Highest the limit may go. [Optional]
+          backoff:
+            Factor applied to the limit on overload. [Optional]
+          tolerance:
+            Latency over the baseline, as a factor, taken as overload.
+            [Optional]
+          clock:
+            Function returning the time in seconds. [Optional]
+        """
+        self.minimum = minimum
+        self.maximum = maximum
+        self.backoff = backoff
+        self.tolerance = tolerance
+        self._clock = clock
+        self._limit = float(min(max(initial, minimum), maximum))
+        self._in_flight = 0
+        self._baseline = None
+        self._latency = None
+        self._decreased = None
+        self._cond = threading.Condition()
+
+    @property
+    def limit(self):
+        """The number of requests currently allowed in flight."""
+        return int(self._limit)
+
+    @property
+    def in_flight(self):
+        """The number of requests in flight."""
+        return self._in_flight
+
+    def Acquire(self, timeout=None):
+        """Wait for a request slot.
+
+           Args:
+             timeout:
+               Maximum seconds to wait. Defaults to waiting forever.
+               [Optional]
+
+           Returns:
+             True if a slot was taken, False on timeout.
+        """
+        deadline = None if timeout is None else self._clock() + timeout
+        with self._cond:
+            while self._in_flight >= int(self._limit):
+                if deadline is None:
+                    self._cond.wait()
+                else:
+                    remaining = deadline - self._clock()
+                    if remaining <= 0:
+                        return False
+                    self._cond.wait(remaining)
+            self._in_flight += 1
+        return True
+
+    def Release(self, latency, overloaded=False):
+        """Give back a slot and adapt the limit.
+
+           Args:
+             latency:
+               Seconds the request took.
+             overloaded:
+               Whether the server signalled overload, e.g. a 429 or 5xx
+               response or a failed request. [Optional]
+        """
+        with self._cond:
+            # Only grow when the limit is actually in use.
+            busy = self._in_flight * 2 >= self._limit
+            self._in_flight -= 1
+            if self._baseline is None or latency < self._baseline:
+                self._baseline = latency
+            else:
+                # Let the baseline follow lasting changes, slowly.
+                self._baseline += (latency - self._baseline) * 0.01
+            if self._latency is None:
+                self._latency = latency
+            else:
+                self._latency += (latency - self._latency) * 0.2
+            if overloaded or self._latency > self.tolerance * max(
+                    self._baseline, 1e-3):
+                now = self._clock()
+                if self._decreased is None or \
+                        now - self._decreased >= self._latency:
+                    self._decreased = now
+                    self._limit = max(float(self.minimum),
+                                      self._limit * self.backoff)
+            elif busy:
+                self._limit = min(float(self.maximum),
+                                  self._limit + 1.0 / self._limit)
+            self._cond.notify_all()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+
+"""A directory of files keyed by hash, written atomically"""
+
+import errno
+import hashlib
+import os
+import tempfile
+import threading
+
+# os.rename does not replace an existing file on Windows.
+_replace = getattr(os, 'replace', os.rename)
+
+
+class DiskStore(object):
+    """Byte strings stored in a directory, one file per key.
+
+    File names are the SHA-1 of the key, spread over 256 subdirectories.
+    Files are written to a temporary name and renamed into place, so
+    readers, including other processes, never see partial writes.
+
+    Given ``max_bytes``, reads mark files as used and the least recently
+    used files are removed once the total size exceeds it.
+    """
+
+    def __init__(self, directory, max_bytes=None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._size = None
+        self._lock = threading.Lock()
+
+    def Path(self, key):
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, digest[:2], digest[2:])
+
+    def Get(self, key):
+        """Return the bytes stored under key, or None."""
+        path = self.Path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            if self.max_bytes is not None:
+                os.utime(path, None)
+            return data
+        except (IOError, OSError) as e:
+            if e.errno != errno.ENOENT:
+                raise
+            return None
+
+    def Put(self, key, data):
+        """Store bytes under key, replacing any stored before."""
+        path = self.Path(key)
+        directory = os.path.dirname(path)
+        try:
+            os.makedirs(directory)
+        except OSError as e:
+            if e.errno != errno.EEXIST:
+                raise
+        fd, temp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            old = _Size(path)
+            _replace(temp, path)
+        except Exception:
+            os.unlink(temp)
+            raise
+        if self.max_bytes is not None:
+            with self._lock:
+                if self._size is None:
+                    self._size = self.Size()
+                else:
+                    self._size += len(data) - old
+                if self._size > self.max_bytes:
+                    self._size = self._Evict()
+
+    def Overwrite(self, key, offset, data):
+        """Write bytes in place at offset of what is stored under key.
+
+           Only for small fixed size fields: unlike Put() this is not
+           atomic, readers must cope with a torn write.
+
+           Returns:
+             Whether anything was stored under key.
+        """
+        try:
+            with open(self.Path(key), 'r+b') as f:
+                f.seek(offset)
+                f.write(data)
+            return True
+        except (IOError, OSError) as e:
+            if e.errno != errno.ENOENT:
+                raise
+            return False
+
+    def Delete(self, key):
+        """Remove what is stored under key, if anything."""
+        _Unlink(self.Path(key))
+
+    def Size(self):
+        """Return the total size of the stored files in bytes."""
+        return sum(size for _, _, size in self._Files())
+
+    def Clear(self):
+        """Remove everything stored."""
+        for path, _, _ in self._Files():
+            _Unlink(path)
+        with self._lock:
+            self._size = 0
+
+    def _Files(self):
+        # (path, mtime, size) of every stored file, other processes may be
+        # adding and removing files meanwhile.
+        files = []
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if name.endswith('.tmp'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                files.append((path, st.st_mtime, st.st_size))
+        return files
+
+    def _Evict(self):
+        # Remove the least recently used files until under max_bytes; other
+        # processes sharing the directory are counted too.
+        files = sorted(self._Files(), key=lambda f: f[1])
+        size = sum(f[2] for f in files)
+        for path, _, file_size in files:
+            if size <= self.max_bytes:
+                break
+            _Unlink(path)
+            size -= file_size
+        return size
+
+
+def _Size(path):
+    try:
+        return os.stat(path).st_size
+    except OSError:
+        return 0
+
+
+def _Unlink(path):
+    try:
+        os.unlink(path)
+    except OSError as e:
+        if e.errno != errno.ENOENT:
+            raise
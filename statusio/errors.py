@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+
+"""Exceptions raised by the statusio package"""
+
+try:
+    # python 3
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
+
+
+class StatusioError(Exception):
+    """Base class for errors raised by statusio."""
+
+
+class TransportError(StatusioError):
+    """A request could not be sent or no response was received."""
+
+
+class ValidationError(StatusioError):
+    """Request arguments the API would reject, caught before sending.
+
+    Attributes:
+      endpoint:
+        The endpoint name, e.g. 'MetricUpdate'.
+      field:
+        The offending argument, or None if it involves several.
+    """
+
+    def __init__(self, message, endpoint=None, field=None):
+        StatusioError.__init__(self, message)
+        self.endpoint = endpoint
+        self.field = field
+
+
+def check_result(data):
+    """Return the result of an API response, raising if it reports an error.
+
+       Args:
+         data:
+           A JSON object as returned by one of the statusio.Api methods.
+
+       Returns:
+         The value of the response's ``result`` key.
+    """
+    if not isinstance(data, Mapping):
+        raise StatusioError('Unexpected response: %r' % (data,))
+    status = data.get('status') or {}
+    if status.get('error') == 'yes':
+        raise StatusioError(status.get('message') or 'Unknown error')
+    return data.get('result')
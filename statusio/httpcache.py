@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+
+"""A persistent on-disk cache of GET responses revalidated with the server"""
+
+import collections
+import hashlib
+import os
+import time
+
+from statusio import json
+from statusio.diskstore import DiskStore
+from statusio.response import Response
+
+# Response headers kept with a cached body.
+_KEPT_HEADERS = ('content-type', 'etag', 'last-modified')
+
+# A cache file starts with the time it was stored at, in a fixed width so
+# revalidation can update it in place, then a JSON line and the body.
+_STORED_AT = '%020.6f\n'
+_STORED_AT_SIZE = 21
+
+
+class CachedResponse(collections.namedtuple(
+        'CachedResponse', 'url headers content stored_at')):
+    """A response body stored by HttpCache, with the headers needed to
+    revalidate it."""
+    __slots__ = ()
+
+    def Validators(self):
+        """Return the conditional request headers for this response."""
+        headers = {}
+        if self.headers.get('etag'):
+            headers['if-none-match'] = self.headers['etag']
+        if self.headers.get('last-modified'):
+            headers['if-modified-since'] = self.headers['last-modified']
+        return headers
+
+    def Response(self, elapsed=0.0):
+        """Return this as a statusio.response.Response."""
+        return Response(200, self.content, dict(self.headers), elapsed)
+
+
+class HttpCache(object):
+    """GET responses kept on disk across processes and restarts.
+
+    Responses are keyed by URL and credentials and stored atomically in a
+    directory that several processes can share; the least recently used
+    are removed once the directory grows past ``max_bytes``. Cached
+    responses are revalidated with If-None-Match and If-Modified-Since, so
+    unchanged data costs a 304 without a body. Given ``max_age``, responses
+    younger than that are used without asking the server at all.
+
+    Example usage:
+
+        >>> api = statusio.Api(API_ID, API_KEY,
+        ...                    http_cache=statusio.HttpCache('~/.statusio'))
+        >>> api.ComponentList(STATUSPAGE_ID)    # 304 if unchanged
+    """
+
+    def __init__(self, directory, max_bytes=64 * 2 ** 20, max_age=0,
+                 clock=time.time):
+        """Instantiate a new statusio.HttpCache object.
+
+        Args:
+          directory:
+            Directory storing the responses, created if needed.
+          max_bytes:
+            Size the directory is kept under. [Optional]
+          max_age:
+            Seconds a response is used for before revalidating it.
+            [Optional]
+          clock:
+            Function returning the time in seconds. [Optional]
+        """
+        self.max_age = max_age
+        self._clock = clock
+        self._store = DiskStore(os.path.expanduser(directory), max_bytes)
+
+    @staticmethod
+    def Key(api_id, api_key, url):
+        """Return the cache key of a request."""
+        credential = hashlib.sha256(
+            ('%s:%s' % (api_id, api_key)).encode('utf-8')).hexdigest()
+        return '%s %s' % (credential, url)
+
+    def Get(self, key):
+        """Return the CachedResponse stored under key, or None."""
+        data = self._store.Get(key)
+        if data is None:
+            return None
+        stored_at = data[:_STORED_AT_SIZE]
+        meta, _, content = data[_STORED_AT_SIZE:].partition(b'\n')
+        try:
+            stored_at = float(stored_at.decode('ascii'))
+            meta = json.loads(meta.decode('utf-8'))
+        except ValueError:
+            return None
+        return CachedResponse(meta['url'], meta['headers'], content,
+                              stored_at)
+
+    def Put(self, key, url, resp):
+        """Store a response, if it can be revalidated or max_age is set.
+
+           Returns:
+             Whether the response was stored.
+        """
+        headers = dict((k.lower(), v) for k, v in resp.headers.items()
+                       if k.lower() in _KEPT_HEADERS)
+        if not self.max_age and not ('etag' in headers or
+                                     'last-modified' in headers):
+            return False
+        meta = json.dumps({'url': url, 'headers': headers})
+        self._store.Put(key, (_STORED_AT % self._clock()).encode('ascii') +
+                        meta.encode('utf-8') + b'\n' + resp.content)
+        return True
+
+    def Revalidated(self, key):
+        """Record that the server confirmed a cached response unchanged."""
+        if self.max_age:
+            self._store.Overwrite(
+                key, 0, (_STORED_AT % self._clock()).encode('ascii'))
+
+    def Fresh(self, cached):
+        """Whether a cached response can be used without revalidating."""
+        return bool(self.max_age) and \
+            self._clock() - cached.stored_at < self.max_age
+
+    def Size(self):
+        """Return the size of the cache directory in bytes."""
+        return self._store.Size()
+
+    def Clear(self):
+        """Remove every cached response."""
+        self._store.Clear()
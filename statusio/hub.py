@@ -0,0 +1,278 @@
+#!/usr/bin/env python
+
+"""Fan-out of polled status page data to many in-process consumers"""
+from __future__ import print_function
+
+import collections
+import threading
+import time
+
+from statusio import json
+from statusio.codes import status_code
+from statusio.errors import StatusioError
+from statusio.poller import Poller
+
+# Topics published for every polled page.
+SUMMARY = 'summary'        # every StatusSummary result
+INCIDENTS = 'incidents'    # the active incidents, when they change
+CHANGES = 'changes'        # component status changes
+TOPICS = (SUMMARY, INCIDENTS, CHANGES)
+
+# What to do when a subscriber's queue is full.
+DROP_OLDEST = 'drop_oldest'
+DROP_NEWEST = 'drop_newest'
+DISCONNECT = 'disconnect'
+_OVERFLOW = (DROP_OLDEST, DROP_NEWEST, DISCONNECT)
+
+
+class HubMessage(collections.namedtuple(
+        'HubMessage', 'statuspage_id topic data published_at')):
+    """A message delivered by a Hub.
+
+    data is the StatusSummary result for SUMMARY, the list of active
+    incidents for INCIDENTS and a list of (combo, old, new) status codes
+    for CHANGES, where combo is a (component, container) tuple.
+    """
+    __slots__ = ()
+
+
+class Subscription(object):
+    """A consumer's bounded queue of HubMessage.
+
+    Publishing never blocks: when the queue is full the subscription's
+    overflow policy drops the oldest or the newest message, counting it in
+    ``dropped``, or disconnects the subscriber.
+    """
+
+    def __init__(self, hub, statuspage_id, topics, maxsize, overflow):
+        if overflow not in _OVERFLOW:
+            raise StatusioError('Unknown overflow policy: %r' % (overflow,))
+        if isinstance(topics, (str, type(u''))):
+            topics = (topics,)
+        topics = frozenset(topics)
+        if not topics or not topics <= frozenset(TOPICS):
+            raise StatusioError('Unknown topics: %r' % (
+                sorted(topics - frozenset(TOPICS)) or topics,))
+        self.statuspage_id = statuspage_id
+        self.topics = topics
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.dropped = 0
+        self.closed = False
+        self._hub = hub
+        self._queue = collections.deque()
+        self._cond = threading.Condition()
+
+    def Get(self, timeout=None):
+        """Return the next message, waiting for one if needed.
+
+           Args:
+             timeout:
+               Maximum seconds to wait. Defaults to waiting forever.
+               [Optional]
+
+           Returns:
+             A HubMessage, or None on timeout or once the subscription is
+             closed and drained.
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        with self._cond:
+            while not self._queue:
+                if self.closed:
+                    return None
+                if deadline is None:
+                    self._cond.wait()
+                else:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        return None
+                    self._cond.wait(remaining)
+            return self._queue.popleft()
+
+    def Pending(self):
+        """Return the number of queued messages."""
+        with self._cond:
+            return len(self._queue)
+
+    def Close(self):
+        """Unsubscribe. Queued messages can still be read."""
+        self._hub.Unsubscribe(self)
+
+    def __iter__(self):
+        while True:
+            message = self.Get()
+            if message is None:
+                return
+            yield message
+
+    def _Put(self, message):
+        # Returns False if the subscriber was disconnected.
+        with self._cond:
+            if self.closed:
+                return True
+            if len(self._queue) >= self.maxsize:
+                self.dropped += 1
+                if self.overflow == DISCONNECT:
+                    self.closed = True
+                    self._cond.notify_all()
+                    return False
+                if self.overflow == DROP_NEWEST:
+                    return True
+                self._queue.popleft()
+            self._queue.append(message)
+            self._cond.notify()
+        return True
+
+    def _Close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+
+class Hub(object):
+    """One poller per status page, shared by many consumers.
+
+    Consumers subscribe to topics of a status page and read messages from
+    their own bounded queue. The page is polled (see statusio.Poller) while
+    it has at least one subscriber, however many there are, so subsystems
+    of one process no longer multiply API calls.
+
+    Example usage:
+
+        >>> hub = statusio.Hub(api, interval=30)
+        >>> hub.Start()
+        >>> alerts = hub.Subscribe(STATUSPAGE_ID, topics=['changes'])
+        >>> for message in alerts:
+        ...     print(message.data)
+    """
+
+    def __init__(self, api, maxsize=100, overflow=DROP_OLDEST, **kwargs):
+        """Instantiate a new statusio.Hub object.
+
+        Args:
+          api:
+            A statusio.Api instance.
+          maxsize:
+            Default queue size of a subscription. [Optional]
+          overflow:
+            Default overflow policy: DROP_OLDEST, DROP_NEWEST or
+            DISCONNECT. [Optional]
+          kwargs:
+            Passed to statusio.Poller, e.g. interval or busy_interval.
+        """
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.poller = Poller(api, callback=self.PublishSummary, **kwargs)
+        self._subscriptions = collections.defaultdict(list)
+        self._last = {}
+        self._lock = threading.Lock()
+
+    def Subscribe(self, statuspage_id, topics=TOPICS, maxsize=None,
+                  overflow=None):
+        """Subscribe to topics of a status page.
+
+           Args:
+             statuspage_id:
+               Status page ID
+             topics:
+               Topics to receive, of SUMMARY, INCIDENTS and CHANGES, or a
+               single one. [Optional]
+             maxsize:
+               Queue size, overriding the Hub's. [Optional]
+             overflow:
+               Overflow policy, overriding the Hub's. [Optional]
+
+           Returns:
+             A Subscription.
+        """
+        subscription = Subscription(self, statuspage_id, topics,
+                                    maxsize or self.maxsize,
+                                    overflow or self.overflow)
+        # Watch and Unwatch run under the lock, so a page with subscribers
+        # is always polled however Subscribe and Unsubscribe interleave.
+        with self._lock:
+            if not self._subscriptions[statuspage_id]:
+                self.poller.Watch(statuspage_id)
+            self._subscriptions[statuspage_id].append(subscription)
+        return subscription
+
+    def Unsubscribe(self, subscription):
+        """Remove a subscription, and stop polling its page if it was the
+           last one."""
+        subscription._Close()
+        statuspage_id = subscription.statuspage_id
+        with self._lock:
+            subscriptions = self._subscriptions.get(statuspage_id)
+            if subscriptions is None or subscription not in subscriptions:
+                return
+            subscriptions.remove(subscription)
+            if not subscriptions:
+                del self._subscriptions[statuspage_id]
+                self._last.pop(statuspage_id, None)
+                self.poller.Unwatch(statuspage_id)
+
+    def Subscribers(self, statuspage_id):
+        """Return the number of subscriptions to a status page."""
+        with self._lock:
+            return len(self._subscriptions.get(statuspage_id) or [])
+
+    def Publish(self, statuspage_id, topic, data):
+        """Deliver a message to the subscribers of a page and topic."""
+        message = HubMessage(statuspage_id, topic, data, time.time())
+        with self._lock:
+            subscriptions = [s for s in
+                             self._subscriptions.get(statuspage_id) or []
+                             if topic in s.topics]
+        for subscription in subscriptions:
+            if not subscription._Put(message):
+                print('Error: disconnected slow subscriber of %s'
+                      % statuspage_id)
+                self.Unsubscribe(subscription)
+
+    def PublishSummary(self, statuspage_id, summary):
+        """Publish a StatusSummary result and what changed since the last."""
+        summary = summary or {}
+        statuses = _Statuses(summary)
+        incidents = summary.get('incidents') or []
+        contents = _Incidents(incidents)
+        with self._lock:
+            last = self._last.get(statuspage_id)
+            self._last[statuspage_id] = (statuses, contents)
+        self.Publish(statuspage_id, SUMMARY, summary)
+        if last is None or last[1] != contents:
+            self.Publish(statuspage_id, INCIDENTS, incidents)
+        if last is not None:
+            changes = [(combo, last[0].get(combo), code)
+                       for combo, code in sorted(statuses.items())
+                       if last[0].get(combo) != code]
+            if changes:
+                self.Publish(statuspage_id, CHANGES, changes)
+
+    def Start(self):
+        """Start polling in the background."""
+        self.poller.Start()
+
+    def Stop(self):
+        """Stop polling and close all subscriptions."""
+        self.poller.Stop()
+        with self._lock:
+            subscriptions = [s for subs in self._subscriptions.values()
+                             for s in subs]
+        for subscription in subscriptions:
+            self.Unsubscribe(subscription)
+
+
+def _Statuses(summary):
+    statuses = {}
+    for component in summary.get('status') or []:
+        for container in component.get('containers') or []:
+            statuses[(component.get('id'), container.get('id'))] = \
+                status_code(container.get('status_code',
+                                          container.get('status')))
+    return statuses
+
+
+def _Incidents(incidents):
+    # Incident ID -> its content, so a new state or status is published too.
+    return dict((i.get('_id') or i.get('id'), json.dumps(i, sort_keys=True))
+                for i in incidents)
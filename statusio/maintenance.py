@@ -0,0 +1,395 @@
+#!/usr/bin/env python
+
+"""Maintenance windows and an interval index to query them by time"""
+from __future__ import division
+from __future__ import print_function
+
+import bisect
+import collections
+import datetime
+import re
+import threading
+import time
+from calendar import timegm
+
+from statusio.concurrency import run_concurrently
+from statusio.errors import StatusioError, check_result
+
+
+# Key used for windows that affect all infrastructure.
+ALL = '*'
+
+
+class MaintenanceWindow(collections.namedtuple(
+        'MaintenanceWindow',
+        'id name start end components containers state')):
+    """A maintenance window.
+
+    start and end are UNIX timestamps, components and containers tuples of
+    IDs. Empty components and containers mean all infrastructure is affected.
+    state is 'active', 'upcoming' or 'resolved', or None for new windows.
+    """
+    __slots__ = ()
+
+
+_DATETIME_RE = re.compile(
+    r'^(\d{4})[-/](\d{1,2})[-/](\d{1,2})'
+    r'(?:[T ](\d{1,2}):(\d{2})(?::(\d{2})(?:\.\d+)?)?)?'
+    r'\s*(Z|[+-]\d{2}:?\d{2})?$')
+
+
+def to_timestamp(value):
+    """Convert a date/time into a UNIX timestamp.
+
+       Args:
+         value:
+           A datetime (naive values are taken as UTC), a UNIX timestamp in
+           seconds or milliseconds, or a string such as
+           '2018-12-31T23:59:00.000Z', '2018-12-31 23:59' or '2018/12/31 23:59'.
+
+       Returns:
+         The UNIX timestamp as a float.
+    """
+    if isinstance(value, datetime.datetime):
+        if value.tzinfo is not None:
+            value = value.replace(tzinfo=None) - value.utcoffset()
+        return timegm(value.timetuple()) + value.microsecond / 1e6
+    if isinstance(value, datetime.date):
+        return float(timegm(value.timetuple()))
+    if isinstance(value, (int, float)):
+        # Status.io uses milliseconds in a few places.
+        return value / 1000.0 if value > 1e11 else float(value)
+    match = _DATETIME_RE.match(str(value).strip())
+    if not match:
+        raise StatusioError('Invalid date/time: %r' % (value,))
+    year, month, day, hour, minute, second, zone = match.groups()
+    stamp = timegm((int(year), int(month), int(day), int(hour or 0),
+                    int(minute or 0), int(second or 0), 0, 0, 0))
+    if zone and zone != 'Z':
+        offset = (int(zone[1:3]) * 60 + int(zone[-2:])) * 60
+        stamp -= offset if zone[0] == '+' else -offset
+    return float(stamp)
+
+
+def window_from_event(event, state=None):
+    """Build a MaintenanceWindow from a MaintenanceSingle result."""
+    return MaintenanceWindow(
+        event.get('_id'),
+        event.get('name'),
+        to_timestamp(event['datetime_planned_start']),
+        to_timestamp(event['datetime_planned_end']),
+        tuple(_ID(c) for c in event.get('components') or []),
+        tuple(_ID(c) for c in event.get('containers') or []),
+        state)
+
+
+def fetch_windows(api, statuspage_id, states=('active', 'upcoming'),
+                  max_workers=8):
+    """Fetch the maintenance windows of a status page.
+
+       Args:
+         api:
+           A statusio.Api instance.
+         statuspage_id:
+           Status page ID
+         states:
+           Maintenance states to include. [Optional]
+         max_workers:
+           Maximum number of MaintenanceSingle calls in flight. [Optional]
+
+       Returns:
+         A list of MaintenanceWindow.
+    """
+    listing = check_result(api.MaintenanceListByID(statuspage_id)) or {}
+    events, ids = [], []
+    for state in states:
+        for item in listing.get('%s_maintenances' % state) or []:
+            if isinstance(item, dict):
+                events.append((state, item))
+            else:
+                ids.append((state, item))
+    for (state, _), data, err in run_concurrently(
+            lambda i: check_result(api.MaintenanceSingle(statuspage_id, i[1])),
+            ids, max_workers):
+        if err is not None:
+            raise err
+        events.append((state, data))
+    return [window_from_event(e, state) for state, e in events]
+
+
+class IntervalIndex(object):
+    """An index of [start, end) intervals grouped by key.
+
+    Intervals of each key are kept sorted by start along with the running
+    maximum of their ends, so "is anything scheduled at t" and "does anything
+    overlap [start, end)" are answered with a single binary search.
+
+    Example usage:
+
+        >>> index = IntervalIndex()
+        >>> index.Add('component-id', 0, 3600, 'backup')
+        >>> index.Any('component-id', 1800)
+        True
+        >>> index.Overlapping('component-id', 3000, 7200)
+        ['backup']
+    """
+
+    def __init__(self, intervals=()):
+        """Instantiate a new IntervalIndex.
+
+        Args:
+          intervals:
+            An iterable of (key, start, end, value) tuples. [Optional]
+        """
+        self._keys = {}
+        for key, start, end, value in intervals:
+            self.Add(key, start, end, value)
+
+    def Add(self, key, start, end, value):
+        """Add the interval [start, end) under key."""
+        if end < start:
+            raise StatusioError('Interval ends before it starts')
+        entry = self._keys.get(key)
+        if entry is None:
+            entry = self._keys[key] = [[], [], [], []]
+        starts, ends, values, max_ends = entry
+        i = bisect.bisect_right(starts, start)
+        starts.insert(i, start)
+        ends.insert(i, end)
+        values.insert(i, value)
+        del max_ends[i:]
+        top = max_ends[-1] if max_ends else end
+        for j in range(i, len(starts)):
+            top = max(top, ends[j])
+            max_ends.append(top)
+
+    def Keys(self):
+        """Return the keys with at least one interval."""
+        return list(self._keys)
+
+    def Any(self, key, start, end=None):
+        """Whether any interval of key contains start, or overlaps [start, end).
+
+           Runs in O(log n).
+        """
+        entry = self._keys.get(key)
+        if entry is None:
+            return False
+        starts, _, _, max_ends = entry
+        i = self._Before(starts, start, end)
+        return i > 0 and max_ends[i - 1] > start
+
+    def Overlapping(self, key, start, end=None):
+        """List the values of intervals containing start, or overlapping [start, end).
+
+           Returns:
+             The matching values ordered by start.
+        """
+        entry = self._keys.get(key)
+        if entry is None:
+            return []
+        starts, ends, values, max_ends = entry
+        found = []
+        i = self._Before(starts, start, end) - 1
+        # max_ends never decreases, so stop once nothing earlier reaches start.
+        while i >= 0 and max_ends[i] > start:
+            if ends[i] > start:
+                found.append(values[i])
+            i -= 1
+        found.reverse()
+        return found
+
+    def __len__(self):
+        return sum(len(entry[0]) for entry in self._keys.values())
+
+    @staticmethod
+    def _Before(starts, start, end):
+        # Number of intervals starting before the query ends.
+        if end is None or end <= start:
+            return bisect.bisect_right(starts, start)
+        return bisect.bisect_left(starts, end)
+
+
+class _Snapshot(object):
+    # An immutable view of the maintenance windows at one point in time.
+
+    def __init__(self, windows, taken_at):
+        self.windows = windows
+        self.taken_at = taken_at
+        self.index = IntervalIndex()
+        for window in windows:
+            for key in window.components + window.containers or (ALL,):
+                self.index.Add(key, window.start, window.end, window)
+
+
+class MaintenanceIndex(object):
+    """Answer "is X under maintenance at time t" without calling the API.
+
+    The index is built from the active and upcoming maintenances of a status
+    page and keyed by component and container ID. Point and range queries
+    are binary searches on an in-memory snapshot. Refresh() builds a new
+    snapshot on the side and swaps it in with a single assignment, so
+    readers in other threads never see a half built index and never block.
+
+    Active maintenances count as ongoing until the next refresh even if they
+    overrun their planned end.
+
+    Example usage:
+
+        >>> index = statusio.MaintenanceIndex(api, STATUSPAGE_ID)
+        >>> index.Start(interval=60)
+        >>> if index.IsUnderMaintenance(component=COMPONENT):
+        ...     suppress_alert()
+    """
+
+    def __init__(self, api, statuspage_id, interval=60, max_workers=8):
+        """Instantiate a new statusio.MaintenanceIndex object.
+
+        Args:
+          api:
+            A statusio.Api instance.
+          statuspage_id:
+            Status page ID
+          interval:
+            Seconds between two refreshes when running in the background.
+            [Optional]
+          max_workers:
+            Maximum number of MaintenanceSingle calls in flight. [Optional]
+        """
+        self._api = api
+        self.statuspage_id = statuspage_id
+        self.interval = interval
+        self.max_workers = max_workers
+        self._snapshot = _Snapshot([], None)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def Refresh(self):
+        """Fetch the maintenance windows and swap in a new snapshot."""
+        windows = fetch_windows(self._api, self.statuspage_id,
+                                max_workers=self.max_workers)
+        self.Load(windows)
+
+    def Load(self, windows, taken_at=None):
+        """Swap in a snapshot built from a list of MaintenanceWindow."""
+        taken_at = time.time() if taken_at is None else taken_at
+        horizon = taken_at + self.interval
+        windows = [w._replace(end=max(w.end, horizon))
+                   if w.state == 'active' else w for w in windows]
+        self._snapshot = _Snapshot(windows, taken_at)
+
+    def Start(self, interval=None):
+        """Refresh in a background thread until Stop() is called."""
+        if interval is not None:
+            self.interval = interval
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._Run,
+                                        name='statusio-maintenance-index')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def Stop(self, timeout=None):
+        """Stop the background refresh thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def Age(self):
+        """Seconds since the current snapshot was taken, or None."""
+        taken_at = self._snapshot.taken_at
+        return None if taken_at is None else time.time() - taken_at
+
+    def IsUnderMaintenance(self, component=None, container=None, at=None,
+                           until=None):
+        """Whether a component and/or container is under maintenance.
+
+           Args:
+             component:
+               Component ID [Optional]
+             container:
+               Container ID [Optional]
+             at:
+               Time to check, anything to_timestamp() accepts. Defaults to
+               now. [Optional]
+             until:
+               Check the whole range [at, until) instead of a point in
+               time. [Optional]
+
+           Returns:
+             True if a maintenance window affects the infrastructure at that
+             time.
+        """
+        snapshot = self._snapshot
+        start, end = self._Range(at, until)
+        if component is not None and container is not None:
+            return bool(self._Combo(snapshot, component, container, start,
+                                    end, first=True))
+        index = snapshot.index
+        if index.Any(ALL, start, end):
+            return True
+        if component is None and container is None:
+            return any(index.Any(key, start, end) for key in index.Keys())
+        return index.Any(component if container is None else container,
+                         start, end)
+
+    def Windows(self, component=None, container=None, at=None, until=None):
+        """List the maintenance windows affecting infrastructure at a time.
+
+           Args are as for IsUnderMaintenance().
+
+           Returns:
+             A list of MaintenanceWindow ordered by start.
+        """
+        snapshot = self._snapshot
+        start, end = self._Range(at, until)
+        if component is not None and container is not None:
+            return self._Combo(snapshot, component, container, start, end)
+        index = snapshot.index
+        if component is None and container is None:
+            keys = index.Keys()
+        else:
+            keys = [ALL, component if container is None else container]
+        found = set()
+        for key in keys:
+            found.update(index.Overlapping(key, start, end))
+        return sorted(found, key=lambda w: (w.start, w.end))
+
+    def _Run(self):
+        while not self._stop.is_set():
+            try:
+                self.Refresh()
+            except Exception as e:
+                print('Error: ' + str(e))
+            self._stop.wait(self.interval)
+
+    @staticmethod
+    def _Range(at, until):
+        start = time.time() if at is None else to_timestamp(at)
+        end = None if until is None else to_timestamp(until)
+        return start, end
+
+    @staticmethod
+    def _Combo(snapshot, component, container, start, end, first=False):
+        # A window affects a combo when it lists both, or lists the
+        # component without narrowing it down to containers.
+        index = snapshot.index
+        found = index.Overlapping(ALL, start, end)
+        if found and first:
+            return found
+        if not index.Any(component, start, end):
+            return found
+        for window in index.Overlapping(component, start, end):
+            if not window.containers or container in window.containers:
+                found.append(window)
+                if first:
+                    break
+        return sorted(found, key=lambda w: (w.start, w.end))
+
+
+def _ID(item):
+    if isinstance(item, dict):
+        return item.get('_id') or item.get('id')
+    return item
@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+
+"""A permanent cache of incident and maintenance messages"""
+from __future__ import print_function
+
+import collections
+import os
+import threading
+
+from statusio import json
+from statusio.concurrency import run_concurrently
+from statusio.diskstore import DiskStore
+from statusio.errors import StatusioError, check_result
+
+# Message kind -> Api method fetching one message.
+_ENDPOINTS = {
+    'incident': 'IncidentMessage',
+    'maintenance': 'MaintenanceMessage',
+}
+
+
+class MessageCache(object):
+    """Incident and maintenance messages, fetched once and kept.
+
+    A published message never changes, so cached messages never expire.
+    The most recently used ``maxsize`` are kept in memory; given a
+    ``directory``, every message is also stored on disk and survives
+    restarts. Failed fetches are not cached.
+
+    Example usage:
+
+        >>> messages = statusio.MessageCache(api, directory='~/.statusio')
+        >>> messages.Get(STATUSPAGE_ID, message_id)
+        >>> messages.GetMany(STATUSPAGE_ID, message_ids, kind='maintenance')
+    """
+
+    def __init__(self, api, maxsize=1000, directory=None, max_workers=8):
+        """Instantiate a new statusio.MessageCache object.
+
+        Args:
+          api:
+            A statusio.Api instance.
+          maxsize:
+            Number of messages kept in memory. [Optional]
+          directory:
+            Directory storing the messages on disk. [Optional]
+          max_workers:
+            Maximum number of messages fetched at once by GetMany.
+            [Optional]
+        """
+        self._api = api
+        self.maxsize = maxsize
+        self.max_workers = max_workers
+        self._store = None
+        if directory is not None:
+            self._store = DiskStore(os.path.expanduser(directory))
+        self._messages = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def Get(self, statuspage_id, message_id, kind='incident'):
+        """Return a message, fetching it if it is not cached.
+
+           Args:
+             statuspage_id:
+               Status page ID
+             message_id:
+               Message ID
+             kind:
+               'incident' or 'maintenance'. [Optional]
+
+           Returns:
+             The message result.
+        """
+        message = self.Cached(statuspage_id, message_id, kind)
+        if message is None:
+            message = self._Fetch(statuspage_id, message_id, kind)
+        return message
+
+    def GetMany(self, statuspage_id, message_ids, kind='incident'):
+        """Return many messages, fetching the ones not cached concurrently.
+
+           Args:
+             statuspage_id:
+               Status page ID
+             message_ids:
+               Message IDs, duplicates allowed.
+             kind:
+               'incident' or 'maintenance'. [Optional]
+
+           Returns:
+             A dict mapping message IDs to messages. Messages that failed
+             to fetch are left out.
+        """
+        messages = {}
+        misses = []
+        seen = set()
+        for message_id in message_ids:
+            if message_id in seen:
+                continue
+            seen.add(message_id)
+            message = self.Cached(statuspage_id, message_id, kind)
+            if message is None:
+                misses.append(message_id)
+            else:
+                messages[message_id] = message
+        results = run_concurrently(
+            lambda i: self._Fetch(statuspage_id, i, kind), misses,
+            self.max_workers)
+        for message_id, message, err in results:
+            if err is None:
+                messages[message_id] = message
+            else:
+                print('Error: %s: %s' % (message_id, err))
+        return messages
+
+    def Cached(self, statuspage_id, message_id, kind='incident'):
+        """Return a message if it is cached, without fetching it."""
+        key = _Key(kind, statuspage_id, message_id)
+        with self._lock:
+            message = self._messages.pop(key, None)
+            if message is not None:
+                self._messages[key] = message
+        if message is None and self._store is not None:
+            data = self._store.Get(key)
+            if data is not None:
+                message = json.loads(data.decode('utf-8'))
+                self._Put(key, message, store=False)
+        if message is not None:
+            stats = getattr(self._api, 'stats', None)
+            if stats is not None:
+                stats.Increment(_Endpoint(kind), 'cache_hits')
+        return message
+
+    def __len__(self):
+        with self._lock:
+            return len(self._messages)
+
+    def _Fetch(self, statuspage_id, message_id, kind):
+        message = check_result(getattr(self._api, _Endpoint(kind))(
+            statuspage_id, message_id))
+        self._Put(_Key(kind, statuspage_id, message_id), message)
+        return message
+
+    def _Put(self, key, message, store=True):
+        if store and self._store is not None:
+            self._store.Put(key, json.dumps(message).encode('utf-8'))
+        with self._lock:
+            self._messages.pop(key, None)
+            self._messages[key] = message
+            while len(self._messages) > self.maxsize:
+                self._messages.popitem(last=False)
+
+
+def _Endpoint(kind):
+    if kind not in _ENDPOINTS:
+        raise StatusioError('Unknown message kind: %r' % (kind,))
+    return _ENDPOINTS[kind]
+
+
+def _Key(kind, statuspage_id, message_id):
+    return '%s/%s/%s' % (kind, statuspage_id, message_id)
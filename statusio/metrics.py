@@ -0,0 +1,249 @@
+#!/usr/bin/env python
+
+"""Backfill of custom metrics from large time series files"""
+from __future__ import division
+
+import csv
+import io
+import mmap
+import os
+import struct
+import time
+from array import array
+
+from statusio.bulk import BulkReport
+from statusio.concurrency import run_concurrently
+from statusio.errors import check_result
+from statusio.maintenance import to_timestamp
+
+# Default record of binary time series: UNIX timestamp and value, both
+# little endian doubles.
+BINARY_RECORD = struct.Struct('<dd')
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+# Hourly buckets kept, the month graph covers 30 days.
+_HOURS = 30 * 24
+
+
+def read_binary(path, record=BINARY_RECORD, chunk_size=1 << 20):
+    """Yield (timestamp, value) pairs from a binary time series file.
+
+       The file is memory mapped and decoded a chunk at a time, so only the
+       chunk being decoded is ever copied into memory.
+
+       Args:
+         path:
+           File of fixed size records.
+         record:
+           struct.Struct of a record. Its first two fields are the UNIX
+           timestamp and the value, any others are ignored. [Optional]
+         chunk_size:
+           Approximate number of bytes decoded at a time. [Optional]
+    """
+    size = os.path.getsize(path)
+    if not size:
+        return
+    step = max(1, chunk_size // record.size) * record.size
+    usable = size - size % record.size
+    with io.open(path, 'rb') as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            for offset in range(0, usable, step):
+                chunk = data[offset:min(offset + step, usable)]
+                for fields in _iter_unpack(record, chunk):
+                    yield fields[0], fields[1]
+        finally:
+            data.close()
+
+
+def _iter_unpack(record, chunk):
+    if hasattr(record, 'iter_unpack'):
+        return record.iter_unpack(chunk)
+    return (record.unpack_from(chunk, offset)
+            for offset in range(0, len(chunk), record.size))
+
+
+def read_csv(path, time_column=0, value_column=1):
+    """Yield (timestamp, value) pairs from a CSV file, one row at a time.
+
+       Rows whose value is not a number, such as a header, are skipped.
+
+       Args:
+         path:
+           CSV file.
+         time_column:
+           Index of the column holding the time, as a UNIX timestamp or
+           anything statusio.maintenance.to_timestamp() accepts. [Optional]
+         value_column:
+           Index of the column holding the value. [Optional]
+    """
+    with io.open(path, newline='') as f:
+        for row in csv.reader(f):
+            try:
+                value = float(row[value_column])
+            except (IndexError, ValueError):
+                continue
+            stamp = row[time_column]
+            try:
+                stamp = float(stamp)
+            except ValueError:
+                stamp = to_timestamp(stamp)
+            yield stamp, value
+
+
+class MetricBuckets(object):
+    """Hourly sums and counts of a metric over the 30 days before ``end``.
+
+    Samples are added in a single pass; the day, week and month series
+    Api.MetricUpdate takes are derived from the hourly buckets, so the
+    memory used does not depend on the number of samples.
+    """
+
+    def __init__(self, end=None):
+        """Instantiate a new statusio.metrics.MetricBuckets object.
+
+        Args:
+          end:
+            End of the time frame as a UNIX timestamp, rounded up to the
+            hour. Defaults to now. [Optional]
+        """
+        end = time.time() if end is None else to_timestamp(end)
+        self.end = int(-(-end // HOUR)) * HOUR
+        self.start = self.end - _HOURS * HOUR
+        self.sums = array('d', [0.0]) * _HOURS
+        self.counts = array('L', [0]) * _HOURS
+        self.dropped = 0
+
+    def Add(self, pairs):
+        """Add an iterable of (timestamp, value) pairs.
+
+           Samples outside of the time frame are counted in ``dropped``.
+        """
+        # Hot loop, locals only.
+        sums, counts = self.sums, self.counts
+        start, end = self.start, self.end
+        dropped = 0
+        for stamp, value in pairs:
+            if start <= stamp < end:
+                hour = int((stamp - start) // HOUR)
+                sums[hour] += value
+                counts[hour] += 1
+            else:
+                dropped += 1
+        self.dropped += dropped
+
+    def Series(self, hours, size):
+        """Return the (start, values, average) of the last hours hours.
+
+           The hours are grouped into size buckets, each valued at the mean
+           of its samples or 0 without any.
+        """
+        first = _HOURS - hours
+        per = hours // size
+        values = []
+        total = count = 0
+        for bucket in range(size):
+            lo = first + bucket * per
+            s = sum(self.sums[lo:lo + per])
+            n = sum(self.counts[lo:lo + per])
+            values.append(round(s / n, 4) if n else 0.0)
+            total += s
+            count += n
+        average = round(total / count, 4) if count else 0.0
+        return self.start + first * HOUR, values, average
+
+    def Args(self):
+        """Return the Api.MetricUpdate arguments other than the IDs."""
+        args = {}
+        for name, hours, size in (('day', 24, 24), ('week', 7 * 24, 7),
+                                  ('month', _HOURS, 30)):
+            start, values, average = self.Series(hours, size)
+            step = hours // size * HOUR
+            args.update({
+                '%s_avg' % name: average,
+                '%s_start' % name: int(start * 1000),
+                '%s_dates' % name: [_Format(start + i * step)
+                                    for i in range(size)],
+                '%s_values' % name: values,
+            })
+        return args
+
+
+def _Format(stamp):
+    return time.strftime('%Y-%m-%dT%H:%M:%S+00:00', time.gmtime(stamp))
+
+
+class MetricBackfill(object):
+    """Push history from time series files to many metrics in parallel.
+
+    Each source is streamed once into hourly buckets (see MetricBuckets),
+    so files far larger than memory can be used. Sources ending in .csv are
+    read with read_csv(), other paths with read_binary(); any other source
+    must be an iterable of (timestamp, value) pairs.
+
+    Example usage:
+
+        >>> backfill = statusio.MetricBackfill(api, STATUSPAGE_ID)
+        >>> report = backfill.Backfill({METRIC_ID: '/data/latency.bin',
+        ...                             METRIC_ID2: '/data/errors.csv'})
+        >>> report.failed
+    """
+
+    def __init__(self, api, statuspage_id, max_workers=8, end=None):
+        """Instantiate a new statusio.MetricBackfill object.
+
+        Args:
+          api:
+            A statusio.Api instance.
+          statuspage_id:
+            Status page ID
+          max_workers:
+            Maximum number of metrics processed at once. [Optional]
+          end:
+            End of the time frame, see MetricBuckets. [Optional]
+        """
+        self._api = api
+        self.statuspage_id = statuspage_id
+        self.max_workers = max_workers
+        self.end = end
+
+    def Aggregate(self, source):
+        """Return the MetricBuckets of a source."""
+        if isinstance(source, (str, type(u''))):
+            source = read_csv(source) if source.endswith('.csv') \
+                else read_binary(source)
+        buckets = MetricBuckets(self.end)
+        buckets.Add(source)
+        return buckets
+
+    def Backfill(self, sources, dry_run=False):
+        """Aggregate every source and update its metric.
+
+           Args:
+             sources:
+               Dict of metric ID to source.
+             dry_run:
+               Only aggregate, do not call the API. [Optional]
+
+           Returns:
+             A BulkReport with metric IDs as ``item``. Its succeeded entries
+             hold the MetricUpdate arguments on a dry run, the API result
+             otherwise.
+        """
+        def push(metric_id):
+            args = self.Aggregate(sources[metric_id]).Args()
+            if dry_run:
+                return args
+            return check_result(self._api.MetricUpdate(
+                self.statuspage_id, metric_id, **args))
+
+        report = BulkReport()
+        for metric_id, result, err in run_concurrently(
+                push, sorted(sources), self.max_workers):
+            if err is None:
+                report.succeeded.append({'item': metric_id, 'result': result})
+            else:
+                report.failed.append({'item': metric_id, 'error': str(err)})
+        return report
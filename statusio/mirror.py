@@ -0,0 +1,376 @@
+#!/usr/bin/env python
+
+"""A local SQLite mirror of a Status.io status page"""
+from __future__ import division
+from __future__ import print_function
+
+import sqlite3
+import threading
+import time
+
+from statusio import json
+from statusio.errors import StatusioError, check_result
+
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS components (
+    statuspage_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    name TEXT,
+    data TEXT,
+    PRIMARY KEY (statuspage_id, id)
+);
+CREATE INDEX IF NOT EXISTS components_name
+    ON components (statuspage_id, name);
+
+CREATE TABLE IF NOT EXISTS containers (
+    statuspage_id TEXT NOT NULL,
+    component_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    name TEXT,
+    PRIMARY KEY (statuspage_id, component_id, id)
+);
+CREATE INDEX IF NOT EXISTS containers_name
+    ON containers (statuspage_id, name);
+
+CREATE TABLE IF NOT EXISTS incidents (
+    statuspage_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    state TEXT,
+    name TEXT,
+    data TEXT,
+    PRIMARY KEY (statuspage_id, id)
+);
+CREATE INDEX IF NOT EXISTS incidents_state
+    ON incidents (statuspage_id, state);
+
+CREATE TABLE IF NOT EXISTS maintenances (
+    statuspage_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    state TEXT,
+    name TEXT,
+    start TEXT,
+    end TEXT,
+    data TEXT,
+    PRIMARY KEY (statuspage_id, id)
+);
+CREATE INDEX IF NOT EXISTS maintenances_state
+    ON maintenances (statuspage_id, state);
+CREATE INDEX IF NOT EXISTS maintenances_start
+    ON maintenances (statuspage_id, start);
+
+CREATE TABLE IF NOT EXISTS subscribers (
+    statuspage_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    method TEXT,
+    address TEXT,
+    data TEXT,
+    PRIMARY KEY (statuspage_id, id)
+);
+CREATE INDEX IF NOT EXISTS subscribers_method
+    ON subscribers (statuspage_id, method);
+CREATE INDEX IF NOT EXISTS subscribers_address
+    ON subscribers (statuspage_id, address);
+
+CREATE TABLE IF NOT EXISTS summary (
+    statuspage_id TEXT PRIMARY KEY,
+    data TEXT
+);
+
+CREATE TABLE IF NOT EXISTS sync_state (
+    statuspage_id TEXT PRIMARY KEY,
+    synced_at REAL,
+    duration REAL,
+    error TEXT
+);
+'''
+
+# Incidents and maintenances in these states are final, so once mirrored they
+# are not fetched again.
+_FINAL_STATES = ('resolved',)
+
+
+class Mirror(object):
+    """Keep a local SQLite copy of a status page.
+
+    The mirror is written by a single syncing process and can be read by any
+    number of local processes at the same time without touching the API.
+
+    Example usage:
+
+        >>> mirror = statusio.Mirror(api, STATUSPAGE_ID, '/var/cache/status.db')
+        >>> mirror.Start(interval=60)
+        >>> mirror.Components()
+        >>> mirror.Lag()
+
+      Readers only need the file:
+
+        >>> mirror = statusio.Mirror(None, STATUSPAGE_ID, '/var/cache/status.db')
+        >>> mirror.Incidents(state='active')
+    """
+
+    def __init__(self, api, statuspage_id, path, interval=60):
+        """Instantiate a new statusio.Mirror object.
+
+        Args:
+          api:
+            A statusio.Api instance used to sync. May be None for read only
+            mirrors.
+          statuspage_id:
+            Status page ID
+          path:
+            Path of the SQLite database file.
+          interval:
+            Seconds between two syncs when running in the background. [Optional]
+        """
+        self._api = api
+        self.statuspage_id = statuspage_id
+        self.path = path
+        self.interval = interval
+        self._local = threading.local()
+        self._stop = threading.Event()
+        self._thread = None
+        with self._Connection() as conn:
+            conn.executescript(_SCHEMA)
+
+    def Sync(self):
+        """Fetch the status page from the API and replace the mirrored copy.
+
+           Returns:
+             The number of seconds the sync took.
+        """
+        if self._api is None:
+            raise StatusioError('Mirror is read only')
+        sp = self.statuspage_id
+        started = time.time()
+        try:
+            components = check_result(self._api.ComponentList(sp)) or []
+            incidents = self._FetchEvents(
+                'incidents', check_result(self._api.IncidentListByID(sp)),
+                self._api.IncidentSingle)
+            maintenances = self._FetchEvents(
+                'maintenances', check_result(self._api.MaintenanceListByID(sp)),
+                self._api.MaintenanceSingle)
+            subscribers = check_result(self._api.SubscriberList(sp)) or {}
+            summary = check_result(self._api.StatusSummary(sp))
+        except Exception as e:
+            self._RecordSync(started, error=str(e))
+            raise
+        conn = self._Connection()
+        with conn:
+            self._WriteComponents(conn, components)
+            self._WriteEvents(conn, 'incidents', incidents)
+            self._WriteEvents(conn, 'maintenances', maintenances)
+            self._WriteSubscribers(conn, subscribers)
+            conn.execute('INSERT OR REPLACE INTO summary VALUES (?, ?)',
+                         (sp, json.dumps(summary)))
+        return self._RecordSync(started)
+
+    def Start(self, interval=None):
+        """Sync in a background thread until Stop() is called.
+
+           Args:
+             interval:
+               Seconds between two syncs. Defaults to the constructor value.
+               [Optional]
+        """
+        if interval is not None:
+            self.interval = interval
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._Run,
+                                        name='statusio-mirror')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def Stop(self, timeout=None):
+        """Stop the background sync thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def Lag(self):
+        """Seconds since the last successful sync, or None if never synced."""
+        state = self.SyncState()
+        if state['synced_at'] is None:
+            return None
+        return max(0.0, time.time() - state['synced_at'])
+
+    def SyncState(self):
+        """Show the state of the last sync.
+
+           Returns:
+             A dict with the ``synced_at`` time of the last successful sync,
+             its ``duration``, the current ``lag`` and the ``error`` of the
+             last failed sync, if any.
+        """
+        row = self._Connection().execute(
+            'SELECT synced_at, duration, error FROM sync_state '
+            'WHERE statuspage_id = ?', (self.statuspage_id,)).fetchone()
+        synced_at, duration, error = row or (None, None, None)
+        return {
+            'synced_at': synced_at,
+            'duration': duration,
+            'lag': None if synced_at is None else time.time() - synced_at,
+            'error': error,
+        }
+
+    def Components(self, name=None):
+        """List mirrored components, optionally filtered by name."""
+        return self._Select('components', name=name)
+
+    def Containers(self, name=None):
+        """List mirrored containers as dicts, optionally filtered by name."""
+        query = ('SELECT component_id, id, name FROM containers '
+                 'WHERE statuspage_id = ?')
+        args = [self.statuspage_id]
+        if name is not None:
+            query += ' AND name = ?'
+            args.append(name)
+        return [{'component_id': c, '_id': i, 'name': n}
+                for c, i, n in self._Connection().execute(query, args)]
+
+    def Incidents(self, state=None):
+        """List mirrored incidents, optionally filtered by state.
+
+           Args:
+             state:
+               Either 'active' or 'resolved'. [Optional]
+        """
+        return self._Select('incidents', state=state)
+
+    def Maintenances(self, state=None):
+        """List mirrored maintenances, optionally filtered by state.
+
+           Args:
+             state:
+               One of 'active', 'upcoming' or 'resolved'. [Optional]
+        """
+        return self._Select('maintenances', state=state, order='start')
+
+    def Subscribers(self, method=None):
+        """List mirrored subscribers, optionally filtered by method."""
+        return self._Select('subscribers', method=method)
+
+    def Summary(self):
+        """Return the mirrored status summary, or None if never synced."""
+        row = self._Connection().execute(
+            'SELECT data FROM summary WHERE statuspage_id = ?',
+            (self.statuspage_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def Close(self):
+        """Close the connection of the calling thread."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def _Run(self):
+        while not self._stop.is_set():
+            try:
+                self.Sync()
+            except Exception as e:
+                print('Error: ' + str(e))
+            self._stop.wait(self.interval)
+
+    def _Connection(self):
+        # sqlite3 connections can not be shared between threads.
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _Select(self, table, order=None, **filters):
+        query = 'SELECT data FROM %s WHERE statuspage_id = ?' % table
+        args = [self.statuspage_id]
+        for column, value in sorted(filters.items()):
+            if value is not None:
+                query += ' AND %s = ?' % column
+                args.append(value)
+        if order:
+            query += ' ORDER BY %s' % order
+        return [json.loads(data)
+                for (data,) in self._Connection().execute(query, args)]
+
+    def _FetchEvents(self, table, result, single):
+        """Resolve an ID listing into (state, event) pairs.
+
+        Events that are already mirrored in a final state are reused instead
+        of fetched again.
+        """
+        known = dict(self._Connection().execute(
+            'SELECT id, data FROM %s WHERE statuspage_id = ? AND state IN (%s)'
+            % (table, ','.join('?' * len(_FINAL_STATES))),
+            (self.statuspage_id,) + _FINAL_STATES).fetchall())
+        events = []
+        for key, items in sorted((result or {}).items()):
+            state = key.split('_')[0]
+            for item in items or []:
+                if isinstance(item, dict):
+                    events.append((state, item))
+                elif state in _FINAL_STATES and item in known:
+                    events.append((state, json.loads(known[item])))
+                else:
+                    event = check_result(single(self.statuspage_id, item))
+                    events.append((state, event or {'_id': item}))
+        return events
+
+    def _WriteComponents(self, conn, components):
+        sp = self.statuspage_id
+        conn.execute('DELETE FROM components WHERE statuspage_id = ?', (sp,))
+        conn.execute('DELETE FROM containers WHERE statuspage_id = ?', (sp,))
+        conn.executemany(
+            'INSERT OR REPLACE INTO components VALUES (?, ?, ?, ?)',
+            [(sp, c['_id'], c.get('name'), json.dumps(c)) for c in components])
+        conn.executemany(
+            'INSERT OR REPLACE INTO containers VALUES (?, ?, ?, ?)',
+            [(sp, c['_id'], k['_id'], k.get('name'))
+             for c in components for k in c.get('containers') or []])
+
+    def _WriteEvents(self, conn, table, events):
+        sp = self.statuspage_id
+        conn.execute('DELETE FROM %s WHERE statuspage_id = ?' % table, (sp,))
+        if table == 'incidents':
+            rows = [(sp, e['_id'], state, e.get('name'), json.dumps(e))
+                    for state, e in events]
+        else:
+            rows = [(sp, e['_id'], state, e.get('name'),
+                     e.get('datetime_planned_start'),
+                     e.get('datetime_planned_end'), json.dumps(e))
+                    for state, e in events]
+        if rows:
+            conn.executemany(
+                'INSERT OR REPLACE INTO %s VALUES (%s)'
+                % (table, ', '.join('?' * len(rows[0]))), rows)
+
+    def _WriteSubscribers(self, conn, subscribers):
+        sp = self.statuspage_id
+        conn.execute('DELETE FROM subscribers WHERE statuspage_id = ?', (sp,))
+        conn.executemany(
+            'INSERT OR REPLACE INTO subscribers VALUES (?, ?, ?, ?, ?)',
+            [(sp, s['_id'], method, s.get('address'), json.dumps(s))
+             for method, items in sorted(subscribers.items())
+             for s in items or []])
+
+    def _RecordSync(self, started, error=None):
+        duration = time.time() - started
+        conn = self._Connection()
+        with conn:
+            if error is None:
+                conn.execute(
+                    'INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?, NULL)',
+                    (self.statuspage_id, time.time(), duration))
+            else:
+                conn.execute(
+                    'INSERT OR IGNORE INTO sync_state (statuspage_id) '
+                    'VALUES (?)', (self.statuspage_id,))
+                conn.execute(
+                    'UPDATE sync_state SET error = ? WHERE statuspage_id = ?',
+                    (error, self.statuspage_id))
+        return duration
@@ -0,0 +1,243 @@
+#!/usr/bin/env python
+
+"""Polling many status pages from a single scheduling thread"""
+from __future__ import division
+from __future__ import print_function
+
+import heapq
+import itertools
+import random
+import threading
+import time
+
+from statusio.concurrency import run_concurrently
+from statusio.errors import check_result
+
+# Spreads the first polls of new pages evenly over the interval, however
+# many pages there are.
+_GOLDEN = 0.6180339887498949
+
+
+class Poller(object):
+    """Poll StatusSummary for many status pages, spread out in time.
+
+    Due polls are kept in a heap and run by one scheduling thread on a small
+    pool of workers. New pages get evenly spread first polls and every poll
+    is rescheduled with random jitter, so pages never line up into bursts.
+
+    Intervals adapt per page: a page with active incidents or any component
+    not operational is polled every ``busy_interval`` seconds, and once it
+    is quiet again the interval doubles back up to the page's own interval.
+    Failed polls back off up to ``max_interval``.
+
+    Example usage:
+
+        >>> cache = statusio.StatusCache()
+        >>> poller = statusio.Poller(api, cache=cache, interval=60)
+        >>> for statuspage_id in STATUSPAGE_IDS:
+        ...     poller.Watch(statuspage_id)
+        >>> poller.Start()
+    """
+
+    def __init__(self,
+                 api,
+                 callback=None,
+                 cache=None,
+                 interval=60,
+                 busy_interval=10,
+                 max_interval=None,
+                 jitter=0.1,
+                 max_workers=8,
+                 clock=time.time):
+        """Instantiate a new statusio.Poller object.
+
+        Args:
+          api:
+            A statusio.Api instance.
+          callback:
+            Called with (statuspage_id, summary) after every successful
+            poll. [Optional]
+          cache:
+            A statusio.StatusCache seeded with every summary. [Optional]
+          interval:
+            Default seconds between polls of a quiet page. [Optional]
+          busy_interval:
+            Seconds between polls of a page with trouble. [Optional]
+          max_interval:
+            Longest interval after failed polls. Defaults to four times
+            interval. [Optional]
+          jitter:
+            Fraction by which each interval is randomly varied. [Optional]
+          max_workers:
+            Maximum number of polls in flight. [Optional]
+          clock:
+            Function returning the time in seconds. [Optional]
+        """
+        self._api = api
+        self.callback = callback
+        self.cache = cache
+        self.interval = interval
+        self.busy_interval = busy_interval
+        self.max_interval = max_interval or 4 * interval
+        self.jitter = jitter
+        self.max_workers = max_workers
+        self._clock = clock
+        self._random = random.Random()
+        self._pages = {}
+        self._heap = []
+        self._sequence = itertools.count()
+        self._spread = itertools.count(1)
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopped = False
+
+    def Watch(self, statuspage_id, interval=None):
+        """Start polling a status page.
+
+           Args:
+             statuspage_id:
+               Status page ID
+             interval:
+               Seconds between polls while the page is quiet, overriding
+               the Poller's. [Optional]
+        """
+        base = interval or self.interval
+        with self._cond:
+            first = (next(self._spread) * _GOLDEN) % 1 * base
+            self._pages[statuspage_id] = {'base': base, 'interval': base}
+            self._Schedule(statuspage_id, self._clock() + first)
+
+    def Unwatch(self, statuspage_id):
+        """Stop polling a status page."""
+        with self._cond:
+            self._pages.pop(statuspage_id, None)
+
+    def Watched(self):
+        """Return the IDs of the polled status pages."""
+        with self._cond:
+            return list(self._pages)
+
+    def Interval(self, statuspage_id):
+        """Return the current interval of a status page, or None."""
+        with self._cond:
+            page = self._pages.get(statuspage_id)
+            return page and page['interval']
+
+    def NextPoll(self, statuspage_id):
+        """Return the time of the next poll of a status page, or None."""
+        with self._cond:
+            page = self._pages.get(statuspage_id)
+            return page and page['due']
+
+    def RunDue(self):
+        """Poll every page that is due now.
+
+           Returns:
+             The list of status page IDs polled.
+        """
+        with self._cond:
+            due = self._PopDue(self._clock())
+        results = run_concurrently(
+            lambda i: check_result(self._api.StatusSummary(i)),
+            due, self.max_workers)
+        for statuspage_id, summary, err in results:
+            if err is None:
+                if self.cache is not None:
+                    self.cache.Seed(statuspage_id, summary or {})
+                if self.callback is not None:
+                    try:
+                        self.callback(statuspage_id, summary)
+                    except Exception as e:
+                        print('Error: ' + str(e))
+            else:
+                print('Error: %s: %s' % (statuspage_id, err))
+            with self._cond:
+                page = self._pages.get(statuspage_id)
+                if page is not None:
+                    page['interval'] = self._Adapt(page, summary, err)
+                    self._Schedule(statuspage_id, self._clock() + self._Jitter(
+                        page['interval']))
+        return due
+
+    def Start(self):
+        """Poll in a background thread until Stop() is called."""
+        with self._cond:
+            if self._thread is not None:
+                return
+            self._stopped = False
+            self._thread = threading.Thread(target=self._Run,
+                                            name='statusio-poller')
+            self._thread.daemon = True
+            self._thread.start()
+
+    def Stop(self):
+        """Stop the background thread."""
+        with self._cond:
+            thread, self._thread = self._thread, None
+            self._stopped = True
+            self._cond.notify()
+        if thread is not None:
+            thread.join()
+
+    def _Run(self):
+        while True:
+            with self._cond:
+                while not self._stopped:
+                    wait = self._Wait()
+                    if wait is not None and wait <= 0:
+                        break
+                    self._cond.wait(wait)
+                if self._stopped:
+                    return
+            self.RunDue()
+
+    def _Wait(self):
+        # Seconds until the next valid heap entry is due, None if none.
+        while self._heap:
+            due, seq, statuspage_id = self._heap[0]
+            page = self._pages.get(statuspage_id)
+            if page is not None and page['seq'] == seq:
+                return due - self._clock()
+            heapq.heappop(self._heap)
+        return None
+
+    def _PopDue(self, now):
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            _, seq, statuspage_id = heapq.heappop(self._heap)
+            page = self._pages.get(statuspage_id)
+            if page is not None and page['seq'] == seq:
+                page['due'] = None
+                due.append(statuspage_id)
+        return due
+
+    def _Schedule(self, statuspage_id, due):
+        page = self._pages[statuspage_id]
+        page['seq'] = next(self._sequence)
+        page['due'] = due
+        heapq.heappush(self._heap, (due, page['seq'], statuspage_id))
+        self._cond.notify()
+
+    def _Jitter(self, interval):
+        return interval * (1 + self.jitter * self._random.uniform(-1, 1))
+
+    def _Adapt(self, page, summary, err):
+        if err is not None:
+            return min(self.max_interval, page['interval'] * 2)
+        if _Busy(summary or {}):
+            return min(self.busy_interval, page['base'])
+        return min(page['base'], page['interval'] * 2)
+
+
+def _Busy(summary):
+    if summary.get('incidents'):
+        return True
+    for component in summary.get('status') or []:
+        for container in component.get('containers') or [component]:
+            code = container.get('status_code', container.get('status'))
+            try:
+                if int(code) > 100:
+                    return True
+            except (TypeError, ValueError):
+                pass
+    return False
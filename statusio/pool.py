@@ -0,0 +1,200 @@
+#!/usr/bin/env python
+
+"""Api clients for several Status.io accounts, routed by status page"""
+
+import threading
+
+from statusio.api import Api, _ENDPOINTS
+from statusio.concurrency import run_concurrently
+from statusio.errors import StatusioError
+from statusio.ratelimit import RateLimiter
+
+# Api methods taking the status page ID first, routed by ClientPool.
+_ROUTED = frozenset(name for _, _, name in _ENDPOINTS)
+
+# Api arguments that would make accounts share a budget or connections if
+# one instance were given to the whole pool.
+_PER_ACCOUNT = ('rate_limiter', 'scheduler', 'concurrency_limiter')
+
+
+class ClientPool(object):
+    """One statusio.Api per account, with calls routed by status page.
+
+    Every account has its own Api, so its own connection pool and, given a
+    rate, its own rate limiter: one busy account never uses up another's
+    quota. Calling any endpoint method on the pool calls it on the Api of
+    the account owning the status page passed first.
+
+    Example usage:
+
+        >>> pool = statusio.ClientPool()
+        >>> pool.AddAccount('eu', EU_API_ID, EU_API_KEY, [EU_PAGE], rate=5)
+        >>> pool.AddAccount('us', US_API_ID, US_API_KEY, [US_PAGE], rate=5)
+        >>> pool.IncidentList(US_PAGE)
+        >>> for page, summary, err in pool.FanOut('StatusSummary'):
+        ...     print(page, err or summary['result'])
+    """
+
+    def __init__(self, max_workers=8, **kwargs):
+        """Instantiate a new statusio.ClientPool object.
+
+        Args:
+          max_workers:
+            Maximum number of FanOut calls in flight per account.
+            [Optional]
+          kwargs:
+            Passed to every statusio.Api, e.g. pool_size. Transports are
+            given by name so that every account gets its own; limiters and
+            schedulers are given per account to AddAccount(). [Optional]
+        """
+        for name in _PER_ACCOUNT:
+            if kwargs.get(name) is not None:
+                raise StatusioError('%s is per account, pass it to '
+                                    'AddAccount()' % name)
+        if not isinstance(kwargs.get('transport') or '', (str, type(u''))):
+            raise StatusioError('A transport shared by all accounts must be '
+                                'given by name')
+        self.max_workers = max_workers
+        self._kwargs = kwargs
+        self._accounts = {}
+        self._pages = {}
+        self._lock = threading.Lock()
+
+    def AddAccount(self, name, api_id, api_key, statuspage_ids=(),
+                   rate=None, burst=None, **kwargs):
+        """Add an account and the status pages it owns.
+
+           Args:
+             name:
+               A name for the account.
+             api_id:
+               The account's Status.io API ID.
+             api_key:
+               The account's Status.io API KEY.
+             statuspage_ids:
+               IDs of the account's status pages, see AddPages(). [Optional]
+             rate:
+               Requests per second allowed to this account. [Optional]
+             burst:
+               Burst size of the account's rate limiter. [Optional]
+             kwargs:
+               Passed to this account's statusio.Api, overriding the pool's.
+
+           Returns:
+             The account's statusio.Api.
+        """
+        options = dict(self._kwargs, **kwargs)
+        if rate is not None and options.get('rate_limiter') is None:
+            options['rate_limiter'] = RateLimiter(rate, burst)
+        api = Api(api_id, api_key, **options)
+        with self._lock:
+            duplicate = name in self._accounts
+            if not duplicate:
+                self._accounts[name] = api
+                for statuspage_id in statuspage_ids:
+                    self._pages[statuspage_id] = name
+        if duplicate:
+            api.StopKeepalive()
+            api.transport.Close()
+            raise StatusioError('Duplicate account: %r' % (name,))
+        return api
+
+    def AddPages(self, name, statuspage_ids):
+        """Route calls for more status pages to an account."""
+        with self._lock:
+            if name not in self._accounts:
+                raise StatusioError('Unknown account: %r' % (name,))
+            for statuspage_id in statuspage_ids:
+                self._pages[statuspage_id] = name
+
+    def Accounts(self):
+        """Return the names of the accounts."""
+        with self._lock:
+            return sorted(self._accounts)
+
+    def Pages(self, name=None):
+        """Return the IDs of the status pages of one or all accounts."""
+        with self._lock:
+            return sorted(p for p, n in self._pages.items()
+                          if name is None or n == name)
+
+    def Account(self, name):
+        """Return the statusio.Api of an account."""
+        with self._lock:
+            if name not in self._accounts:
+                raise StatusioError('Unknown account: %r' % (name,))
+            return self._accounts[name]
+
+    def Route(self, statuspage_id):
+        """Return the statusio.Api of the account owning a status page."""
+        with self._lock:
+            name = self._pages.get(statuspage_id)
+            if name is None:
+                raise StatusioError('No account for status page %s'
+                                    % statuspage_id)
+            return self._accounts[name]
+
+    def FanOut(self, func, statuspage_ids=None):
+        """Call func for many status pages, all accounts in parallel.
+
+           Each account runs at most max_workers calls at once, and its
+           calls go through its own rate limiter.
+
+           Args:
+             func:
+               An Api method name, e.g. 'StatusSummary', or a callable
+               taking (api, statuspage_id).
+             statuspage_ids:
+               Status page IDs. Defaults to all of them. [Optional]
+
+           Returns:
+             A list of (statuspage_id, result, error) tuples in input order,
+             as returned by statusio.concurrency.run_concurrently.
+        """
+        if statuspage_ids is None:
+            statuspage_ids = self.Pages()
+        statuspage_ids = list(statuspage_ids)
+        if not callable(func):
+            name = func
+
+            def func(api, statuspage_id):
+                return getattr(api, name)(statuspage_id)
+        groups = {}
+        results = {}
+        for statuspage_id in statuspage_ids:
+            try:
+                api = self.Route(statuspage_id)
+            except StatusioError as e:
+                results[statuspage_id] = (statuspage_id, None, e)
+                continue
+            groups.setdefault(api, (api, []))[1].append(statuspage_id)
+
+        def run(group):
+            api, pages = group
+            return run_concurrently(lambda p: func(api, p), pages,
+                                    self.max_workers)
+
+        for _, group_results, _ in run_concurrently(
+                run, list(groups.values()), max(1, len(groups))):
+            for item in group_results:
+                results[item[0]] = item
+        return [results[p] for p in statuspage_ids]
+
+    def Close(self):
+        """Stop keep-alive probes and close the connections of all
+           accounts."""
+        with self._lock:
+            apis = list(self._accounts.values())
+        for api in apis:
+            api.StopKeepalive()
+            api.transport.Close()
+
+    def __getattr__(self, name):
+        if name not in _ROUTED:
+            raise AttributeError(name)
+
+        def call(statuspage_id, *args, **kwargs):
+            return getattr(self.Route(statuspage_id), name)(
+                statuspage_id, *args, **kwargs)
+        call.__name__ = name
+        return call
@@ -0,0 +1,167 @@
+#!/usr/bin/env python
+
+"""Client side rate limiting for Status.io API calls"""
+from __future__ import division
+
+import mmap
+import os
+import struct
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from statusio.errors import StatusioError
+
+# CLOCK_MONOTONIC is shared by all processes of a host.
+_monotonic = getattr(time, 'monotonic', time.time)
+
+# Layout of the shared bucket: magic, tokens, time of last update.
+_BUCKET = struct.Struct('<4sdd')
+_MAGIC = b'SIO1'
+
+
+class RateLimiter(object):
+    """A token bucket allowing ``rate`` calls per second with bursts.
+
+    Example usage:
+
+        >>> limiter = statusio.RateLimiter(rate=5, burst=10)
+        >>> api = statusio.Api(API_ID, API_KEY, rate_limiter=limiter)
+    """
+
+    def __init__(self, rate, burst=None, clock=_monotonic):
+        """Instantiate a new statusio.RateLimiter object.
+
+        Args:
+          rate:
+            Tokens added per second.
+          burst:
+            Maximum number of tokens in the bucket. Defaults to one second
+            worth of tokens. [Optional]
+          clock:
+            Function returning a monotonic time in seconds. [Optional]
+        """
+        self.rate = float(rate)
+        self.burst = float(burst or max(1.0, self.rate))
+        self._clock = clock
+        self._tokens = self.burst
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def Poll(self):
+        """Take a token if one is available without blocking.
+
+           Returns:
+             0.0 if a token was taken, otherwise the number of seconds until
+             the next token is available.
+        """
+        with self._lock:
+            self._tokens, self._updated, delay = self._Take(
+                self._tokens, self._updated, self._clock())
+        return delay
+
+    def _Take(self, tokens, updated, now):
+        # Refill the bucket and take a token from it if there is one.
+        tokens = min(self.burst, tokens + max(0.0, now - updated) * self.rate)
+        if tokens >= 1:
+            return tokens - 1, now, 0.0
+        return tokens, now, (1 - tokens) / self.rate
+
+    def Acquire(self, timeout=None):
+        """Take a token, waiting for one if needed.
+
+           Args:
+             timeout:
+               Maximum seconds to wait. Defaults to waiting forever.
+               [Optional]
+
+           Returns:
+             True if a token was taken, False on timeout.
+        """
+        deadline = None if timeout is None else self._clock() + timeout
+        while True:
+            delay = self.Poll()
+            if not delay:
+                return True
+            if deadline is not None:
+                remaining = deadline - self._clock()
+                if remaining <= 0:
+                    return False
+                delay = min(delay, remaining)
+            time.sleep(delay)
+
+
+class SharedRateLimiter(RateLimiter):
+    """A token bucket shared by all processes of a host.
+
+    The bucket lives in a small memory mapped file. Taking a token locks the
+    file with flock(), updates two doubles in place and unlocks it, so every
+    process using the same path (gunicorn workers, cron jobs, ...) draws from
+    one budget at a cost of a few microseconds per call. Processes should
+    agree on rate and burst.
+
+    Example usage:
+
+        >>> limiter = statusio.SharedRateLimiter('/tmp/statusio.bucket', rate=5)
+        >>> api = statusio.Api(API_ID, API_KEY, rate_limiter=limiter)
+    """
+
+    def __init__(self, path, rate, burst=None, clock=_monotonic):
+        """Instantiate a new statusio.SharedRateLimiter object.
+
+        Args:
+          path:
+            Path of the file holding the bucket. Created if missing.
+          rate:
+            Tokens added per second.
+          burst:
+            Maximum number of tokens in the bucket. Defaults to one second
+            worth of tokens. [Optional]
+          clock:
+            Function returning a monotonic time in seconds, the same for all
+            processes. [Optional]
+        """
+        if fcntl is None:
+            raise StatusioError('SharedRateLimiter requires fcntl (POSIX)')
+        RateLimiter.__init__(self, rate, burst, clock)
+        self.path = path
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            if os.fstat(self._fd).st_size < _BUCKET.size:
+                os.ftruncate(self._fd, _BUCKET.size)
+            self._map = mmap.mmap(self._fd, _BUCKET.size)
+            if self._map[:len(_MAGIC)] != _MAGIC:
+                _BUCKET.pack_into(self._map, 0, _MAGIC, self.burst, clock())
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def Poll(self):
+        """Take a token if one is available without blocking.
+
+           Returns:
+             0.0 if a token was taken, otherwise the number of seconds until
+             the next token is available.
+        """
+        # The thread lock keeps threads of this process off the file lock.
+        with self._lock:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                _, tokens, updated = _BUCKET.unpack_from(self._map, 0)
+                tokens, updated, delay = self._Take(tokens, updated,
+                                                    self._clock())
+                _BUCKET.pack_into(self._map, 0, _MAGIC, tokens, updated)
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+        return delay
+
+    def Close(self):
+        """Release the memory map and the file."""
+        if self._map is not None:
+            self._map.close()
+            os.close(self._fd)
+            self._map = None
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+
+"""Response wrappers returned by statusio.Api"""
+
+try:
+    # python 3
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
+
+from statusio import json
+
+
+class Response(object):
+    """An HTTP response as returned by the statusio transports.
+
+    Attributes:
+      status_code:
+        The HTTP status code.
+      content:
+        The response body as bytes.
+      headers:
+        A dict of response headers with lower case names.
+      elapsed:
+        Seconds between sending the request and receiving the response.
+    """
+
+    __slots__ = ('status_code', 'content', 'headers', 'elapsed')
+
+    def __init__(self, status_code, content, headers=None, elapsed=0.0):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+        self.elapsed = elapsed
+
+    def __repr__(self):
+        return '<Response [%d]>' % self.status_code
+
+
+class LazyResponse(Mapping):
+    """A JSON response decoded only when one of its fields is accessed.
+
+    Code that forwards responses as is can use ``content`` (or bytes(...))
+    without ever paying for decoding; everything else can use it like the
+    dict the Api would have returned.
+
+    Example usage:
+
+        >>> resp = api.WithResponseMode('lazy').IncidentList(STATUSPAGE_ID)
+        >>> cache.set(key, resp.content)     # not decoded
+        >>> resp['result']['active_incidents']  # decoded now, once
+    """
+
+    __slots__ = ('content', '_data')
+
+    def __init__(self, content):
+        """Instantiate a new statusio.LazyResponse.
+
+        Args:
+          content:
+            The undecoded response body as bytes.
+        """
+        self.content = content
+        self._data = None
+
+    @property
+    def data(self):
+        """The decoded JSON object."""
+        if self._data is None:
+            self._data = json.loads(self.content.decode('utf-8'))
+        return self._data
+
+    @property
+    def parsed(self):
+        """Whether the content has been decoded yet."""
+        return self._data is not None
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def __len__(self):
+        return len(self.data)
+
+    def __bytes__(self):
+        return self.content
+
+    def __repr__(self):
+        if self._data is None:
+            return '<LazyResponse %d bytes>' % len(self.content)
+        return 'LazyResponse(%r)' % (self._data,)
@@ -0,0 +1,202 @@
+#!/usr/bin/env python
+
+"""Prioritized, fair scheduling of API requests"""
+from __future__ import division
+
+import heapq
+import itertools
+import threading
+from concurrent.futures import Future
+
+# Priority classes, lower runs first.
+CRITICAL = 0
+NORMAL = 1
+BULK = 2
+
+DEFAULT_PRIORITIES = {
+    'ComponentStatusUpdate': CRITICAL,
+    'IncidentCreate': CRITICAL,
+    'IncidentUpdate': CRITICAL,
+    'IncidentResolve': CRITICAL,
+    'MetricUpdate': BULK,
+    'SubscriberAdd': BULK,
+    'SubscriberUpdate': BULK,
+    'SubscriberRemove': BULK,
+    'SubscriberList': BULK,
+}
+
+
+class RequestScheduler(object):
+    """Run requests on a fixed set of workers by priority and fairness.
+
+    Requests are queued in priority classes (CRITICAL, NORMAL, BULK). A
+    waiting request of a higher class always runs before any request of a
+    lower class. Within a class, status pages share the workers by weighted
+    fair queuing so a page with thousands of queued requests does not delay
+    the others.
+
+    If a request carries a rate limiter, a worker only takes it off the queue
+    once the limiter has a token, so when the budget is tight the tokens go
+    to the most urgent request waiting at that moment. Requests waiting on
+    an empty limiter are passed over, so those of another limiter (e.g.
+    another account) still run in priority order.
+
+    A scheduler may be shared by several statusio.Api instances.
+
+    Example usage:
+
+        >>> scheduler = statusio.RequestScheduler(workers=16)
+        >>> api = statusio.Api(API_ID, API_KEY, scheduler=scheduler)
+    """
+
+    def __init__(self, workers=8, weights=None, priorities=None):
+        """Instantiate a new statusio.RequestScheduler object.
+
+        Args:
+          workers:
+            Number of requests run concurrently. [Optional]
+          weights:
+            Dict of statuspage ID to its share of the workers relative to
+            other pages in the same class. Defaults to 1. [Optional]
+          priorities:
+            Dict of endpoint name (e.g. 'MetricUpdate') to priority class,
+            overriding DEFAULT_PRIORITIES. [Optional]
+        """
+        self.workers = workers
+        self.weights = weights or {}
+        self.priorities = dict(DEFAULT_PRIORITIES)
+        self.priorities.update(priorities or {})
+        # Per priority class, a heap of queued requests per rate limiter
+        # (keyed by id, None for no limiter), so a pass polls each limiter
+        # once instead of scanning every request.
+        self._queues = ({}, {}, {})
+        self._virtual = [0.0, 0.0, 0.0]
+        self._finish = {}
+        self._sequence = itertools.count()
+        self._cond = threading.Condition()
+        self._threads = []
+        self._closed = False
+
+    def Submit(self, func, endpoint=None, statuspage_id=None, priority=None,
+               limiter=None):
+        """Queue a call to func().
+
+           Args:
+             func:
+               The callable to run.
+             endpoint:
+               Endpoint name used to look up the priority. [Optional]
+             statuspage_id:
+               Status page the request is for, used for fairness. [Optional]
+             priority:
+               Priority class, overriding the endpoint's. [Optional]
+             limiter:
+               A RateLimiter to take a token from before running. [Optional]
+
+           Returns:
+             A concurrent.futures.Future for the result of func().
+        """
+        if priority is None:
+            priority = self.priorities.get(endpoint, NORMAL)
+        future = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError('RequestScheduler is shut down')
+            if len(self._threads) < self.workers:
+                self._StartWorker()
+            flow = (priority, statuspage_id)
+            start = max(self._virtual[priority], self._finish.get(flow, 0.0))
+            finish = start + 1.0 / self.weights.get(statuspage_id, 1)
+            self._finish[flow] = finish
+            key = None if limiter is None else id(limiter)
+            heapq.heappush(self._queues[priority].setdefault(key, []), (
+                finish, next(self._sequence), start, func, limiter, future))
+            self._cond.notify()
+        return future
+
+    def Call(self, func, **kwargs):
+        """Queue a call to func() and wait for its result.
+
+           Keyword arguments are as for Submit().
+        """
+        return self.Submit(func, **kwargs).result()
+
+    def Pending(self):
+        """Return the number of queued requests per priority class."""
+        with self._cond:
+            return [sum(len(heap) for heap in queues.values())
+                    for queues in self._queues]
+
+    def Shutdown(self, wait=True):
+        """Stop the workers once the queued requests have run."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def _StartWorker(self):
+        thread = threading.Thread(target=self._Work,
+                                  name='statusio-scheduler')
+        thread.daemon = True
+        thread.start()
+        self._threads.append(thread)
+
+    def _Next(self):
+        # Pop the most urgent request whose rate limiter has a token.
+        with self._cond:
+            while True:
+                blocked = {}
+                for priority, queues in enumerate(self._queues):
+                    key = self._Runnable(queues, blocked)
+                    if key is not False:
+                        return self._Pop(priority, key)
+                if not blocked and self._closed:
+                    return None
+                self._cond.wait(min(blocked.values()) if blocked else None)
+
+    @staticmethod
+    def _Runnable(queues, blocked):
+        # Key of the limiter whose most urgent request of this class runs
+        # next, or False. Limiters found empty in this pass are added to
+        # blocked with their delay and not polled again, so requests of
+        # other limiters in the class still go first.
+        for head, key in sorted((heap[0], key)
+                                for key, heap in queues.items()):
+            limiter = head[4]
+            if limiter is None:
+                return key
+            if key not in blocked:
+                delay = limiter.Poll()
+                if not delay:
+                    return key
+                blocked[key] = delay
+        return False
+
+    def _Pop(self, priority, key):
+        queues = self._queues[priority]
+        heap = queues[key]
+        _, _, start, func, _, future = heapq.heappop(heap)
+        if not heap:
+            del queues[key]
+        self._virtual[priority] = start
+        if not queues:
+            # The class went idle, restart its virtual clock.
+            self._virtual[priority] = 0.0
+            for flow in [f for f in self._finish if f[0] == priority]:
+                del self._finish[flow]
+        return func, future
+
+    def _Work(self):
+        while True:
+            item = self._Next()
+            if item is None:
+                return
+            func, future = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(func())
+            except BaseException as e:
+                future.set_exception(e)
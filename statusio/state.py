@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+
+"""An in-memory cache of status page state kept current by events"""
+from __future__ import print_function
+
+import collections
+import threading
+import time
+
+from statusio.codes import status_code
+from statusio.errors import check_result
+
+
+# Incident and maintenance states after which they leave the active set.
+_CLOSED_STATES = ('resolved', 'completed', 'finished', 'cancelled', 'deleted')
+
+
+class StatusEvent(collections.namedtuple(
+        'StatusEvent', 'kind statuspage_id id status state components '
+                       'containers data')):
+    """A change to a status page.
+
+    kind is 'incident', 'maintenance' or 'component'. status is the numeric
+    status code, state the state name as sent by Status.io (e.g. 'Resolved').
+    components and containers are tuples of IDs, data the raw payload.
+    """
+    __slots__ = ()
+
+
+class StatusCache(object):
+    """Status page state kept current by incremental updates.
+
+    The cache is seeded from StatusSummary and then updated by applying
+    StatusEvent objects, e.g. from statusio.WebhookReceiver, so readers do
+    not have to poll. Subscribers are called with every applied event.
+
+    Example usage:
+
+        >>> cache = statusio.StatusCache()
+        >>> cache.Refresh(api, STATUSPAGE_ID)
+        >>> cache.Subscribe(lambda event, changes: print(event.kind, changes))
+        >>> cache.ComponentStatus(STATUSPAGE_ID, COMPONENT, CONTAINER)
+        100
+    """
+
+    def __init__(self):
+        self._pages = {}
+        self._subscribers = []
+        self._lock = threading.Lock()
+
+    def Refresh(self, api, statuspage_id):
+        """Seed a status page from Api.StatusSummary."""
+        self.Seed(statuspage_id,
+                  check_result(api.StatusSummary(statuspage_id)))
+
+    def Seed(self, statuspage_id, summary):
+        """Replace the state of a status page with a StatusSummary result."""
+        page = self._NewPage()
+        for component in summary.get('status') or []:
+            for container in component.get('containers') or []:
+                page['components'][(component.get('id'),
+                                    container.get('id'))] = status_code(
+                    container.get('status_code', container.get('status')))
+        for incident in summary.get('incidents') or []:
+            page['incidents'][incident.get('_id') or incident.get('id')] = \
+                incident
+        maintenance = summary.get('maintenance') or {}
+        for state in ('active', 'upcoming'):
+            for event in maintenance.get(state) or []:
+                page['maintenances'][event.get('_id') or event.get('id')] = \
+                    event
+        with self._lock:
+            self._pages[statuspage_id] = page
+
+    def Apply(self, event):
+        """Apply a StatusEvent and notify subscribers.
+
+           Returns:
+             A list of (what, key, old, new) tuples describing the changes.
+        """
+        with self._lock:
+            page = self._pages.get(event.statuspage_id)
+            if page is None:
+                page = self._pages[event.statuspage_id] = self._NewPage()
+            changes = self._ApplyToPage(page, event)
+            page['updated_at'] = time.time()
+            subscribers = list(self._subscribers)
+        for callback, statuspage_id in subscribers:
+            if statuspage_id in (None, event.statuspage_id):
+                try:
+                    callback(event, changes)
+                except Exception as e:
+                    print('Error: ' + str(e))
+        return changes
+
+    def Subscribe(self, callback, statuspage_id=None):
+        """Call callback(event, changes) for every applied event.
+
+           Args:
+             callback:
+               A callable taking a StatusEvent and its list of changes.
+             statuspage_id:
+               Only notify about this status page. [Optional]
+        """
+        with self._lock:
+            self._subscribers.append((callback, statuspage_id))
+
+    def Unsubscribe(self, callback):
+        with self._lock:
+            self._subscribers = [s for s in self._subscribers
+                                 if s[0] is not callback]
+
+    def ComponentStatus(self, statuspage_id, component, container=None):
+        """Return the status code of a component, or of one of its containers.
+
+           The status of a component is the worst status of its containers.
+           Returns None for unknown components.
+        """
+        with self._lock:
+            page = self._pages.get(statuspage_id)
+            if page is None:
+                return None
+            codes = [code for (comp, cont), code in page['components'].items()
+                     if comp == component and container in (None, cont)]
+        return max(codes) if codes else None
+
+    def Incidents(self, statuspage_id):
+        """List the active incidents of a status page."""
+        with self._lock:
+            page = self._pages.get(statuspage_id) or self._NewPage()
+            return list(page['incidents'].values())
+
+    def Maintenances(self, statuspage_id):
+        """List the active and upcoming maintenances of a status page."""
+        with self._lock:
+            page = self._pages.get(statuspage_id) or self._NewPage()
+            return list(page['maintenances'].values())
+
+    def UpdatedAt(self, statuspage_id):
+        """Time the last event was applied to a status page, or None."""
+        with self._lock:
+            page = self._pages.get(statuspage_id)
+            return page and page['updated_at']
+
+    @staticmethod
+    def _NewPage():
+        return {'components': {}, 'incidents': {}, 'maintenances': {},
+                'updated_at': None}
+
+    def _ApplyToPage(self, page, event):
+        changes = []
+        if event.kind in ('incident', 'maintenance') and event.id is not None:
+            # Events without an ID only update component statuses.
+            events = page[event.kind + 's']
+            closed = (event.state or '').lower() in _CLOSED_STATES
+            old = events.get(event.id)
+            if closed:
+                if events.pop(event.id, None) is not None:
+                    changes.append((event.kind, event.id, old, None))
+            else:
+                events[event.id] = event.data
+                changes.append((event.kind, event.id, old, event.data))
+        if event.status is not None:
+            known = page['components']
+            combos = [(comp, cont) for comp, cont in known
+                      if comp in event.components and
+                      (not event.containers or cont in event.containers)]
+            if not combos:
+                combos = [(comp, cont) for comp in event.components
+                          for cont in event.containers or (None,)]
+            for combo in combos:
+                old = known.get(combo)
+                if old != event.status:
+                    known[combo] = event.status
+                    changes.append(('component', combo, old, event.status))
+        return changes
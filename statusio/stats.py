@@ -0,0 +1,178 @@
+#!/usr/bin/env python
+
+"""Per-endpoint request statistics of statusio.Api"""
+from __future__ import division
+
+import bisect
+import threading
+
+# Upper bounds of the latency buckets in seconds: four linear steps per
+# power of two from about 1ms to 64s, so any percentile is within 12.5%.
+LATENCY_BUCKETS = tuple([2.0 ** e * (1 + i / 4.0)
+                         for e in range(-10, 6) for i in range(4)] + [64.0])
+
+# Counters kept per endpoint, and their Prometheus names and help.
+COUNTERS = (
+    ('requests', 'requests_total', 'Requests sent.'),
+    ('errors', 'errors_total', 'Requests failed or answered with an error.'),
+    ('cache_hits', 'cache_hits_total', 'Requests answered from a cache.'),
+    ('bytes_out', 'sent_bytes_total', 'Request body bytes sent.'),
+    ('bytes_in', 'received_bytes_total', 'Response body bytes received.'),
+)
+
+
+class LatencyHistogram(object):
+    """A fixed size histogram of latencies in log-linear buckets.
+
+    Not locked; ApiStats serializes access.
+    """
+
+    __slots__ = ('bounds', 'counts', 'sum', 'count')
+
+    def __init__(self, bounds=LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def Observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def Percentile(self, q):
+        """Estimate the q-th percentile (0 to 100), or None if empty."""
+        if not self.count:
+            return None
+        rank = q / 100.0 * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = self.bounds[i - 1] if i else 0.0
+                if i == len(self.bounds):
+                    return lower
+                # Interpolate within the bucket.
+                return lower + (self.bounds[i] - lower) * (rank - seen) / n
+            seen += n
+        return self.bounds[-1]
+
+    def Cumulative(self):
+        """Return (upper bound, count of values at or below it) pairs,
+           ending with float('inf')."""
+        total = 0
+        pairs = []
+        for bound, n in zip(self.bounds + (float('inf'),), self.counts):
+            total += n
+            pairs.append((bound, total))
+        return pairs
+
+
+class ApiStats(object):
+    """Request counters and latency histograms per Api endpoint.
+
+    Every statusio.Api keeps one in ``stats``; several Api instances can
+    share one. Memory is fixed per endpoint and recording a request costs a
+    lock and a bisect.
+
+    Example usage:
+
+        >>> api.StatusSummary(STATUSPAGE_ID)
+        >>> api.stats.Snapshot()['StatusSummary']['latency']['p99']
+        >>> print(api.stats.Prometheus())
+    """
+
+    def __init__(self):
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    def Record(self, endpoint, latency, bytes_out=0, bytes_in=0,
+               error=False):
+        """Record a request.
+
+           Args:
+             endpoint:
+               Endpoint name, e.g. 'IncidentCreate'.
+             latency:
+               Seconds the request took.
+             bytes_out:
+               Size of the request body. [Optional]
+             bytes_in:
+               Size of the response body. [Optional]
+             error:
+               Whether the request failed. [Optional]
+        """
+        with self._lock:
+            entry = self._Entry(endpoint)
+            entry['requests'] += 1
+            entry['bytes_out'] += bytes_out
+            entry['bytes_in'] += bytes_in
+            if error:
+                entry['errors'] += 1
+            entry['latency'].Observe(latency)
+
+    def Increment(self, endpoint, counter, n=1):
+        """Add n to one of the COUNTERS of an endpoint, e.g. 'cache_hits'."""
+        with self._lock:
+            self._Entry(endpoint)[counter] += n
+
+    def Snapshot(self):
+        """Return the statistics as a dict keyed by endpoint name."""
+        snapshot = {}
+        with self._lock:
+            for endpoint, entry in self._endpoints.items():
+                histogram = entry['latency']
+                item = dict((name, entry[name]) for name, _, _ in COUNTERS)
+                item['latency'] = {
+                    'count': histogram.count,
+                    'sum': histogram.sum,
+                    'p50': histogram.Percentile(50),
+                    'p90': histogram.Percentile(90),
+                    'p99': histogram.Percentile(99),
+                    'buckets': histogram.Cumulative(),
+                }
+                snapshot[endpoint] = item
+        return snapshot
+
+    def Prometheus(self, prefix='statusio'):
+        """Render the statistics in the Prometheus text exposition format."""
+        snapshot = self.Snapshot()
+        endpoints = sorted(snapshot)
+        lines = []
+        for name, metric, help_text in COUNTERS:
+            lines.append('# HELP %s_%s %s' % (prefix, metric, help_text))
+            lines.append('# TYPE %s_%s counter' % (prefix, metric))
+            for endpoint in endpoints:
+                lines.append('%s_%s{endpoint="%s"} %d' % (
+                    prefix, metric, endpoint, snapshot[endpoint][name]))
+        metric = '%s_request_duration_seconds' % prefix
+        lines.append('# HELP %s Request latency.' % metric)
+        lines.append('# TYPE %s histogram' % metric)
+        for endpoint in endpoints:
+            latency = snapshot[endpoint]['latency']
+            for bound, count in latency['buckets']:
+                lines.append('%s_bucket{endpoint="%s",le="%s"} %d' % (
+                    metric, endpoint, _Le(bound), count))
+            lines.append('%s_sum{endpoint="%s"} %r' % (
+                metric, endpoint, latency['sum']))
+            lines.append('%s_count{endpoint="%s"} %d' % (
+                metric, endpoint, latency['count']))
+        return '\n'.join(lines) + '\n'
+
+    def Reset(self):
+        """Forget all statistics."""
+        with self._lock:
+            self._endpoints = {}
+
+    def _Entry(self, endpoint):
+        entry = self._endpoints.get(endpoint)
+        if entry is None:
+            entry = dict((name, 0) for name, _, _ in COUNTERS)
+            entry['latency'] = LatencyHistogram()
+            self._endpoints[endpoint] = entry
+        return entry
+
+
+def _Le(bound):
+    if bound == float('inf'):
+        return '+Inf'
+    return repr(bound)
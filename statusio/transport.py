@@ -0,0 +1,388 @@
+#!/usr/bin/env python
+
+"""Transports sending the HTTP requests of statusio.Api"""
+from __future__ import division
+
+import base64
+import collections
+import io
+import threading
+import time
+import weakref
+
+import requests
+
+try:
+    import urllib3
+except ImportError:
+    urllib3 = None
+
+from statusio import json
+from statusio.concurrency import run_concurrently
+from statusio.errors import StatusioError, TransportError
+from statusio.response import Response
+
+# Response headers kept in cassettes.
+_RECORDED_HEADERS = ('content-type', 'etag', 'last-modified', 'retry-after')
+
+
+class Transport(object):
+    """Base class of the objects sending HTTP requests for statusio.Api.
+
+    Subclasses implement Request() and may override Warmup(); those are
+    what statusio.Api calls. The Api never calls Close(), whoever owns the
+    transport does once done with it (e.g. statusio.ClientPool.Close()).
+    """
+
+    def Request(self, verb, url, body=None, headers=None):
+        """Send a request.
+
+           Args:
+             verb:
+               HTTP method, e.g. 'GET'.
+             url:
+               The full URL.
+             body:
+               The request body as a str, or None.
+             headers:
+               A dict of request headers. [Optional]
+
+           Returns:
+             A statusio.response.Response.
+        """
+        raise NotImplementedError
+
+    def Warmup(self, url, connections=1):
+        """Open connections to the host of url ahead of the first request.
+
+           Sends that many HEAD requests at once so DNS, TCP and TLS setup
+           are done and the connections are left in the pool. Any response
+           counts, the status code does not matter.
+
+           Args:
+             url:
+               A URL on the host to connect to.
+             connections:
+               Number of connections to open, at most the pool size.
+               [Optional]
+
+           Returns:
+             The number of requests that got a response.
+        """
+        results = run_concurrently(lambda _: self.Request('HEAD', url),
+                                   range(connections), connections)
+        return len([r for r in results if r[2] is None])
+
+    def Close(self):
+        """Release the resources held by the transport."""
+
+
+class RequestsTransport(Transport):
+    """Send requests through pooled requests sessions.
+
+    requests.Session is not safe to share between threads, so each thread
+    gets its own session. All of them use one connection pool, which is
+    thread safe, so warm connections are available to every thread.
+    """
+
+    def __init__(self, pool_size=10, timeout=None):
+        """Instantiate a new RequestsTransport.
+
+        Args:
+          pool_size:
+            Number of connections kept open for reuse. Should be at least
+            the number of threads sending requests. [Optional]
+          timeout:
+            Seconds to wait for the server. Defaults to no limit. [Optional]
+        """
+        self.timeout = timeout
+        self.adapter = requests.adapters.HTTPAdapter(pool_maxsize=pool_size)
+        self._local = threading.local()
+        # Sessions go away with their threads.
+        self._sessions = weakref.WeakSet()
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        """The requests.Session of the calling thread."""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.mount('https://', self.adapter)
+            session.mount('http://', self.adapter)
+            with self._lock:
+                self._sessions.add(session)
+            self._local.session = session
+        return session
+
+    def Request(self, verb, url, body=None, headers=None):
+        try:
+            resp = self.session.request(verb, url, data=body, headers=headers,
+                                        timeout=self.timeout)
+        except requests.RequestException as e:
+            raise TransportError(str(e))
+        return Response(resp.status_code, resp.content,
+                        dict((k.lower(), v) for k, v in resp.headers.items()),
+                        resp.elapsed.total_seconds())
+
+    def Close(self):
+        with self._lock:
+            sessions = list(self._sessions)
+            self._sessions.clear()
+        for session in sessions:
+            # Sessions close their adapters, closing the shared pool too.
+            session.close()
+        self.adapter.close()
+        self._local = threading.local()
+
+
+class Urllib3Transport(Transport):
+    """Send requests through a urllib3 connection pool.
+
+    This skips the session, hook and adapter layers of requests and has a
+    lower per call overhead than RequestsTransport.
+    """
+
+    def __init__(self, pool_size=10, timeout=None):
+        """Instantiate a new Urllib3Transport.
+
+        Args:
+          pool_size:
+            Number of connections kept open per host. [Optional]
+          timeout:
+            Seconds to wait for the server. Defaults to no limit. [Optional]
+        """
+        if urllib3 is None:
+            raise StatusioError('Urllib3Transport requires urllib3')
+        self.timeout = timeout
+        self.pool = urllib3.PoolManager(maxsize=pool_size, retries=False,
+                                        timeout=timeout)
+
+    def Request(self, verb, url, body=None, headers=None):
+        started = time.time()
+        try:
+            resp = self.pool.request(verb, url, body=body, headers=headers)
+        except urllib3.exceptions.HTTPError as e:
+            raise TransportError(str(e))
+        return Response(resp.status, resp.data,
+                        dict((k.lower(), v) for k, v in resp.headers.items()),
+                        time.time() - started)
+
+    def Close(self):
+        self.pool.clear()
+
+
+class StubTransport(Transport):
+    """Answer requests from memory, without any network.
+
+    Responses are registered per verb and URL path fragment. Unmatched
+    requests get a 404 with a Status.io style error body. Every request is
+    kept in ``requests`` as a (verb, url, body) tuple.
+
+    Example usage:
+
+        >>> stub = statusio.StubTransport()
+        >>> stub.Add('GET', 'status/summary/', {'status': {'error': 'no'},
+        ...                                     'result': {'status': []}})
+        >>> api = statusio.Api(API_ID, API_KEY, transport=stub)
+    """
+
+    def __init__(self, latency=0.0):
+        """Instantiate a new StubTransport.
+
+        Args:
+          latency:
+            Seconds to wait before answering. [Optional]
+        """
+        self.latency = latency
+        self.requests = []
+        self._routes = []
+        self._lock = threading.Lock()
+
+    def Add(self, verb, path, response, status=200, headers=None):
+        """Register a response. Later registrations win.
+
+           Args:
+             verb:
+               HTTP method, or '*' for any.
+             path:
+               A fragment of the URL, e.g. 'incident/create'.
+             response:
+               The JSON object or bytes to answer with, or a callable taking
+               (verb, url, body) and returning one of those or a Response.
+             status:
+               HTTP status code. [Optional]
+             headers:
+               Dict of response headers. [Optional]
+        """
+        with self._lock:
+            self._routes.insert(0, (verb, path, response, status,
+                                    headers or {}))
+
+    def Warmup(self, url, connections=1):
+        return connections
+
+    def Request(self, verb, url, body=None, headers=None):
+        with self._lock:
+            self.requests.append((verb, url, body))
+            route = next((r for r in self._routes
+                          if r[0] in ('*', verb) and r[1] in url), None)
+        if self.latency:
+            time.sleep(self.latency)
+        if route is None:
+            return Response(404, json.dumps({'status': {
+                'error': 'yes', 'message': 'Not found'}}).encode('utf-8'))
+        _, _, response, status, resp_headers = route
+        if callable(response):
+            response = response(verb, url, body)
+        if isinstance(response, Response):
+            return response
+        if not isinstance(response, bytes):
+            response = json.dumps(response).encode('utf-8')
+        return Response(status, response,
+                        dict({'content-type': 'application/json'},
+                             **resp_headers), self.latency)
+
+
+class RecordingTransport(Transport):
+    """Record requests and responses of another transport to a cassette.
+
+    A cassette is a JSON lines file with one request/response pair per line,
+    including how long the response took. Credentials are not recorded.
+
+    Example usage:
+
+        >>> transport = statusio.RecordingTransport('api.jsonl')
+        >>> api = statusio.Api(API_ID, API_KEY, transport=transport)
+    """
+
+    def __init__(self, path, transport=None, append=False):
+        """Instantiate a new RecordingTransport.
+
+        Args:
+          path:
+            Cassette file, replaced by the new recording.
+          transport:
+            The transport actually sending requests. Defaults to a
+            RequestsTransport. [Optional]
+          append:
+            Add to an existing cassette instead of replacing it. [Optional]
+        """
+        self.path = path
+        self.transport = transport or RequestsTransport()
+        self._file = io.open(path, 'a' if append else 'w', encoding='utf-8')
+        self._lock = threading.Lock()
+
+    def Request(self, verb, url, body=None, headers=None):
+        resp = self.transport.Request(verb, url, body, headers)
+        entry = {
+            'method': verb,
+            'url': url,
+            'body': body,
+            'status': resp.status_code,
+            'headers': dict((k, v) for k, v in resp.headers.items()
+                            if k in _RECORDED_HEADERS),
+            'elapsed': round(resp.elapsed, 6),
+        }
+        try:
+            entry['content'] = resp.content.decode('utf-8')
+        except UnicodeDecodeError:
+            entry['content'] = base64.b64encode(resp.content).decode('ascii')
+            entry['encoding'] = 'base64'
+        line = json.dumps(entry, sort_keys=True, separators=(',', ':'))
+        with self._lock:
+            self._file.write(line + u'\n')
+            self._file.flush()
+        return resp
+
+    def Warmup(self, url, connections=1):
+        # Not recorded, replays do not need it.
+        return self.transport.Warmup(url, connections)
+
+    def Close(self):
+        self._file.close()
+        self.transport.Close()
+
+
+class ReplayTransport(Transport):
+    """Answer requests from a cassette written by RecordingTransport.
+
+    Requests are matched on method, URL and body. Identical requests get the
+    recorded responses in order, and the last one again once they run out.
+
+    Example usage:
+
+        >>> transport = statusio.ReplayTransport('api.jsonl', speed=1.0)
+        >>> api = statusio.Api(API_ID, API_KEY, transport=transport)
+    """
+
+    def __init__(self, path, speed=None, repeat=True):
+        """Instantiate a new ReplayTransport.
+
+        Args:
+          path:
+            Cassette file.
+          speed:
+            None to answer right away, 1.0 to wait as long as the recorded
+            response took, 2.0 for half as long and so on. [Optional]
+          repeat:
+            Keep answering with the last recorded response for a request
+            once all of them have been used. [Optional]
+        """
+        self.path = path
+        self.speed = speed
+        self.repeat = repeat
+        self._recorded = collections.defaultdict(collections.deque)
+        self._lock = threading.Lock()
+        with io.open(path, encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    key = (entry['method'], entry['url'], entry.get('body'))
+                    self._recorded[key].append(self._Response(entry))
+
+    def Request(self, verb, url, body=None, headers=None):
+        with self._lock:
+            responses = self._recorded.get((verb, url, body))
+            if not responses:
+                raise TransportError('No recorded response for %s %s'
+                                     % (verb, url))
+            if len(responses) > 1 or not self.repeat:
+                resp = responses.popleft()
+            else:
+                resp = responses[0]
+        if self.speed:
+            time.sleep(resp.elapsed / self.speed)
+        return Response(resp.status_code, resp.content, dict(resp.headers),
+                        resp.elapsed)
+
+    def Warmup(self, url, connections=1):
+        return 0
+
+    @staticmethod
+    def _Response(entry):
+        if entry.get('encoding') == 'base64':
+            content = base64.b64decode(entry['content'])
+        else:
+            content = entry['content'].encode('utf-8')
+        return Response(entry['status'], content, entry.get('headers'),
+                        entry.get('elapsed', 0.0))
+
+
+# Built-in transports by name, for Api(transport='urllib3').
+TRANSPORTS = {
+    'requests': RequestsTransport,
+    'urllib3': Urllib3Transport,
+    'stub': StubTransport,
+}
+
+
+def make_transport(transport, pool_size=10):
+    """Return a Transport given either one or the name of a built-in one."""
+    if isinstance(transport, Transport):
+        return transport
+    if transport not in TRANSPORTS:
+        raise StatusioError('Unknown transport: %r' % (transport,))
+    if transport == 'stub':
+        return StubTransport()
+    return TRANSPORTS[transport](pool_size)
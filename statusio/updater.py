@@ -0,0 +1,215 @@
+#!/usr/bin/env python
+
+"""Deduplicate and debounce component status updates"""
+from __future__ import print_function
+
+import threading
+import time
+
+from statusio.codes import status_code
+from statusio.errors import check_result
+
+
+class ComponentStatusUpdater(object):
+    """A front for Api.ComponentStatusUpdate that only writes real changes.
+
+    The last known status of every (statuspage, component, container) is
+    seeded from StatusSummary and updated on every write. Updates that do not
+    change it are dropped. A new status is only written once it has been
+    reported for ``debounce`` seconds, and at most once every ``hold_down``
+    seconds per component, so a flapping check ends up as one final write
+    with the latest status and details. ``max_delay`` bounds how long a
+    status that keeps changing can be held back. Only one write per
+    component is in flight at a time; a status reported meanwhile waits for
+    it and is dropped if it is the one being written.
+
+    Example usage:
+
+        >>> updater = statusio.ComponentStatusUpdater(api, debounce=30)
+        >>> updater.Start()
+        >>> updater.Update(STATUSPAGE_ID, COMPONENT, CONTAINER, 'Slow', 300)
+    """
+
+    def __init__(self,
+                 api,
+                 debounce=0,
+                 hold_down=0,
+                 max_delay=None,
+                 clock=time.time):
+        """Instantiate a new statusio.ComponentStatusUpdater object.
+
+        Args:
+          api:
+            A statusio.Api instance.
+          debounce:
+            Seconds a new status must be reported before it is written.
+            [Optional]
+          hold_down:
+            Minimum seconds between two writes for the same component.
+            [Optional]
+          max_delay:
+            Maximum seconds a changed status is held back. Defaults to no
+            limit. [Optional]
+          clock:
+            Function returning the current time. [Optional]
+        """
+        self._api = api
+        self.debounce = debounce
+        self.hold_down = hold_down
+        self.max_delay = max_delay
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._seed_lock = threading.Lock()
+        self._seeded = set()
+        self._known = {}
+        self._writing = {}
+        self._written_at = {}
+        self._pending = {}
+        self._stop = threading.Event()
+        self._thread = None
+        self.stats = {'written': 0, 'dropped': 0, 'coalesced': 0,
+                      'failed': 0}
+
+    def Seed(self, statuspage_id):
+        """Load the current statuses of a status page from StatusSummary."""
+        summary = check_result(self._api.StatusSummary(statuspage_id)) or {}
+        with self._lock:
+            for component in summary.get('status') or []:
+                for container in component.get('containers') or []:
+                    key = (statuspage_id, component.get('id'),
+                           container.get('id'))
+                    self._known[key] = status_code(
+                        container.get('status_code', container.get('status')))
+            self._seeded.add(statuspage_id)
+
+    def Update(self,
+               statuspage_id,
+               component,
+               container,
+               details,
+               current_status):
+        """Report the status of a component.
+
+           Args are as for Api.ComponentStatusUpdate.
+
+           Returns:
+             The API response if the update was written right away, None if
+             it was dropped or is pending.
+        """
+        with self._seed_lock:
+            if statuspage_id not in self._seeded:
+                self.Seed(statuspage_id)
+        key = (statuspage_id, component, container)
+        code = status_code(current_status)
+        now = self._clock()
+        with self._lock:
+            pending = self._pending.get(key)
+            if code == self._writing.get(key, self._known.get(key)):
+                if pending is not None:
+                    # Flapped back before the change was written.
+                    del self._pending[key]
+                    self.stats['coalesced'] += 1
+                self.stats['dropped'] += 1
+                return None
+            if pending is None:
+                self._pending[key] = [code, details, now, now]
+            else:
+                if pending[0] != code:
+                    pending[3] = now
+                pending[0], pending[1] = code, details
+                self.stats['coalesced'] += 1
+            if key in self._writing or not self._Due(key, now):
+                return None
+            code, details = self._pending.pop(key)[:2]
+            self._writing[key] = code
+        return self._Write(key, details, code)
+
+    def Flush(self, force=False):
+        """Write pending updates whose debounce and hold down have passed.
+
+           Updates of components with a write in flight wait for it.
+
+           Args:
+             force:
+               Write every pending update right away. [Optional]
+
+           Returns:
+             The number of updates written.
+        """
+        now = self._clock()
+        with self._lock:
+            due = [(key, self._pending.pop(key)) for key in list(self._pending)
+                   if key not in self._writing and
+                   (force or self._Due(key, now))]
+            for key, entry in due:
+                self._writing[key] = entry[0]
+        written = 0
+        for key, entry in due:
+            try:
+                self._Write(key, entry[1], entry[0])
+                written += 1
+            except Exception as e:
+                print('Error: ' + str(e))
+                with self._lock:
+                    # Retry later unless a newer status came in meanwhile.
+                    self._pending.setdefault(key, entry)
+        return written
+
+    def Pending(self):
+        """Return the number of updates waiting to be written."""
+        with self._lock:
+            return len(self._pending)
+
+    def Start(self, tick=0.5):
+        """Flush pending updates in a background thread every tick seconds."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._Run, args=(tick,),
+                                        name='statusio-updater')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def Stop(self, flush=True):
+        """Stop the background thread, writing what is still pending."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if flush:
+            self.Flush(force=True)
+
+    def _Run(self, tick):
+        while not self._stop.wait(tick):
+            try:
+                self.Flush()
+            except Exception as e:
+                print('Error: ' + str(e))
+
+    def _Due(self, key, now):
+        code, _, first_seen, changed_at = self._pending[key]
+        overdue = (self.max_delay is not None and
+                   now - first_seen >= self.max_delay)
+        if not overdue and now - changed_at < self.debounce:
+            return False
+        written_at = self._written_at.get(key)
+        return written_at is None or now - written_at >= self.hold_down
+
+    def _Write(self, key, details, code):
+        # The caller has marked key as being written.
+        statuspage_id, component, container = key
+        try:
+            data = self._api.ComponentStatusUpdate(
+                statuspage_id, component, container, details, code)
+            check_result(data)
+        except Exception:
+            with self._lock:
+                del self._writing[key]
+                self.stats['failed'] += 1
+            raise
+        with self._lock:
+            del self._writing[key]
+            self._known[key] = code
+            self._written_at[key] = self._clock()
+            self.stats['written'] += 1
+        return data
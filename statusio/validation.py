@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+
+"""Local validation of API arguments, before anything is sent"""
+
+import re
+
+from statusio.codes import STATE, STATUS
+from statusio.errors import ValidationError
+
+# component_id-container_id
+_COMBO = re.compile(r'^[^\s-]+-[^\s-]+$')
+
+_STRINGS = (str, type(u''))
+_STATUS_CODES = frozenset(STATUS)
+_STATE_CODES = frozenset(STATE)
+_SUBSCRIBER_METHODS = frozenset(('email', 'sms', 'webhook'))
+
+# Number of values of each MetricUpdate series.
+_SERIES = (('day', 24), ('week', 7), ('month', 30))
+
+
+def _Code(codes, what):
+    def check(value):
+        try:
+            if int(value) in codes:
+                return None
+        except (TypeError, ValueError):
+            pass
+        return 'invalid %s %r, expected one of %s' % (
+            what, value, ', '.join(str(c) for c in sorted(codes)))
+    return check
+
+
+def _OneOf(values, what):
+    def check(value):
+        if value not in values:
+            return 'invalid %s %r, expected one of %s' % (
+                what, value, ', '.join(sorted(values)))
+    return check
+
+
+def _Combos(value):
+    if not isinstance(value, (list, tuple)):
+        return 'expected a list of component-container combos, got %r' % (
+            value,)
+    for combo in value:
+        if not isinstance(combo, _STRINGS) or not _COMBO.match(combo):
+            return 'invalid component-container combo %r' % (combo,)
+
+
+def _Metric(data):
+    for name, size in _SERIES:
+        dates = data.get('%s_dates' % name)
+        values = data.get('%s_values' % name)
+        if not isinstance(values, (list, tuple)) or len(values) != size:
+            return '%s_values must be %d values' % (name, size)
+        if not isinstance(dates, (list, tuple)) or len(dates) != len(values):
+            return '%s_dates must match %s_values' % (name, name)
+        for value in values:
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                return 'invalid %s value %r' % (name, value)
+
+
+_STATUS_CHECK = _Code(_STATUS_CODES, 'current_status')
+_STATE_CHECK = _Code(_STATE_CODES, 'current_state')
+
+# Endpoint name -> ((field, check), ...). A check takes the field's value,
+# or the whole payload when field is None, and returns an error message or
+# None.
+SCHEMAS = {
+    'ComponentStatusUpdate': (('current_status', _STATUS_CHECK),),
+    'IncidentCreate': (('infrastructure_affected', _Combos),
+                       ('current_status', _STATUS_CHECK),
+                       ('current_state', _STATE_CHECK)),
+    'IncidentUpdate': (('current_status', _STATUS_CHECK),
+                       ('current_state', _STATE_CHECK)),
+    'IncidentResolve': (('current_status', _STATUS_CHECK),
+                        ('current_state', _STATE_CHECK)),
+    'MaintenanceSchedule': (('infrastructure_affected', _Combos),),
+    'MetricUpdate': ((None, _Metric),),
+    'SubscriberAdd': (('method', _OneOf(_SUBSCRIBER_METHODS, 'method')),),
+}
+
+
+def validate(endpoint, data):
+    """Check the payload of a request to an endpoint.
+
+       Args:
+         endpoint:
+           Endpoint name, e.g. 'IncidentCreate'.
+         data:
+           The dict of arguments to send.
+
+       Raises:
+         statusio.errors.ValidationError if the API would reject the payload.
+    """
+    for field, check in SCHEMAS.get(endpoint, ()):
+        error = check(data if field is None else data.get(field))
+        if error is not None:
+            raise ValidationError('%s: %s' % (endpoint, error), endpoint,
+                                  field)
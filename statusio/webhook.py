@@ -0,0 +1,164 @@
+#!/usr/bin/env python
+
+"""Receive Status.io webhook notifications"""
+from __future__ import print_function
+
+import hmac
+import re
+import threading
+from wsgiref.simple_server import WSGIRequestHandler, make_server
+
+try:
+    # python 3
+    from urllib.parse import parse_qs
+except ImportError:
+    from urlparse import parse_qs
+
+from statusio import json
+from statusio.codes import status_code
+from statusio.errors import StatusioError
+from statusio.state import StatusEvent
+
+_ID_RE = re.compile(r'/([0-9a-f]{24})(?=/|$)')
+
+
+def parse_webhook(payload, statuspage_id=None):
+    """Turn a Status.io webhook payload into a StatusEvent.
+
+       Args:
+         payload:
+           The decoded JSON body of the webhook.
+         statuspage_id:
+           Status page the webhook belongs to. Taken from the payload's
+           incident/maintenance URL when not given. [Optional]
+
+       Returns:
+         A StatusEvent.
+    """
+    if not isinstance(payload, dict):
+        raise StatusioError('Invalid webhook payload')
+    if 'incident_url' in payload or 'incident_name' in payload:
+        kind = 'incident'
+    elif 'maintenance_url' in payload or 'maintenance_name' in payload:
+        kind = 'maintenance'
+    elif payload.get('components') or payload.get('component'):
+        kind = 'component'
+    else:
+        raise StatusioError('Unknown webhook payload')
+    url = payload.get('%s_url' % kind) or ''
+    ids = _ID_RE.findall(url)
+    statuspage_id = (statuspage_id or payload.get('statuspage_id') or
+                     (ids[0] if ids else None))
+    if not statuspage_id:
+        raise StatusioError('Webhook payload without status page')
+    components = payload.get('components') or [payload.get('component')]
+    containers = payload.get('containers') or [payload.get('container')]
+    return StatusEvent(
+        kind,
+        statuspage_id,
+        payload.get('id') or (ids[-1] if len(ids) > 1 else None),
+        status_code(payload.get('current_status')),
+        payload.get('current_state'),
+        tuple(_ID(c) for c in components if c),
+        tuple(_ID(c) for c in containers if c),
+        payload)
+
+
+class WebhookReceiver(object):
+    """A WSGI application applying Status.io webhooks to a StatusCache.
+
+    Point the status page webhook at http://host:port/ or, to tell pages
+    apart without relying on the payload, http://host:port/STATUSPAGE_ID.
+    If a token is set it must be passed as ?token=... on the webhook URL.
+
+    Example usage:
+
+        >>> cache = statusio.StatusCache()
+        >>> receiver = statusio.WebhookReceiver(cache, token='s3cret')
+        >>> receiver.Serve(port=8080)
+
+      or mount receiver in any WSGI server.
+    """
+
+    def __init__(self, cache, token=None):
+        """Instantiate a new statusio.WebhookReceiver object.
+
+        Args:
+          cache:
+            The statusio.StatusCache to apply events to.
+          token:
+            Shared secret expected in the ``token`` query parameter.
+            [Optional]
+        """
+        self.cache = cache
+        self.token = token
+        self._server = None
+        self._thread = None
+
+    def __call__(self, environ, start_response):
+        if environ.get('REQUEST_METHOD') != 'POST':
+            return self._Respond(start_response, '405 Method Not Allowed')
+        if self.token is not None:
+            token = parse_qs(environ.get('QUERY_STRING', '')).get('token')
+            if not token or not hmac.compare_digest(
+                    token[0].encode('utf-8'), self.token.encode('utf-8')):
+                return self._Respond(start_response, '403 Forbidden')
+        try:
+            length = int(environ.get('CONTENT_LENGTH') or 0)
+            body = environ['wsgi.input'].read(length)
+            ids = _ID_RE.findall(environ.get('PATH_INFO', ''))
+            event = parse_webhook(json.loads(body.decode('utf-8')),
+                                  ids[0] if ids else None)
+        except (StatusioError, ValueError) as e:
+            return self._Respond(start_response, '400 Bad Request', str(e))
+        self.cache.Apply(event)
+        return self._Respond(start_response, '200 OK')
+
+    def Serve(self, host='', port=8080):
+        """Serve webhooks with the stdlib HTTP server until interrupted."""
+        self._MakeServer(host, port).serve_forever()
+
+    def Start(self, host='', port=8080):
+        """Serve webhooks in a background thread.
+
+           Returns:
+             The port the server listens on, useful with port=0.
+        """
+        server = self._MakeServer(host, port)
+        self._thread = threading.Thread(target=server.serve_forever,
+                                        name='statusio-webhook')
+        self._thread.daemon = True
+        self._thread.start()
+        return server.server_port
+
+    def Stop(self):
+        """Stop the background server."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = self._thread = None
+
+    def _MakeServer(self, host, port):
+        self._server = make_server(host, port, self,
+                                   handler_class=_QuietHandler)
+        return self._server
+
+    @staticmethod
+    def _Respond(start_response, status, message=''):
+        body = message.encode('utf-8')
+        start_response(status, [('Content-Type', 'text/plain'),
+                                ('Content-Length', str(len(body)))])
+        return [body]
+
+
+class _QuietHandler(WSGIRequestHandler):
+
+    def log_message(self, *args):
+        pass
+
+
+def _ID(item):
+    if isinstance(item, dict):
+        return item.get('_id') or item.get('id')
+    return item
@@ -0,0 +1,210 @@
+# encoding: utf-8
+
+"""An in-memory stand-in for statusio.Api used by the offline tests."""
+
+import threading
+
+STATUSPAGE_ID = '568d8a3e3cada8c2490000dd'
+COMPONENT = '568d8a3e3cada8c2490000ed'
+CONTAINER = '568d8a3e3cada8c2490000ec'
+COMPONENT2 = '568d8a3e3cada8c2490000ef'
+CONTAINER2 = '568d8a3e3cada8c2490000ee'
+
+
+def ok(result=None):
+    return {'status': {'error': 'no', 'message': 'OK'}, 'result': result}
+
+
+def error(message):
+    return {'status': {'error': 'yes', 'message': message}}
+
+
+class Clock(object):
+    """A clock for the tests to move by hand."""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class Response(object):
+    """A successful HTTP response with the given body."""
+
+    def __init__(self, content):
+        self.status_code = 200
+        self.content = content
+
+
+class FakeApi(object):
+
+    def __init__(self):
+        self.calls = []
+        self._lock = threading.Lock()
+        self.components = [
+            {'_id': COMPONENT, 'name': 'Website',
+             'containers': [{'_id': CONTAINER, 'name': 'US East'}]},
+            {'_id': COMPONENT2, 'name': 'API',
+             'containers': [{'_id': CONTAINER, 'name': 'US East'},
+                            {'_id': CONTAINER2, 'name': 'EU West'}]},
+        ]
+        self.incidents = {}
+        self.maintenances = {}
+        self.subscribers = {'email': [], 'sms': [], 'webhook': []}
+        self.status = {}
+        self.metrics = {}
+        self.messages = {}
+        self._next_id = 0
+
+    def _Call(self, name, *args):
+        with self._lock:
+            self.calls.append((name,) + args)
+
+    def _NewID(self):
+        with self._lock:
+            self._next_id += 1
+            return '%024x' % self._next_id
+
+    def Count(self, name):
+        return len([c for c in self.calls if c[0] == name])
+
+    def ComponentList(self, statuspage_id):
+        self._Call('ComponentList', statuspage_id)
+        return ok(self.components)
+
+    def ComponentStatusUpdate(self, statuspage_id, component, container,
+                              details, current_status):
+        self._Call('ComponentStatusUpdate', statuspage_id, component,
+                   container, details, current_status)
+        self.status[(component, container)] = int(current_status)
+        return ok()
+
+    def IncidentListByID(self, statuspage_id):
+        self._Call('IncidentListByID', statuspage_id)
+        return ok({
+            'active_incidents': [i for i, e in sorted(self.incidents.items())
+                                 if e['state'] == 'active'],
+            'resolved_incidents': [i for i, e in sorted(self.incidents.items())
+                                   if e['state'] == 'resolved'],
+        })
+
+    def IncidentSingle(self, statuspage_id, incident_id):
+        self._Call('IncidentSingle', statuspage_id, incident_id)
+        if incident_id not in self.incidents:
+            return error('Incident not found')
+        return ok(self.incidents[incident_id]['data'])
+
+    def IncidentUpdate(self, statuspage_id, incident_id, incident_details,
+                       current_status, current_state, **kwargs):
+        self._Call('IncidentUpdate', statuspage_id, incident_id)
+        if incident_id not in self.incidents:
+            return error('Incident not found')
+        data = self.incidents[incident_id]['data']
+        data['current_status'] = current_status
+        data['current_state'] = current_state
+        return ok()
+
+    def IncidentResolve(self, statuspage_id, incident_id, incident_details,
+                        current_status, current_state, **kwargs):
+        self._Call('IncidentResolve', statuspage_id, incident_id)
+        if incident_id not in self.incidents:
+            return error('Incident not found')
+        self.incidents[incident_id]['state'] = 'resolved'
+        return ok()
+
+    def IncidentDelete(self, statuspage_id, incident_id):
+        self._Call('IncidentDelete', statuspage_id, incident_id)
+        if self.incidents.pop(incident_id, None) is None:
+            return error('Incident not found')
+        return ok()
+
+    def IncidentMessage(self, statuspage_id, message_id):
+        self._Call('IncidentMessage', statuspage_id, message_id)
+        if message_id not in self.messages:
+            return error('Message not found')
+        return ok(self.messages[message_id])
+
+    def MaintenanceListByID(self, statuspage_id):
+        self._Call('MaintenanceListByID', statuspage_id)
+        result = {}
+        for state in ('active', 'upcoming', 'resolved'):
+            result['%s_maintenances' % state] = [
+                i for i, e in sorted(self.maintenances.items())
+                if e['state'] == state]
+        return ok(result)
+
+    def MaintenanceSingle(self, statuspage_id, maintenance_id):
+        self._Call('MaintenanceSingle', statuspage_id, maintenance_id)
+        if maintenance_id not in self.maintenances:
+            return error('Maintenance not found')
+        return ok(self.maintenances[maintenance_id]['data'])
+
+    def MaintenanceSchedule(self, statuspage_id, infrastructure_affected,
+                            maintenance_name, maintenance_details,
+                            date_planned_start, time_planned_start,
+                            date_planned_end, time_planned_end, **kwargs):
+        self._Call('MaintenanceSchedule', statuspage_id, maintenance_name)
+        if maintenance_name == 'fail':
+            return error('Invalid maintenance')
+        start = '%sT%s:00Z' % (date_planned_start.replace('/', '-'),
+                               time_planned_start)
+        end = '%sT%s:00Z' % (date_planned_end.replace('/', '-'),
+                             time_planned_end)
+        return ok(self.AddMaintenance(
+            maintenance_name, start, end,
+            components=[c.split('-')[0] for c in infrastructure_affected]))
+
+    def MaintenanceMessage(self, statuspage_id, message_id):
+        self._Call('MaintenanceMessage', statuspage_id, message_id)
+        if message_id not in self.messages:
+            return error('Message not found')
+        return ok(self.messages[message_id])
+
+    def MetricUpdate(self, statuspage_id, metric_id, **kwargs):
+        self._Call('MetricUpdate', statuspage_id, metric_id)
+        for name, size in (('day', 24), ('week', 7), ('month', 30)):
+            if len(kwargs['%s_values' % name]) != size:
+                return error('Invalid %s_values' % name)
+        self.metrics[metric_id] = kwargs
+        return ok()
+
+    def SubscriberList(self, statuspage_id):
+        self._Call('SubscriberList', statuspage_id)
+        return ok(self.subscribers)
+
+    def StatusSummary(self, statuspage_id):
+        self._Call('StatusSummary', statuspage_id)
+        status = []
+        for c in self.components:
+            containers = []
+            for k in c['containers']:
+                code = self.status.get((c['_id'], k['_id']), 100)
+                containers.append({'id': k['_id'], 'name': k['name'],
+                                   'status_code': code})
+            status.append({'id': c['_id'], 'name': c['name'],
+                           'status_code': max(k['status_code']
+                                              for k in containers),
+                           'containers': containers})
+        return ok({'status': status,
+                   'incidents': [e['data'] for e in self.incidents.values()
+                                 if e['state'] == 'active']})
+
+    def AddIncident(self, name, state='active', components=(), containers=()):
+        incident_id = self._NewID()
+        self.incidents[incident_id] = {'state': state, 'data': {
+            '_id': incident_id, 'name': name,
+            'components': [{'_id': c} for c in components],
+            'containers': [{'_id': c} for c in containers]}}
+        return incident_id
+
+    def AddMaintenance(self, name, start, end, state='upcoming',
+                       components=(), containers=()):
+        maintenance_id = self._NewID()
+        self.maintenances[maintenance_id] = {'state': state, 'data': {
+            '_id': maintenance_id, 'name': name,
+            'datetime_planned_start': start,
+            'datetime_planned_end': end,
+            'components': [{'_id': c} for c in components],
+            'containers': [{'_id': c} for c in containers]}}
+        return maintenance_id
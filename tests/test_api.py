@@ -16,11 +16,31 @@ METRIC_ID = '568d8ab5efe35d412f0006f8'
 ID1 = ''
 ID2 = ''
 
+# Without credentials the tests replay responses from this cassette. Set
+# API_ID/API_KEY to run against the live API, and STATUSIO_RECORD=1 as well
+# to record a new cassette.
+CASSETTE = os.path.join(os.path.dirname(__file__), 'cassettes',
+                        'test_api.jsonl')
+
 
 class ApiTest(unittest.TestCase):
 
+    @classmethod
+    def setUpClass(cls):
+        if not API_ID:
+            cls._transport = statusio.ReplayTransport(CASSETTE)
+        elif os.environ.get('STATUSIO_RECORD'):
+            cls._transport = statusio.RecordingTransport(CASSETTE)
+        else:
+            cls._transport = None
+
+    @classmethod
+    def tearDownClass(cls):
+        if cls._transport is not None:
+            cls._transport.Close()
+
     def setUp(self):
-        self._api = statusio.Api(API_ID, API_KEY)
+        self._api = statusio.Api(API_ID, API_KEY, transport=self._transport)
 
     # STATUS
 
@@ -219,7 +239,8 @@ class ApiTest(unittest.TestCase):
                                        "2014-03-29T00:43:00+00:00",
                                        "2014-03-29T01:43:00+00:00",
                                        "2014-03-29T02:43:00+00:00",
-                                       "2014-03-29T03:43:00+00:00"],
+                                       "2014-03-29T03:43:00+00:00",
+                                       "2014-03-29T04:43:00+00:00"],
                                       [20.70,
                                        20.00,
                                        19.20,
@@ -242,7 +263,8 @@ class ApiTest(unittest.TestCase):
                                        21.40,
                                        19.80,
                                        19.50,
-                                       20.00],
+                                       20.00,
+                                       20.30],
                                       20.07,
                                       1395463478000,
                                       ["2014-03-22T04:43:00+00:00",
@@ -289,7 +311,8 @@ class ApiTest(unittest.TestCase):
                                           "2014-03-25T04:43:00+00:00",
                                           "2014-03-26T04:43:00+00:00",
                                           "2014-03-27T04:43:00+00:00",
-                                          "2014-03-28T04:43:00+00:00"],
+                                          "2014-03-28T04:43:00+00:00",
+                                          "2014-03-29T04:43:00+00:00"],
                                       [0.00,
                                           0.00,
                                           0.00,
@@ -318,7 +341,8 @@ class ApiTest(unittest.TestCase):
                                           22.40,
                                           22.50,
                                           22.00,
-                                          21.80])
+                                          21.80,
+                                          21.90])
         self.assertEqual(data['status']['error'], 'no')
 
     # COMPONENT
@@ -0,0 +1,135 @@
+# encoding: utf-8
+
+import os
+import shutil
+import tempfile
+import unittest
+import statusio
+
+from tests.fake_api import (FakeApi, STATUSPAGE_ID, COMPONENT, CONTAINER,
+                            COMPONENT2, CONTAINER2)
+
+COMBO = '%s-%s' % (COMPONENT, CONTAINER)
+COMBO2 = '%s-%s' % (COMPONENT2, CONTAINER)
+
+
+class MaintenanceSchedulerTest(unittest.TestCase):
+
+    def setUp(self):
+        self._api = FakeApi()
+        self._api.AddMaintenance('Existing', '2030-01-01T00:00:00.000Z',
+                                 '2030-01-01T02:00:00.000Z',
+                                 components=[COMPONENT])
+        self._scheduler = statusio.MaintenanceScheduler(
+            self._api, STATUSPAGE_ID)
+
+    def testSchedule(self):
+        # Test the statusio.MaintenanceScheduler.Schedule method
+        report = self._scheduler.Schedule([
+            {'name': 'clash', 'infrastructure_affected': [COMBO],
+             'start': '2030-01-01T01:00:00Z', 'end': '2030-01-01T03:00:00Z'},
+            {'name': 'other component', 'infrastructure_affected': COMBO2,
+             'start': '2030-01-01T01:00:00Z', 'end': '2030-01-01T03:00:00Z'},
+            {'name': 'same batch', 'infrastructure_affected': [COMBO2],
+             'date_planned_start': '2030/01/01', 'time_planned_start': '02:00',
+             'date_planned_end': '2030/01/01', 'time_planned_end': '04:00'},
+            {'name': 'later', 'infrastructure_affected': [COMBO],
+             'start': '2030-01-01T02:00:00Z', 'end': '2030-01-01T03:00:00Z'},
+            {'name': 'fail', 'infrastructure_affected': [COMBO],
+             'start': '2030-02-01T02:00:00Z', 'end': '2030-02-01T03:00:00Z'},
+            {'name': 'backwards', 'infrastructure_affected': [COMBO],
+             'start': '2030-02-01T02:00:00Z', 'end': '2030-02-01T01:00:00Z'},
+        ])
+        self.assertEqual(
+            sorted(e['item']['name'] for e in report.succeeded),
+            ['later', 'other component'])
+        self.assertEqual(
+            [e['item']['name'] for e in report.skipped],
+            ['clash', 'same batch', 'backwards'])
+        self.assertEqual([e['item']['name'] for e in report.failed], ['fail'])
+        self.assertEqual(self._api.Count('MaintenanceSchedule'), 3)
+
+    def testDryRun(self):
+        # A dry run normalizes without scheduling
+        report = self._scheduler.Schedule([
+            {'name': 'Patch', 'infrastructure_affected': [COMBO],
+             'start': '2030-03-01T05:00:00Z', 'end': '2030-03-01T06:30:00Z',
+             'automation': 1}], dry_run=True)
+        args = report.succeeded[0]['result']
+        self.assertEqual(args['date_planned_start'], '2030/03/01')
+        self.assertEqual(args['time_planned_end'], '06:30')
+        self.assertEqual(args['automation'], '1')
+        self.assertEqual(self._api.Count('MaintenanceSchedule'), 0)
+
+    def testLoad(self):
+        # Test loading windows from a CSV file
+        tmp = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmp, 'windows.csv')
+            with open(path, 'w') as f:
+                f.write('name,infrastructure_affected,start,end\n')
+                f.write('Patch,%s %s,2030-03-01 05:00,2030-03-01 06:00\n'
+                        % (COMBO, COMBO2))
+            report = self._scheduler.Schedule(self._scheduler.Load(path))
+            self.assertEqual(len(report.succeeded), 1)
+        finally:
+            shutil.rmtree(tmp)
+
+
+class BulkIncidentsTest(unittest.TestCase):
+
+    def setUp(self):
+        self._api = FakeApi()
+        self._outage = [
+            self._api.AddIncident('Outage: website', components=[COMPONENT]),
+            self._api.AddIncident('outage: API', components=[COMPONENT2],
+                                  containers=[CONTAINER2]),
+        ]
+        self._other = self._api.AddIncident('Slow API',
+                                            components=[COMPONENT2])
+        self._old = self._api.AddIncident('Outage: old', state='resolved',
+                                          components=[COMPONENT])
+        self._bulk = statusio.BulkIncidents(self._api, STATUSPAGE_ID)
+
+    def _IDs(self, incidents):
+        return sorted(i['_id'] for i in incidents)
+
+    def testSelect(self):
+        # Test the statusio.BulkIncidents.Select filters
+        self.assertEqual(self._IDs(self._bulk.Select(name='^outage')),
+                         sorted(self._outage))
+        self.assertEqual(self._IDs(self._bulk.Select(component=COMPONENT2)),
+                         sorted([self._outage[1], self._other]))
+        self.assertEqual(self._IDs(self._bulk.Select(container=CONTAINER2)),
+                         [self._outage[1]])
+        self.assertEqual(
+            self._IDs(self._bulk.Select(state=None, component=COMPONENT)),
+            sorted([self._outage[0], self._old]))
+
+    def testResolve(self):
+        # Selected incidents are resolved, unknown ones fail
+        report = self._bulk.Resolve(
+            self._bulk.Select(name='outage') + ['missing'],
+            'Fixed', 100, 300, notify_email='1')
+        self.assertEqual(len(report.succeeded), 2)
+        self.assertEqual([e['item'] for e in report.failed], ['missing'])
+        self.assertEqual(self._IDs(self._bulk.Select()), [self._other])
+
+    def testUpdateDelete(self):
+        report = self._bulk.Update([self._other], 'Looking', 300, 100)
+        self.assertEqual(len(report.succeeded), 1)
+        self.assertEqual(
+            self._api.incidents[self._other]['data']['current_status'], 300)
+        self._bulk.Delete(self._outage)
+        self.assertEqual(sorted(self._api.incidents),
+                         sorted([self._other, self._old]))
+
+    def testDryRun(self):
+        # A dry run reports the calls without making them
+        report = self._bulk.Resolve(self._outage, 'Fixed', 100, 300,
+                                    dry_run=True, notify_sms='1')
+        self.assertEqual(report.succeeded[0]['result'], {
+            'statuspage_id': STATUSPAGE_ID, 'incident_id': self._outage[0],
+            'incident_details': 'Fixed', 'current_status': 100,
+            'current_state': 300, 'notify_sms': '1'})
+        self.assertEqual(self._api.Count('IncidentResolve'), 0)
@@ -0,0 +1,72 @@
+# encoding: utf-8
+
+import io
+import json
+import sys
+import time
+import unittest
+from statusio import cli
+
+from tests.fake_api import FakeApi, STATUSPAGE_ID, COMPONENT, CONTAINER
+
+OTHER_PAGE = '568d8a3e3cada8c2490000de'
+
+
+class SlowApi(FakeApi):
+
+    def ComponentStatusUpdate(self, statuspage_id, *args):
+        # Later operations finish first unless ordering is enforced.
+        time.sleep(0.02 / (1 + len(self.calls)))
+        return FakeApi.ComponentStatusUpdate(self, statuspage_id, *args)
+
+
+class BatchRunnerTest(unittest.TestCase):
+
+    def testOrdering(self):
+        # Operations on one status page run in input order
+        api = SlowApi()
+        results = []
+        operations = []
+        for i in range(10):
+            operations.append(json.dumps({
+                'id': i, 'method': 'ComponentStatusUpdate',
+                'args': [STATUSPAGE_ID if i % 2 else OTHER_PAGE, COMPONENT,
+                         CONTAINER, 'details', 100 + i]}))
+        runner = cli.BatchRunner(api, concurrency=4, output=results.append)
+        self.assertEqual(runner.Run(operations), 0)
+        self.assertEqual(len(results), 10)
+        for page in (STATUSPAGE_ID, OTHER_PAGE):
+            codes = [c[5] for c in api.calls if c[1] == page]
+            self.assertEqual(codes, sorted(codes))
+
+    def testErrors(self):
+        # Bad operations are reported without stopping the batch
+        results = []
+        runner = cli.BatchRunner(FakeApi(), output=results.append)
+        failed = runner.Run([
+            'not json',
+            '[1, 2]',
+            {'method': 'Nope', 'args': [STATUSPAGE_ID]},
+            {'method': 'StatusSummary'},
+            {'method': '_RequestUrl', 'args': [STATUSPAGE_ID]},
+            {'method': 'StatusSummary',
+             'kwargs': {'statuspage_id': STATUSPAGE_ID}},
+            # Neither an unhashable statuspage_id nor a method that is no
+            # endpoint aborts or hangs the batch
+            {'method': 'StatusSummary', 'args': [['x']]},
+            {'method': 'StatusSummary', 'args': 1},
+            {'method': 'Warmup', 'args': [1]},
+        ])
+        self.assertEqual(failed, 8)
+        ok = [r for r in results if 'result' in r]
+        self.assertEqual(len(ok), 1)
+        self.assertEqual(ok[0]['id'], 6)
+
+    def testArguments(self):
+        # Credentials are required
+        stderr = sys.stderr
+        sys.stderr = io.StringIO() if sys.version_info[0] > 2 else io.BytesIO()
+        try:
+            self.assertRaises(SystemExit, cli.main, ['batch'])
+        finally:
+            sys.stderr = stderr
@@ -0,0 +1,111 @@
+# encoding: utf-8
+
+import unittest
+import statusio
+from statusio import json
+from statusio.errors import ValidationError
+
+from tests.fake_api import (FakeApi, Clock, STATUSPAGE_ID, COMPONENT,
+                            CONTAINER, COMPONENT2, CONTAINER2)
+
+
+class ComponentIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self._api = FakeApi()
+        self._clock = Clock()
+        self._index = statusio.ComponentIndex(self._api, ttl=60,
+                                              clock=self._clock)
+
+    def testNames(self):
+        # Names are matched ignoring case, IDs pass through unfetched
+        self.assertEqual(self._index.Component(STATUSPAGE_ID, COMPONENT2),
+                         COMPONENT2)
+        self.assertEqual(self._api.Count('ComponentList'), 0)
+        self.assertEqual(self._index.Component(STATUSPAGE_ID, 'website'),
+                         COMPONENT)
+        self.assertEqual(self._index.Container(STATUSPAGE_ID, 'EU West'),
+                         CONTAINER2)
+        self.assertEqual(self._index.Component(STATUSPAGE_ID, 'AP?'),
+                         COMPONENT2)
+        self.assertEqual(self._api.Count('ComponentList'), 1)
+
+    def testUnknown(self):
+        self.assertRaises(ValidationError, self._index.Component,
+                          STATUSPAGE_ID, 'Database')
+        # A glob matching several containers is ambiguous
+        self.assertRaises(ValidationError, self._index.Container,
+                          STATUSPAGE_ID, '* *')
+        self.assertRaises(ValidationError, self._index.Combos,
+                          STATUSPAGE_ID, ['API/Asia'])
+
+    def testCombos(self):
+        combo = '%s-%s' % (COMPONENT, CONTAINER)
+        self.assertEqual(self._index.Combos(STATUSPAGE_ID,
+                                            ['Website/US East']), [combo])
+        # A component alone stands for all of its containers
+        self.assertEqual(
+            self._index.Combos(STATUSPAGE_ID, 'API, %s' % combo),
+            ['%s-%s' % (COMPONENT2, CONTAINER),
+             '%s-%s' % (COMPONENT2, CONTAINER2), combo])
+        self.assertEqual(len(self._index.Combos(STATUSPAGE_ID,
+                                                ['*/us east'])), 2)
+
+    def testTtl(self):
+        self._index.Component(STATUSPAGE_ID, 'Website')
+        self._api.components[0]['name'] = 'Homepage'
+        self._clock.now += 30
+        self.assertEqual(self._index.Component(STATUSPAGE_ID, 'Website'),
+                         COMPONENT)
+        self._clock.now += 30
+        self.assertEqual(self._index.Component(STATUSPAGE_ID, 'Homepage'),
+                         COMPONENT)
+        self.assertEqual(self._api.Count('ComponentList'), 2)
+        self._index.Invalidate()
+        self._index.Component(STATUSPAGE_ID, 'Homepage')
+        self.assertEqual(self._api.Count('ComponentList'), 3)
+
+
+class ResolveNamesTest(unittest.TestCase):
+
+    def setUp(self):
+        self._stub = statusio.StubTransport()
+        self._stub.Add('*', '', {'status': {'error': 'no'}})
+        self._stub.Add('GET', '/component/list/', {
+            'status': {'error': 'no'}, 'result': FakeApi().components})
+        self._api = statusio.Api('id', 'key', transport=self._stub,
+                                 resolve_names=True)
+
+    def _Sent(self):
+        return json.loads(self._stub.requests[-1][2])
+
+    def testComponentStatusUpdate(self):
+        self._api.ComponentStatusUpdate(STATUSPAGE_ID, 'API', 'EU West',
+                                        'Degraded', 300)
+        sent = self._Sent()
+        self.assertEqual((sent['component'], sent['container']),
+                         (COMPONENT2, CONTAINER2))
+
+    def testResponseModes(self):
+        # Names resolve whatever the Api returns to its callers
+        for mode in ('raw', 'lazy'):
+            api = statusio.Api('id', 'key', transport=self._stub,
+                               resolve_names=True, response_mode=mode)
+            api.ComponentStatusUpdate(STATUSPAGE_ID, 'Website', 'US East',
+                                      'Degraded', 300)
+            self.assertEqual(self._Sent()['component'], COMPONENT)
+
+    def testCombos(self):
+        self._api.IncidentCreate(STATUSPAGE_ID, ['Website'], 'name',
+                                 'details', 300, 100)
+        self.assertEqual(self._Sent()['infrastructure_affected'],
+                         ['%s-%s' % (COMPONENT, CONTAINER)])
+        with self.assertRaises(ValidationError) as context:
+            self._api.SubscriberAdd(STATUSPAGE_ID, 'email', 'a@example.com',
+                                    granular=['Database'])
+        self.assertEqual(context.exception.field, 'granular')
+        self.assertEqual(len(self._stub.requests), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+# encoding: utf-8
+
+import threading
+import unittest
+import statusio
+from statusio.concurrency import run_concurrently
+
+from tests.fake_api import Clock, STATUSPAGE_ID
+
+
+class AdaptiveLimiterTest(unittest.TestCase):
+
+    def setUp(self):
+        self._clock = Clock()
+        self._limiter = statusio.AdaptiveLimiter(initial=4, maximum=6,
+                                                 clock=self._clock)
+
+    def _Round(self, latency, overloaded=False):
+        limit = self._limiter.limit
+        for _ in range(limit):
+            self.assertTrue(self._limiter.Acquire(timeout=0))
+        self.assertFalse(self._limiter.Acquire(timeout=0))
+        for _ in range(limit):
+            self._limiter.Release(latency, overloaded)
+
+    def testGrow(self):
+        # Full rounds with steady latency raise the limit up to the maximum
+        self._Round(0.1)
+        self._Round(0.1)
+        self.assertEqual(self._limiter.limit, 4)
+        self._Round(0.1)
+        self.assertEqual(self._limiter.limit, 5)
+        for _ in range(5):
+            self._Round(0.1)
+        self.assertEqual(self._limiter.limit, 6)
+
+    def testIdle(self):
+        # Requests below the limit do not raise it
+        for _ in range(20):
+            self._limiter.Acquire()
+            self._limiter.Release(0.1)
+        self.assertEqual(self._limiter.limit, 4)
+
+    def testOverload(self):
+        # Overload halves the limit once per round trip
+        self._Round(0.1, overloaded=True)
+        self.assertEqual(self._limiter.limit, 2)
+        self._clock.now += 1
+        self._Round(0.1, overloaded=True)
+        self.assertEqual(self._limiter.limit, 1)
+        self._Round(0.1, overloaded=True)
+        self.assertEqual(self._limiter.limit, 1)
+
+    def testLatency(self):
+        # Latency well above the baseline is taken as overload
+        for _ in range(3):
+            self._Round(0.1)
+        self.assertEqual(self._limiter.limit, 5)
+        self._Round(1.0)
+        self.assertEqual(self._limiter.limit, 2)
+
+    def testApi(self):
+        # The Api keeps requests in flight under the limit and backs off on 429
+        state = {'now': 0, 'max': 0}
+        lock = threading.Lock()
+
+        def slow(verb, url, body):
+            with lock:
+                state['now'] += 1
+                state['max'] = max(state['max'], state['now'])
+            threading.Event().wait(0.01)
+            with lock:
+                state['now'] -= 1
+            return {'status': {'error': 'no'}}
+
+        stub = statusio.StubTransport()
+        stub.Add('GET', 'status/summary', slow)
+        stub.Add('GET', 'component/list', {}, status=429)
+        limiter = statusio.AdaptiveLimiter(initial=2, maximum=2)
+        api = statusio.Api('id', 'key', transport=stub,
+                           concurrency_limiter=limiter)
+        results = run_concurrently(lambda i: api.StatusSummary(STATUSPAGE_ID),
+                                   range(20), max_workers=8)
+        self.assertEqual(len(results), 20)
+        self.assertEqual(state['max'], 2)
+        api.ComponentList(STATUSPAGE_ID)
+        self.assertEqual(limiter.limit, 1)
+        self.assertEqual(limiter.in_flight, 0)
+
+    def testApiRaises(self):
+        # Any exception from the transport releases the limiter slot
+        def broken(verb, url, body):
+            raise ValueError('broken')
+
+        stub = statusio.StubTransport()
+        stub.Add('GET', 'status/summary', broken)
+        limiter = statusio.AdaptiveLimiter(initial=1, maximum=1)
+        api = statusio.Api('id', 'key', transport=stub,
+                           concurrency_limiter=limiter)
+        for _ in range(3):
+            self.assertRaises(ValueError, api.StatusSummary, STATUSPAGE_ID)
+        self.assertEqual(limiter.in_flight, 0)
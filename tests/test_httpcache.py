@@ -0,0 +1,152 @@
+# encoding: utf-8
+
+import os
+import shutil
+import tempfile
+import unittest
+import statusio
+from statusio import json
+from statusio.response import Response
+
+from tests.fake_api import Clock, STATUSPAGE_ID
+
+
+class ETagTransport(statusio.Transport):
+    """Answers with an ETag and honors If-None-Match."""
+
+    def __init__(self, etag='"v1"'):
+        self.etag = etag
+        self.requests = []
+
+    def Request(self, verb, url, body=None, headers=None):
+        self.requests.append(headers or {})
+        if self.etag and (headers or {}).get('if-none-match') == self.etag:
+            return Response(304, b'')
+        content = json.dumps({'status': {'error': 'no'},
+                              'result': [{'etag': self.etag}]})
+        headers = {'ETag': self.etag} if self.etag else {}
+        return Response(200, content.encode('utf-8'), headers)
+
+
+class CountingLimiter(statusio.RateLimiter):
+
+    def __init__(self):
+        statusio.RateLimiter.__init__(self, 1000)
+        self.acquired = 0
+
+    def Acquire(self, *args, **kwargs):
+        self.acquired += 1
+        return statusio.RateLimiter.Acquire(self, *args, **kwargs)
+
+
+class HttpCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self._dir = tempfile.mkdtemp()
+        self._clock = Clock()
+        self._transport = ETagTransport()
+
+    def tearDown(self):
+        shutil.rmtree(self._dir)
+
+    def _Api(self, api_key='key', rate_limiter=None, **kwargs):
+        cache = statusio.HttpCache(self._dir, clock=self._clock, **kwargs)
+        return statusio.Api('id', api_key, transport=self._transport,
+                            http_cache=cache, rate_limiter=rate_limiter)
+
+    def testRevalidate(self):
+        self._Api().ComponentList(STATUSPAGE_ID)
+        # A new Api, e.g. in the next process, revalidates and gets a 304
+        api = self._Api()
+        result = api.ComponentList(STATUSPAGE_ID)
+        self.assertEqual(result['result'], [{'etag': '"v1"'}])
+        self.assertEqual(self._transport.requests[-1]['if-none-match'],
+                         '"v1"')
+        stats = api.stats.Snapshot()['ComponentList']
+        self.assertEqual((stats['requests'], stats['cache_hits']), (1, 1))
+        # Changed data is fetched in full and replaces the cached copy
+        self._transport.etag = '"v2"'
+        result = api.ComponentList(STATUSPAGE_ID)
+        self.assertEqual(result['result'], [{'etag': '"v2"'}])
+        self.assertEqual(api.stats.Snapshot()['ComponentList']['cache_hits'],
+                         1)
+
+    def testCredentials(self):
+        self._Api().ComponentList(STATUSPAGE_ID)
+        self._Api(api_key='other').ComponentList(STATUSPAGE_ID)
+        self.assertNotIn('if-none-match', self._transport.requests[-1])
+        for root, _, names in os.walk(self._dir):
+            for name in names:
+                with open(os.path.join(root, name), 'rb') as f:
+                    self.assertNotIn(b'other', f.read())
+
+    def testMaxAge(self):
+        api = self._Api(max_age=60)
+        api.SubscriberList(STATUSPAGE_ID)
+        api.SubscriberList(STATUSPAGE_ID)
+        self.assertEqual(len(self._transport.requests), 1)
+        self._clock.now += 60
+        api.SubscriberList(STATUSPAGE_ID)
+        self.assertEqual(len(self._transport.requests), 2)
+
+    def testRateLimiter(self):
+        # Fresh hits take no token, revalidations and misses do
+        limiter = CountingLimiter()
+        api = self._Api(max_age=60, rate_limiter=limiter)
+        for _ in range(5):
+            api.ComponentList(STATUSPAGE_ID)
+        self.assertEqual((len(self._transport.requests), limiter.acquired),
+                         (1, 1))
+        self._clock.now += 60
+        api.ComponentList(STATUSPAGE_ID)
+        self.assertEqual(limiter.acquired, 2)
+        self.assertEqual(api.stats.Snapshot()['ComponentList']['cache_hits'],
+                         5)
+
+    def _Count(self, store, calls):
+        # Record the names of the DiskStore methods called.
+        def counted(name, method):
+            def call(*args):
+                calls.append(name)
+                return method(*args)
+            return call
+        for name in ('Get', 'Put'):
+            setattr(store, name, counted(name, getattr(store, name)))
+
+    def testDiskAccess(self):
+        # A cached GET reads its entry once, a 304 rewrites no body
+        api = self._Api(max_age=60)
+        api.ComponentList(STATUSPAGE_ID)
+        calls = []
+        self._Count(api.http_cache._store, calls)
+        self._clock.now += 60
+        api.ComponentList(STATUSPAGE_ID)
+        self.assertEqual(calls, ['Get'])
+        # The new timestamp makes it fresh again
+        api.ComponentList(STATUSPAGE_ID)
+        self.assertEqual(len(self._transport.requests), 2)
+        api = self._Api()
+        calls = []
+        self._Count(api.http_cache._store, calls)
+        api.ComponentList(STATUSPAGE_ID)
+        self.assertEqual(calls, ['Get'])
+
+    def testNoValidators(self):
+        # Without ETag or Last-Modified nothing is stored
+        self._transport.etag = None
+        api = self._Api()
+        api.ComponentList(STATUSPAGE_ID)
+        self.assertEqual(api.http_cache.Size(), 0)
+
+    def testEviction(self):
+        api = self._Api(max_bytes=500)
+        for i in range(10):
+            self._clock.now += 1
+            api.MaintenanceListByID('%024x' % i)
+        self.assertTrue(0 < api.http_cache.Size() <= 500)
+        api.http_cache.Clear()
+        self.assertEqual(api.http_cache.Size(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
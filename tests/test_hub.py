@@ -0,0 +1,112 @@
+# encoding: utf-8
+
+import unittest
+import statusio
+from statusio import hub
+
+from tests.fake_api import (FakeApi, Clock, STATUSPAGE_ID, COMPONENT,
+                            CONTAINER)
+
+
+class HubTest(unittest.TestCase):
+
+    def setUp(self):
+        self._api = FakeApi()
+        self._clock = Clock()
+        self._hub = statusio.Hub(self._api, interval=60, clock=self._clock)
+
+    def _Poll(self):
+        self._clock.now += 100
+        return self._hub.poller.RunDue()
+
+    def _Drain(self, subscription):
+        messages = []
+        while subscription.Pending():
+            messages.append(subscription.Get())
+        return messages
+
+    def testFanOut(self):
+        # One poll is delivered to every subscriber of its topics
+        everything = self._hub.Subscribe(STATUSPAGE_ID)
+        changes = self._hub.Subscribe(STATUSPAGE_ID, topics=[hub.CHANGES])
+        self.assertEqual(self._Poll(), [STATUSPAGE_ID])
+        self.assertEqual([m.topic for m in self._Drain(everything)],
+                         [hub.SUMMARY, hub.INCIDENTS])
+        self.assertEqual(changes.Pending(), 0)
+
+        self._api.status[(COMPONENT, CONTAINER)] = 500
+        self._api.AddIncident('Outage', components=[COMPONENT])
+        self._Poll()
+        self.assertEqual(self._api.Count('StatusSummary'), 2)
+        self.assertEqual([m.topic for m in self._Drain(everything)],
+                         [hub.SUMMARY, hub.INCIDENTS, hub.CHANGES])
+        message = changes.Get(timeout=0)
+        self.assertEqual(message.data, [((COMPONENT, CONTAINER), 100, 500)])
+
+        self._Poll()
+        self.assertEqual([m.topic for m in self._Drain(everything)],
+                         [hub.SUMMARY])
+        self.assertEqual(changes.Get(timeout=0), None)
+
+    def testIncidentChanges(self):
+        # A change to an existing incident is published, not only new ones
+        everything = self._hub.Subscribe(STATUSPAGE_ID)
+        incident_id = self._api.AddIncident('Outage', components=[COMPONENT])
+        self._Poll()
+        self._Drain(everything)
+
+        self._api.IncidentUpdate(STATUSPAGE_ID, incident_id, 'Fixing', 300,
+                                 200)
+        self._Poll()
+        messages = self._Drain(everything)
+        self.assertEqual([m.topic for m in messages],
+                         [hub.SUMMARY, hub.INCIDENTS])
+        self.assertEqual(messages[1].data[0]['current_state'], 200)
+
+        self._Poll()
+        self.assertEqual([m.topic for m in self._Drain(everything)],
+                         [hub.SUMMARY])
+
+    def testUnsubscribe(self):
+        # Pages are polled only while they have subscribers
+        first = self._hub.Subscribe(STATUSPAGE_ID)
+        second = self._hub.Subscribe(STATUSPAGE_ID)
+        first.Close()
+        self.assertEqual(self._hub.Subscribers(STATUSPAGE_ID), 1)
+        self.assertEqual(self._Poll(), [STATUSPAGE_ID])
+        second.Close()
+        self.assertEqual(self._Poll(), [])
+        self.assertEqual(self._hub.poller.Watched(), [])
+        self.assertEqual(first.Get(), None)
+        # Closing twice does not stop polling for newer subscribers
+        third = self._hub.Subscribe(STATUSPAGE_ID)
+        second.Close()
+        self.assertEqual(self._hub.poller.Watched(), [STATUSPAGE_ID])
+        third.Close()
+
+    def testTopics(self):
+        # A single topic may be given as a string, unknown topics raise
+        changes = self._hub.Subscribe(STATUSPAGE_ID, topics=hub.CHANGES)
+        self.assertEqual(changes.topics, frozenset([hub.CHANGES]))
+        self.assertRaises(statusio.StatusioError, self._hub.Subscribe,
+                          STATUSPAGE_ID, topics=['change'])
+        self.assertRaises(statusio.StatusioError, self._hub.Subscribe,
+                          STATUSPAGE_ID, topics=[])
+        self.assertEqual(self._hub.Subscribers(STATUSPAGE_ID), 1)
+
+    def testSlowConsumers(self):
+        # Full queues drop messages or disconnect, never block
+        oldest = self._hub.Subscribe(STATUSPAGE_ID, topics=[hub.SUMMARY],
+                                     maxsize=2)
+        newest = self._hub.Subscribe(STATUSPAGE_ID, topics=[hub.SUMMARY],
+                                     maxsize=2, overflow=hub.DROP_NEWEST)
+        gone = self._hub.Subscribe(STATUSPAGE_ID, topics=[hub.SUMMARY],
+                                   maxsize=2, overflow=hub.DISCONNECT)
+        for i in range(3):
+            self._hub.Publish(STATUSPAGE_ID, hub.SUMMARY, i)
+        self.assertEqual([oldest.Get(0).data, oldest.Get(0).data], [1, 2])
+        self.assertEqual([newest.Get(0).data, newest.Get(0).data], [0, 1])
+        self.assertEqual((oldest.dropped, newest.dropped), (1, 1))
+        self.assertTrue(gone.closed)
+        self.assertEqual([m.data for m in gone], [0, 1])
+        self.assertEqual(self._hub.Subscribers(STATUSPAGE_ID), 2)
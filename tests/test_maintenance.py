@@ -0,0 +1,96 @@
+# encoding: utf-8
+
+import time
+import unittest
+import statusio
+from statusio.maintenance import IntervalIndex, to_timestamp
+
+from tests.fake_api import (FakeApi, STATUSPAGE_ID, COMPONENT, CONTAINER,
+                            COMPONENT2, CONTAINER2)
+
+
+class IntervalIndexTest(unittest.TestCase):
+
+    def testQueries(self):
+        # Test the IntervalIndex point and range queries
+        index = IntervalIndex([('a', 0, 100, 'long'), ('a', 10, 20, 'short'),
+                               ('a', 50, 60, 'late'), ('b', 0, 10, 'other')])
+        self.assertTrue(index.Any('a', 15))
+        self.assertFalse(index.Any('a', 100))
+        self.assertFalse(index.Any('c', 15))
+        self.assertEqual(index.Overlapping('a', 15), ['long', 'short'])
+        self.assertEqual(index.Overlapping('a', 20, 55), ['long', 'late'])
+        self.assertEqual(index.Overlapping('b', 10, 20), [])
+        self.assertEqual(len(index), 4)
+
+    def testToTimestamp(self):
+        # Test statusio.maintenance.to_timestamp
+        self.assertEqual(to_timestamp('1970-01-01T01:00:00.000Z'), 3600)
+        self.assertEqual(to_timestamp('1970/01/01 01:00'), 3600)
+        self.assertEqual(to_timestamp('1970-01-01T02:00:00+01:00'), 3600)
+        self.assertEqual(to_timestamp(3600000000000), 3600000000)
+        self.assertRaises(statusio.StatusioError, to_timestamp, 'tomorrow')
+
+
+class MaintenanceIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self._api = FakeApi()
+        self._api.AddMaintenance('Website', '2030-01-01T00:00:00.000Z',
+                                 '2030-01-01T02:00:00.000Z',
+                                 components=[COMPONENT], containers=[CONTAINER])
+        self._api.AddMaintenance('API EU', '2030-01-02T00:00:00.000Z',
+                                 '2030-01-02T02:00:00.000Z',
+                                 components=[COMPONENT2],
+                                 containers=[CONTAINER2])
+        self._api.AddMaintenance('Everything', '2030-01-03T00:00:00.000Z',
+                                 '2030-01-03T02:00:00.000Z')
+        self._index = statusio.MaintenanceIndex(self._api, STATUSPAGE_ID)
+        self._index.Refresh()
+
+    def testPointQueries(self):
+        # Test the statusio.MaintenanceIndex.IsUnderMaintenance method
+        at = '2030-01-01T01:00:00Z'
+        self.assertTrue(self._index.IsUnderMaintenance(COMPONENT, at=at))
+        self.assertTrue(self._index.IsUnderMaintenance(container=CONTAINER,
+                                                       at=at))
+        self.assertTrue(self._index.IsUnderMaintenance(COMPONENT, CONTAINER,
+                                                       at=at))
+        self.assertFalse(self._index.IsUnderMaintenance(COMPONENT2, at=at))
+        self.assertFalse(self._index.IsUnderMaintenance(
+            COMPONENT2, CONTAINER, at='2030-01-02T01:00:00Z'))
+        self.assertTrue(self._index.IsUnderMaintenance(
+            COMPONENT2, CONTAINER, at='2030-01-03T01:00:00Z'))
+        self.assertFalse(self._index.IsUnderMaintenance(
+            COMPONENT, at='2030-01-01T02:00:00Z'))
+
+    def testRangeQueries(self):
+        # Test the statusio.MaintenanceIndex.Windows method
+        windows = self._index.Windows(at='2030-01-01T01:00:00Z',
+                                      until='2030-01-03T01:00:00Z')
+        self.assertEqual([w.name for w in windows],
+                         ['Website', 'API EU', 'Everything'])
+        windows = self._index.Windows(COMPONENT2, at='2030-01-01T00:00:00Z',
+                                      until='2030-01-04T00:00:00Z')
+        self.assertEqual([w.name for w in windows], ['API EU', 'Everything'])
+
+    def testActiveOverrun(self):
+        # Active maintenances stay ongoing until the next refresh
+        self._api.AddMaintenance('Overrun', '2020-01-01T00:00:00.000Z',
+                                 '2020-01-01T02:00:00.000Z', state='active',
+                                 components=[COMPONENT2])
+        self._index.Refresh()
+        self.assertTrue(self._index.IsUnderMaintenance(COMPONENT2))
+        self.assertTrue(0 <= self._index.Age() < 5)
+
+    def testBackgroundRefresh(self):
+        # Test the statusio.MaintenanceIndex.Start method
+        self._index.Start(interval=0.01)
+        self._api.AddMaintenance('Now', time.time() - 60, time.time() + 60,
+                                 components=[COMPONENT2])
+        deadline = time.time() + 5
+        while (not self._index.IsUnderMaintenance(COMPONENT2) and
+               time.time() < deadline):
+            time.sleep(0.01)
+        self._index.Stop()
+        self.assertTrue(self._index.IsUnderMaintenance(COMPONENT2))
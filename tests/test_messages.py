@@ -0,0 +1,79 @@
+# encoding: utf-8
+
+import shutil
+import tempfile
+import unittest
+import statusio
+
+from tests.fake_api import FakeApi, STATUSPAGE_ID
+
+
+class MessageCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self._dir = tempfile.mkdtemp()
+        self._api = FakeApi()
+        for i in range(5):
+            self._api.messages['m%d' % i] = {'_id': 'm%d' % i,
+                                             'details': 'Message %d' % i}
+
+    def tearDown(self):
+        shutil.rmtree(self._dir)
+
+    def testGet(self):
+        messages = statusio.MessageCache(self._api)
+        self.assertEqual(messages.Get(STATUSPAGE_ID, 'm1')['details'],
+                         'Message 1')
+        messages.Get(STATUSPAGE_ID, 'm1')
+        self.assertEqual(self._api.Count('IncidentMessage'), 1)
+        # Maintenance messages are cached apart
+        messages.Get(STATUSPAGE_ID, 'm1', kind='maintenance')
+        self.assertEqual(self._api.Count('MaintenanceMessage'), 1)
+        self.assertRaises(statusio.StatusioError, messages.Get,
+                          STATUSPAGE_ID, 'missing')
+        self.assertRaises(statusio.StatusioError, messages.Get,
+                          STATUSPAGE_ID, 'm1', kind='comment')
+
+    def testGetMany(self):
+        messages = statusio.MessageCache(self._api)
+        messages.Get(STATUSPAGE_ID, 'm0')
+        result = messages.GetMany(STATUSPAGE_ID,
+                                  ['m0', 'm1', 'm2', 'm1', 'missing'])
+        self.assertEqual(sorted(result), ['m0', 'm1', 'm2'])
+        # Only the misses were fetched, each once
+        self.assertEqual(sorted(c[2] for c in self._api.calls),
+                         ['m0', 'm1', 'm2', 'missing'])
+
+    def testLru(self):
+        messages = statusio.MessageCache(self._api, maxsize=2)
+        messages.Get(STATUSPAGE_ID, 'm0')
+        messages.Get(STATUSPAGE_ID, 'm1')
+        messages.Get(STATUSPAGE_ID, 'm0')
+        messages.Get(STATUSPAGE_ID, 'm2')
+        self.assertEqual(len(messages), 2)
+        self.assertTrue(messages.Cached(STATUSPAGE_ID, 'm0'))
+        self.assertIsNone(messages.Cached(STATUSPAGE_ID, 'm1'))
+
+    def testDisk(self):
+        messages = statusio.MessageCache(self._api, directory=self._dir)
+        messages.GetMany(STATUSPAGE_ID, ['m0', 'm1'])
+        # A new cache, e.g. after a restart, reads them from disk
+        messages = statusio.MessageCache(self._api, directory=self._dir)
+        self.assertEqual(messages.Get(STATUSPAGE_ID, 'm1')['details'],
+                         'Message 1')
+        self.assertEqual(self._api.Count('IncidentMessage'), 2)
+
+    def testCacheHits(self):
+        stub = statusio.StubTransport()
+        stub.Add('GET', '/incident/message/', {
+            'status': {'error': 'no'}, 'result': {'details': 'x'}})
+        api = statusio.Api('id', 'key', transport=stub)
+        messages = statusio.MessageCache(api)
+        messages.GetMany(STATUSPAGE_ID, ['m0', 'm0', 'm1'])
+        messages.GetMany(STATUSPAGE_ID, ['m0', 'm1'])
+        stats = api.stats.Snapshot()['IncidentMessage']
+        self.assertEqual((stats['requests'], stats['cache_hits']), (2, 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+# encoding: utf-8
+
+import os
+import shutil
+import tempfile
+import unittest
+import statusio
+from statusio.metrics import BINARY_RECORD, MetricBuckets, read_binary
+
+from tests.fake_api import FakeApi, STATUSPAGE_ID
+
+END = 1900000800  # 2030-03-17T18:00:00Z, on the hour
+HOUR = 3600
+
+
+class MetricBucketsTest(unittest.TestCase):
+
+    def testArgs(self):
+        # Test the day, week and month series built from hourly buckets
+        buckets = MetricBuckets(END - 10)
+        self.assertEqual(buckets.end, END)
+        buckets.Add([(END - HOUR, 10.0), (END - HOUR + 60, 20.0),
+                     (END - 2 * HOUR, 3.0), (END - 3 * 24 * HOUR, 6.0),
+                     (END, 1.0), (END - 31 * 24 * HOUR, 1.0)])
+        self.assertEqual(buckets.dropped, 2)
+        args = buckets.Args()
+        self.assertEqual(args['day_values'][-2:], [3.0, 15.0])
+        self.assertEqual(args['day_avg'], 11.0)
+        self.assertEqual(args['day_start'], (END - 24 * HOUR) * 1000)
+        self.assertEqual(args['day_dates'][-1], '2030-03-17T17:00:00+00:00')
+        self.assertEqual(args['week_values'][-1], 11.0)
+        self.assertEqual(args['week_values'][-3:-1], [6.0, 0.0])
+        self.assertEqual(args['week_avg'], 9.75)
+        self.assertEqual(len(args['month_values']), 30)
+        self.assertEqual(args['month_dates'][0], '2030-02-15T18:00:00+00:00')
+
+
+class MetricBackfillTest(unittest.TestCase):
+
+    def setUp(self):
+        self._dir = tempfile.mkdtemp()
+        self._api = FakeApi()
+        self._backfill = statusio.MetricBackfill(self._api, STATUSPAGE_ID,
+                                                 end=END)
+
+    def tearDown(self):
+        shutil.rmtree(self._dir)
+
+    def testBackfill(self):
+        # Binary and CSV files are streamed and pushed per metric
+        binary = os.path.join(self._dir, 'latency.bin')
+        with open(binary, 'wb') as f:
+            for i in range(30 * 24 * 6):
+                f.write(BINARY_RECORD.pack(END - 30 * 24 * HOUR + i * 600,
+                                           float(i % 6)))
+            f.write(b'\0\0\0')  # partial record at the end is ignored
+        self.assertEqual(len(list(read_binary(binary, chunk_size=100))),
+                         30 * 24 * 6)
+        text = os.path.join(self._dir, 'errors.csv')
+        with open(text, 'w') as f:
+            f.write('time,value\n')
+            f.write('2030-03-17T17:30:00Z,4\n')
+            f.write('%d,2\n' % (END - 1))
+        report = self._backfill.Backfill({'m1': binary, 'm2': text,
+                                          'm3': os.path.join(self._dir, 'x')})
+        self.assertEqual([e['item'] for e in report.succeeded], ['m1', 'm2'])
+        self.assertEqual([e['item'] for e in report.failed], ['m3'])
+        self.assertEqual(self._api.metrics['m1']['month_avg'], 2.5)
+        self.assertEqual(self._api.metrics['m2']['day_values'][-1], 3.0)
+
+    def testDryRun(self):
+        report = self._backfill.Backfill({'m1': [(END - 1, 5.0)]},
+                                         dry_run=True)
+        self.assertEqual(report.succeeded[0]['result']['day_avg'], 5.0)
+        self.assertEqual(self._api.Count('MetricUpdate'), 0)
@@ -0,0 +1,74 @@
+# encoding: utf-8
+
+import os
+import shutil
+import tempfile
+import unittest
+import statusio
+
+from tests.fake_api import (FakeApi, STATUSPAGE_ID, COMPONENT, CONTAINER,
+                            error)
+
+
+class MirrorTest(unittest.TestCase):
+
+    def setUp(self):
+        self._dir = tempfile.mkdtemp()
+        self._path = os.path.join(self._dir, 'status.db')
+        self._api = FakeApi()
+        self._mirror = statusio.Mirror(self._api, STATUSPAGE_ID, self._path)
+
+    def tearDown(self):
+        self._mirror.Close()
+        shutil.rmtree(self._dir)
+
+    def testSync(self):
+        # Test the statusio.Mirror.Sync method
+        active = self._api.AddIncident('Outage', components=[COMPONENT])
+        self._api.AddIncident('Old outage', state='resolved')
+        self._api.AddMaintenance('Patch', '2030-01-01T00:00:00.000Z',
+                                 '2030-01-01T02:00:00.000Z')
+        self._api.subscribers['email'].append(
+            {'_id': 'abc', 'address': 'test@example.com'})
+        self._mirror.Sync()
+
+        self.assertEqual(len(self._mirror.Components()), 2)
+        self.assertEqual(len(self._mirror.Containers(name='US East')), 2)
+        self.assertEqual(
+            [i['_id'] for i in self._mirror.Incidents(state='active')],
+            [active])
+        self.assertEqual(len(self._mirror.Incidents()), 2)
+        self.assertEqual(self._mirror.Maintenances('upcoming')[0]['name'],
+                         'Patch')
+        self.assertEqual(self._mirror.Subscribers('email')[0]['address'],
+                         'test@example.com')
+        self.assertEqual(
+            self._mirror.Summary()['status'][0]['containers'][0]['id'],
+            CONTAINER)
+        self.assertTrue(0 <= self._mirror.Lag() < 5)
+
+    def testResolvedNotRefetched(self):
+        # Resolved incidents are only fetched once
+        self._api.AddIncident('Old outage', state='resolved')
+        self._mirror.Sync()
+        self._mirror.Sync()
+        self.assertEqual(self._api.Count('IncidentSingle'), 1)
+        self.assertEqual(len(self._mirror.Incidents('resolved')), 1)
+
+    def testReadOnly(self):
+        # Readers share the file without an Api
+        self._mirror.Sync()
+        reader = statusio.Mirror(None, STATUSPAGE_ID, self._path)
+        self.assertEqual(len(reader.Components()), 2)
+        self.assertRaises(statusio.StatusioError, reader.Sync)
+        reader.Close()
+
+    def testSyncError(self):
+        # A failed sync is recorded without losing the previous copy
+        self._mirror.Sync()
+        self._api.SubscriberList = lambda sp: error('Boom')
+        self.assertRaises(statusio.StatusioError, self._mirror.Sync)
+        state = self._mirror.SyncState()
+        self.assertEqual(state['error'], 'Boom')
+        self.assertEqual(len(self._mirror.Components()), 2)
+        self.assertIsNotNone(state['synced_at'])
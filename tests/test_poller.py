@@ -0,0 +1,71 @@
+# encoding: utf-8
+
+import time
+import unittest
+import statusio
+
+from tests.fake_api import FakeApi, Clock, STATUSPAGE_ID, COMPONENT
+
+
+class PollerTest(unittest.TestCase):
+
+    def setUp(self):
+        self._api = FakeApi()
+        self._clock = Clock()
+        self._cache = statusio.StatusCache()
+        self._poller = statusio.Poller(self._api, cache=self._cache,
+                                       interval=60, busy_interval=10,
+                                       clock=self._clock)
+
+    def testSpread(self):
+        # First polls of many pages are spread evenly over the interval
+        for i in range(600):
+            self._poller.Watch('page%d' % i)
+        slots = [0] * 6
+        for i in range(600):
+            slots[int((self._poller.NextPoll('page%d' % i) - 1000) // 10)] += 1
+        self.assertTrue(all(90 <= n <= 110 for n in slots), slots)
+
+    def testAdapt(self):
+        # Pages with trouble are polled faster until they are quiet again
+        self._poller.Watch(STATUSPAGE_ID)
+        self._clock.now += 60
+        self.assertEqual(self._poller.RunDue(), [STATUSPAGE_ID])
+        self.assertEqual(self._cache.ComponentStatus(STATUSPAGE_ID, COMPONENT),
+                         100)
+        self.assertEqual(self._poller.Interval(STATUSPAGE_ID), 60)
+        due = self._poller.NextPoll(STATUSPAGE_ID) - self._clock.now
+        self.assertTrue(54 <= due <= 66, due)
+
+        self._api.AddIncident('Outage', components=[COMPONENT])
+        self._clock.now += 66
+        self._poller.RunDue()
+        self.assertEqual(self._poller.Interval(STATUSPAGE_ID), 10)
+        self.assertEqual(len(self._cache.Incidents(STATUSPAGE_ID)), 1)
+
+        self._api.incidents.clear()
+        for interval in (20, 40, 60, 60):
+            self._clock.now += 66
+            self._poller.RunDue()
+            self.assertEqual(self._poller.Interval(STATUSPAGE_ID), interval)
+
+    def testNotDue(self):
+        self._poller.Watch(STATUSPAGE_ID)
+        self.assertEqual(self._poller.RunDue(), [])
+        self._poller.Unwatch(STATUSPAGE_ID)
+        self._clock.now += 60
+        self.assertEqual(self._poller.RunDue(), [])
+        self.assertEqual(self._api.Count('StatusSummary'), 0)
+
+    def testStart(self):
+        # The background thread polls pages as they become due
+        polled = []
+        poller = statusio.Poller(self._api, interval=0.05,
+                                 callback=lambda i, s: polled.append(i))
+        poller.Watch(STATUSPAGE_ID)
+        poller.Start()
+        deadline = time.time() + 5
+        while len(polled) < 3 and time.time() < deadline:
+            time.sleep(0.01)
+        poller.Stop()
+        self.assertGreaterEqual(len(polled), 3)
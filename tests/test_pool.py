@@ -0,0 +1,74 @@
+# encoding: utf-8
+
+import unittest
+import statusio
+
+PAGE_EU = '568d8a3e3cada8c2490000d1'
+PAGE_EU2 = '568d8a3e3cada8c2490000d2'
+PAGE_US = '568d8a3e3cada8c2490000d3'
+
+
+def stub(account):
+    transport = statusio.StubTransport()
+    transport.Add('*', '', {'status': {'error': 'no'},
+                            'result': {'account': account}})
+    return transport
+
+
+class ClientPoolTest(unittest.TestCase):
+
+    def setUp(self):
+        self._pool = statusio.ClientPool(max_workers=2)
+        self._eu = stub('eu')
+        self._us = stub('us')
+        self._pool.AddAccount('eu', 'eu-id', 'eu-key', [PAGE_EU, PAGE_EU2],
+                              rate=1000, transport=self._eu)
+        self._pool.AddAccount('us', 'us-id', 'us-key', [PAGE_US],
+                              rate=1000, transport=self._us)
+
+    def testRoute(self):
+        result = self._pool.IncidentList(PAGE_US)
+        self.assertEqual(result['result']['account'], 'us')
+        self._pool.IncidentSingle(PAGE_EU2, 'incident')
+        self.assertEqual(len(self._us.requests), 1)
+        self.assertIn(PAGE_EU2, self._eu.requests[0][1])
+        self.assertRaises(statusio.StatusioError, self._pool.StatusSummary,
+                          'unknown')
+        self.assertRaises(AttributeError, getattr, self._pool, 'Warmup')
+
+    def testAccounts(self):
+        self.assertEqual(self._pool.Accounts(), ['eu', 'us'])
+        self.assertEqual(self._pool.Pages('eu'), sorted([PAGE_EU, PAGE_EU2]))
+        self._pool.AddPages('us', [PAGE_EU2])
+        self.assertEqual(self._pool.Pages('us'), sorted([PAGE_EU2, PAGE_US]))
+        self.assertRaises(statusio.StatusioError, self._pool.AddAccount,
+                          'us', 'id', 'key')
+        self.assertRaises(statusio.StatusioError, self._pool.AddPages,
+                          'asia', [PAGE_EU])
+        # Instances shared by all accounts are refused
+        self.assertRaises(statusio.StatusioError, statusio.ClientPool,
+                          rate_limiter=statusio.RateLimiter(10))
+        self.assertRaises(statusio.StatusioError, statusio.ClientPool,
+                          transport=statusio.StubTransport())
+        self.assertTrue(statusio.ClientPool(transport='stub'))
+        # Each account has its own rate limiter
+        self.assertIsNot(self._pool.Account('eu')._rate_limiter,
+                         self._pool.Account('us')._rate_limiter)
+
+    def testFanOut(self):
+        pages = [PAGE_US, 'unknown', PAGE_EU, PAGE_EU2]
+        results = self._pool.FanOut('StatusSummary', pages)
+        self.assertEqual([r[0] for r in results], pages)
+        self.assertEqual([r[1]['result']['account'] for r in results
+                          if r[2] is None], ['us', 'eu', 'eu'])
+        self.assertIsInstance(results[1][2], statusio.StatusioError)
+        self.assertEqual((len(self._eu.requests), len(self._us.requests)),
+                         (2, 1))
+        results = self._pool.FanOut(
+            lambda api, page: api.IncidentList(page))
+        self.assertEqual(len(results), 3)
+        self.assertEqual(len(self._eu.requests), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
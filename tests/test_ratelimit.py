@@ -0,0 +1,80 @@
+# encoding: utf-8
+
+import multiprocessing
+import os
+import shutil
+import tempfile
+import unittest
+import statusio
+
+from tests.fake_api import Clock
+
+
+class RateLimiterTest(unittest.TestCase):
+
+    def testPoll(self):
+        # Test the statusio.RateLimiter.Poll method
+        clock = Clock(0.0)
+        limiter = statusio.RateLimiter(rate=2, burst=3, clock=clock)
+        self.assertEqual([limiter.Poll() for _ in range(3)], [0, 0, 0])
+        self.assertAlmostEqual(limiter.Poll(), 0.5)
+        clock.now += 0.5
+        self.assertEqual(limiter.Poll(), 0)
+        clock.now += 10
+        self.assertEqual([limiter.Poll() for _ in range(3)], [0, 0, 0])
+        self.assertNotEqual(limiter.Poll(), 0)
+
+    def testAcquire(self):
+        # Test the statusio.RateLimiter.Acquire method
+        limiter = statusio.RateLimiter(rate=1000, burst=1)
+        self.assertTrue(limiter.Acquire())
+        self.assertTrue(limiter.Acquire(timeout=1))
+        limiter = statusio.RateLimiter(rate=0.001, burst=1)
+        self.assertTrue(limiter.Acquire())
+        self.assertFalse(limiter.Acquire(timeout=0.01))
+
+
+class SharedRateLimiterTest(unittest.TestCase):
+
+    def setUp(self):
+        self._dir = tempfile.mkdtemp()
+        self._path = os.path.join(self._dir, 'bucket')
+
+    def tearDown(self):
+        shutil.rmtree(self._dir)
+
+    def testShared(self):
+        # Limiters on the same file share one bucket
+        clock = Clock(0.0)
+        first = statusio.SharedRateLimiter(self._path, rate=1, burst=4,
+                                           clock=clock)
+        second = statusio.SharedRateLimiter(self._path, rate=1, burst=4,
+                                            clock=clock)
+        self.assertEqual([first.Poll(), second.Poll(), first.Poll(),
+                          second.Poll()], [0, 0, 0, 0])
+        self.assertNotEqual(first.Poll(), 0)
+        self.assertNotEqual(second.Poll(), 0)
+        clock.now += 1
+        self.assertEqual(second.Poll(), 0)
+        self.assertNotEqual(first.Poll(), 0)
+        first.Close()
+        second.Close()
+
+    def testProcesses(self):
+        # Tokens are not handed out twice across processes
+        limiter = statusio.SharedRateLimiter(self._path, rate=0.001, burst=50)
+        limiter.Close()
+        pool = multiprocessing.Pool(4)
+        try:
+            taken = pool.map(_Drain, [self._path] * 4)
+        finally:
+            pool.close()
+            pool.join()
+        self.assertEqual(sum(taken), 50)
+
+
+def _Drain(path):
+    limiter = statusio.SharedRateLimiter(path, rate=0.001, burst=50)
+    taken = sum(1 for _ in range(40) if limiter.Poll() == 0)
+    limiter.Close()
+    return taken
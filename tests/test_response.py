@@ -0,0 +1,46 @@
+# encoding: utf-8
+
+import json
+import unittest
+import statusio
+
+from tests.fake_api import Response, STATUSPAGE_ID
+
+BODY = json.dumps({'status': {'error': 'no'},
+                   'result': {'active_incidents': []}}).encode('utf-8')
+
+
+class ResponseModeTest(unittest.TestCase):
+
+    def setUp(self):
+        self._api = statusio.Api('id', 'key')
+        self._api._SendRequest = lambda url, verb, data=None, endpoint=None: Response(BODY)
+
+    def testJson(self):
+        # The default mode decodes responses
+        self.assertEqual(self._api.IncidentList(STATUSPAGE_ID)['result'],
+                         {'active_incidents': []})
+
+    def testRaw(self):
+        # Raw mode returns the undecoded body
+        api = self._api.WithResponseMode('raw')
+        self.assertEqual(api.IncidentList(STATUSPAGE_ID), BODY)
+        self.assertEqual(self._api.response_mode, 'json')
+
+    def testLazy(self):
+        # Lazy mode decodes on first access only
+        api = statusio.Api('id', 'key', response_mode='lazy')
+        api._SendRequest = self._api._SendRequest
+        data = api.StatusSummary(STATUSPAGE_ID)
+        self.assertIsInstance(data, statusio.LazyResponse)
+        self.assertFalse(data.parsed)
+        self.assertEqual(data.content, BODY)
+        self.assertEqual(data['status']['error'], 'no')
+        self.assertTrue(data.parsed)
+        self.assertEqual(statusio.errors.check_result(data),
+                         {'active_incidents': []})
+        self.assertEqual(dict(data), json.loads(BODY.decode('utf-8')))
+
+    def testUnknownMode(self):
+        # Unknown modes are rejected
+        self.assertRaises(ValueError, self._api.WithResponseMode, 'xml')
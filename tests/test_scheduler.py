@@ -0,0 +1,127 @@
+# encoding: utf-8
+
+import json
+import threading
+import unittest
+import statusio
+from statusio.scheduler import CRITICAL, BULK
+
+from tests.fake_api import Response, STATUSPAGE_ID
+
+OTHER_PAGE = '568d8a3e3cada8c2490000de'
+
+
+class Limiter(object):
+    """A rate limiter that is either open or empty."""
+
+    def __init__(self, open=True):
+        self.open = open
+
+    def Poll(self):
+        return 0.0 if self.open else 0.01
+
+
+class RequestSchedulerTest(unittest.TestCase):
+
+    def setUp(self):
+        self._scheduler = statusio.RequestScheduler(workers=1)
+        self._order = []
+        # Block the only worker until everything is queued.
+        self._gate = threading.Event()
+        started = threading.Event()
+        self._scheduler.Submit(lambda: started.set() or self._gate.wait())
+        started.wait(5)
+
+    def tearDown(self):
+        self._gate.set()
+        self._scheduler.Shutdown()
+
+    def _Submit(self, name, **kwargs):
+        return self._scheduler.Submit(lambda: self._order.append(name),
+                                      **kwargs)
+
+    def _Run(self, futures):
+        self._gate.set()
+        for future in futures:
+            future.result(5)
+
+    def testPriority(self):
+        # Critical requests jump ahead of queued bulk requests
+        futures = [self._Submit('metric%d' % i, endpoint='MetricUpdate')
+                   for i in range(3)]
+        futures.append(self._Submit('status', endpoint='StatusSummary'))
+        futures.append(self._Submit('incident', endpoint='IncidentCreate'))
+        futures.append(self._Submit('urgent', priority=CRITICAL))
+        self.assertEqual(self._scheduler.Pending(), [2, 1, 3])
+        self._Run(futures)
+        self.assertEqual(self._order, ['incident', 'urgent', 'status',
+                                       'metric0', 'metric1', 'metric2'])
+
+    def testFairness(self):
+        # Status pages take turns within a class according to their weight
+        self._scheduler.weights[OTHER_PAGE] = 2
+        futures = [self._Submit('a', statuspage_id=STATUSPAGE_ID,
+                                priority=BULK) for _ in range(4)]
+        futures += [self._Submit('b', statuspage_id=OTHER_PAGE,
+                                 priority=BULK) for _ in range(4)]
+        self._Run(futures)
+        self.assertEqual(''.join(self._order), 'babbabaa')
+
+    def testBlockedLimiter(self):
+        # An account out of tokens does not hold back another account's
+        # urgent requests behind less urgent ones
+        account_a, account_b = Limiter(open=False), Limiter()
+        blocked = self._Submit('a-urgent', priority=CRITICAL,
+                               limiter=account_a)
+        futures = [self._Submit('b-bulk', priority=BULK, limiter=account_b),
+                   self._Submit('b-normal', endpoint='StatusSummary',
+                                limiter=account_b),
+                   self._Submit('b-urgent', priority=CRITICAL,
+                                limiter=account_b)]
+        self._Run(futures)
+        self.assertEqual(self._order, ['b-urgent', 'b-normal', 'b-bulk'])
+        account_a.open = True
+        blocked.result(5)
+        self.assertEqual(self._order[-1], 'a-urgent')
+
+    def testErrors(self):
+        # Exceptions are raised to the caller
+        def fail():
+            raise ValueError('boom')
+        self._gate.set()
+        self.assertRaises(ValueError, self._scheduler.Call, fail)
+
+
+class ApiSchedulingTest(unittest.TestCase):
+
+    def testEndpoint(self):
+        # Test the statusio.Api._Endpoint method
+        api = statusio.Api('id', 'key')
+        self.assertEqual(
+            api._Endpoint('%s/incident/message/%s/abc' % (
+                api.base_url, STATUSPAGE_ID), 'GET'),
+            ('IncidentMessage', STATUSPAGE_ID))
+        self.assertEqual(
+            api._Endpoint('%s/incident/%s/abc' % (
+                api.base_url, STATUSPAGE_ID), 'GET'),
+            ('IncidentSingle', STATUSPAGE_ID))
+        self.assertEqual(
+            api._Endpoint('%s/incident/create' % api.base_url, 'POST'),
+            ('IncidentCreate', None))
+
+    def testScheduledApi(self):
+        # Api requests run through the scheduler and rate limiter
+        scheduler = statusio.RequestScheduler(workers=2)
+        limiter = statusio.RateLimiter(rate=1000)
+        api = statusio.Api('id', 'key', scheduler=scheduler,
+                           rate_limiter=limiter)
+
+        def send(url, verb, data=None, endpoint=None):
+            return Response(json.dumps({
+                'status': {'error': 'no'},
+                'result': threading.current_thread().name}).encode('utf-8'))
+        api._SendRequest = send
+        data = api.IncidentCreate(STATUSPAGE_ID, [], 'name', 'details',
+                                  300, 100)
+        self.assertEqual(data['result'], 'statusio-scheduler')
+        scheduler.Shutdown()
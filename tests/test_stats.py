@@ -0,0 +1,68 @@
+# encoding: utf-8
+
+import unittest
+import statusio
+from statusio.stats import LatencyHistogram
+
+from tests.fake_api import STATUSPAGE_ID
+
+
+class LatencyHistogramTest(unittest.TestCase):
+
+    def testPercentile(self):
+        # Percentiles are within a bucket's width of the true value
+        histogram = LatencyHistogram()
+        self.assertEqual(histogram.Percentile(50), None)
+        for i in range(1, 1001):
+            histogram.Observe(i / 1000.0)
+        for q in (50, 90, 99):
+            self.assertAlmostEqual(histogram.Percentile(q), q / 100.0,
+                                   delta=q / 100.0 * 0.125)
+        histogram.Observe(1000)
+        self.assertEqual(histogram.Cumulative()[-1], (float('inf'), 1001))
+        self.assertEqual(histogram.Cumulative()[-2], (64.0, 1000))
+
+
+class ApiStatsTest(unittest.TestCase):
+
+    def setUp(self):
+        stub = statusio.StubTransport()
+        stub.Add('GET', 'status/summary', {'status': {'error': 'no'}})
+        stub.Add('POST', 'incident/delete', {}, status=500)
+        self._api = statusio.Api('id', 'key', transport=stub)
+
+    def testSnapshot(self):
+        # Requests are counted per endpoint
+        self._api.StatusSummary(STATUSPAGE_ID)
+        self._api.StatusSummary(STATUSPAGE_ID)
+        self._api.IncidentDelete(STATUSPAGE_ID, 'abc')
+        self._api.stats.Increment('StatusSummary', 'cache_hits')
+        snapshot = self._api.stats.Snapshot()
+        self.assertEqual(sorted(snapshot), ['IncidentDelete', 'StatusSummary'])
+        summary = snapshot['StatusSummary']
+        self.assertEqual((summary['requests'], summary['errors'],
+                          summary['cache_hits'], summary['bytes_out']),
+                         (2, 0, 1, 0))
+        self.assertEqual(summary['bytes_in'], 2 * len(
+            b'{"status": {"error": "no"}}'))
+        self.assertEqual(summary['latency']['count'], 2)
+        self.assertTrue(summary['latency']['p99'] < 0.1)
+        delete = snapshot['IncidentDelete']
+        self.assertEqual(delete['errors'], 1)
+        self.assertTrue(delete['bytes_out'] > 0)
+
+    def testPrometheus(self):
+        self._api.StatusSummary(STATUSPAGE_ID)
+        text = self._api.stats.Prometheus()
+        self.assertIn('# TYPE statusio_requests_total counter\n', text)
+        self.assertIn('statusio_requests_total{endpoint="StatusSummary"} 1\n',
+                      text)
+        self.assertIn('statusio_request_duration_seconds_bucket'
+                      '{endpoint="StatusSummary",le="+Inf"} 1\n', text)
+        self.assertIn('statusio_request_duration_seconds_bucket'
+                      '{endpoint="StatusSummary",le="0.0009765625"} ', text)
+
+    def testDisabled(self):
+        api = statusio.Api('id', 'key', transport='stub', stats=False)
+        self.assertEqual(api.stats, None)
+        api.StatusSummary(STATUSPAGE_ID)
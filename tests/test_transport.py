@@ -0,0 +1,239 @@
+# encoding: utf-8
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+import statusio
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+from statusio.response import Response
+
+from tests.fake_api import STATUSPAGE_ID
+
+
+class CountingTransport(statusio.Transport):
+
+    def __init__(self):
+        self.calls = 0
+        self.verbs = []
+
+    def Request(self, verb, url, body=None, headers=None):
+        self.calls += 1
+        self.verbs.append(verb)
+        return Response(200, ('{"status": {"error": "no"}, "result": %d}'
+                              % self.calls).encode('utf-8'),
+                        {'content-type': 'application/json',
+                         'x-secret': 'dropped'}, 0.05)
+
+
+class RecordReplayTest(unittest.TestCase):
+
+    def setUp(self):
+        self._dir = tempfile.mkdtemp()
+        self._path = os.path.join(self._dir, 'cassette.jsonl')
+
+    def tearDown(self):
+        shutil.rmtree(self._dir)
+
+    def _Record(self):
+        recorder = statusio.RecordingTransport(self._path, CountingTransport())
+        api = statusio.Api('id', 'secret-key', transport=recorder)
+        api.StatusSummary(STATUSPAGE_ID)
+        api.StatusSummary(STATUSPAGE_ID)
+        api.IncidentDelete(STATUSPAGE_ID, 'abc')
+        recorder.Close()
+
+    def testRecordReplay(self):
+        # Recorded responses are replayed in order
+        self._Record()
+        with open(self._path) as f:
+            cassette = f.read()
+        self.assertNotIn('secret-key', cassette)
+        self.assertNotIn('x-secret', cassette)
+        # Recording again replaces the cassette unless appending
+        self._Record()
+        with open(self._path) as f:
+            self.assertEqual(f.read(), cassette)
+        statusio.RecordingTransport(self._path, append=True).Close()
+        with open(self._path) as f:
+            self.assertEqual(f.read(), cassette)
+
+        api = statusio.Api('id', 'key',
+                           transport=statusio.ReplayTransport(self._path))
+        self.assertEqual(api.StatusSummary(STATUSPAGE_ID)['result'], 1)
+        self.assertEqual(api.StatusSummary(STATUSPAGE_ID)['result'], 2)
+        self.assertEqual(api.StatusSummary(STATUSPAGE_ID)['result'], 2)
+        self.assertEqual(api.IncidentDelete(STATUSPAGE_ID, 'abc')['result'], 3)
+
+    def testUnmatched(self):
+        # Requests missing from the cassette fail
+        self._Record()
+        transport = statusio.ReplayTransport(self._path, repeat=False)
+        self.assertRaises(statusio.errors.TransportError, transport.Request,
+                          'GET', 'http://localhost/nope')
+        api = statusio.Api('id', 'key', transport=transport)
+        api.IncidentDelete(STATUSPAGE_ID, 'abc')
+        self.assertRaises(statusio.errors.TransportError, transport.Request,
+                          'POST', '%s/incident/delete' % api.base_url,
+                          '{"statuspage_id": "%s", "incident_id": "abc"}'
+                          % STATUSPAGE_ID)
+
+    def testSpeed(self):
+        # Replay can wait as long as the recorded responses took
+        self._Record()
+        api = statusio.Api('id', 'key', transport=statusio.ReplayTransport(
+            self._path, speed=1.0))
+        started = time.time()
+        api.StatusSummary(STATUSPAGE_ID)
+        self.assertGreaterEqual(time.time() - started, 0.04)
+
+
+class WarmupTest(unittest.TestCase):
+
+    def testWarmup(self):
+        # Warm-up sends HEAD requests, not recorded in cassettes
+        transport = CountingTransport()
+        api = statusio.Api('id', 'key', transport=transport, warmup=3)
+        self.assertEqual(transport.verbs, ['HEAD'] * 3)
+        self.assertEqual(api.Warmup(), 1)
+        tmp = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmp, 'cassette.jsonl')
+            recorder = statusio.RecordingTransport(path, transport)
+            self.assertEqual(recorder.Warmup('http://localhost'), 1)
+            recorder.Close()
+            self.assertEqual(os.path.getsize(path), 0)
+            self.assertEqual(statusio.ReplayTransport(path).Warmup(
+                'http://localhost'), 0)
+        finally:
+            shutil.rmtree(tmp)
+
+    def testKeepalive(self):
+        # Keep-alive probes run until stopped
+        transport = CountingTransport()
+        api = statusio.Api('id', 'key', transport=transport, keepalive=0.01)
+        deadline = time.time() + 5
+        while transport.calls < 2 and time.time() < deadline:
+            time.sleep(0.01)
+        api.StopKeepalive()
+        calls = transport.calls
+        self.assertGreaterEqual(calls, 2)
+        time.sleep(0.05)
+        self.assertEqual(transport.calls, calls)
+
+
+class _EchoHandler(BaseHTTPRequestHandler):
+
+    def _Echo(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length).decode('utf-8')
+        content = statusio.json.dumps({
+            'status': {'error': 'no'},
+            'result': {'method': self.command, 'path': self.path,
+                       'body': body,
+                       'key': self.headers.get('x-api-key')}}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.send_header('ETag', '"abc"')
+        self.end_headers()
+        self.wfile.write(content)
+
+    do_GET = do_POST = do_DELETE = _Echo
+
+    def log_message(self, *args):
+        pass
+
+
+class HttpTransportTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = HTTPServer(('127.0.0.1', 0), _EchoHandler)
+        cls.thread = threading.Thread(target=cls.server.serve_forever)
+        cls.thread.daemon = True
+        cls.thread.start()
+        cls.base_url = 'http://127.0.0.1:%d' % cls.server.server_address[1]
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def _Check(self, transport):
+        api = statusio.Api('id', 'key', base_url=self.base_url,
+                           transport=transport)
+        result = api.StatusSummary(STATUSPAGE_ID)['result']
+        self.assertEqual(result['method'], 'GET')
+        self.assertEqual(result['path'], '/v2/status/summary/' + STATUSPAGE_ID)
+        self.assertEqual(result['key'], 'key')
+        result = api.IncidentDelete(STATUSPAGE_ID, 'abc')['result']
+        self.assertEqual(result['method'], 'POST')
+        self.assertEqual(statusio.json.loads(result['body'])['incident_id'],
+                         'abc')
+        resp = api.transport.Request('GET', self.base_url + '/x')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.headers['etag'], '"abc"')
+        api.transport.Close()
+
+    def testRequests(self):
+        self._Check('requests')
+
+    def testUrllib3(self):
+        self._Check('urllib3')
+        self.assertIsInstance(statusio.Api('id', 'key', transport='urllib3')
+                              .transport, statusio.Urllib3Transport)
+
+    def testThreads(self):
+        # Threads share the Api, each with its own session and one pool
+        api = statusio.Api('id', 'key', base_url=self.base_url, pool_size=4)
+        sessions = []
+        results = statusio.concurrency.run_concurrently(
+            lambda i: (sessions.append(api.transport.session),
+                       api.StatusSummary(STATUSPAGE_ID)['result']['path']),
+            range(40), max_workers=4)
+        self.assertEqual([r[2] for r in results], [None] * 40)
+        self.assertEqual(len(set(map(id, sessions))), 4)
+        self.assertEqual(len(set(s.get_adapter(self.base_url)
+                                 for s in sessions)), 1)
+        api.transport.Close()
+
+    def testConnectionError(self):
+        for name in ('requests', 'urllib3'):
+            transport = statusio.transport.make_transport(name)
+            self.assertRaises(statusio.errors.TransportError,
+                              transport.Request, 'GET', 'http://127.0.0.1:1/')
+
+
+class StubTransportTest(unittest.TestCase):
+
+    def testStub(self):
+        # Registered responses answer matching requests, later ones win
+        stub = statusio.StubTransport()
+        stub.Add('GET', 'status/summary/', {'status': {'error': 'no'},
+                                            'result': 1})
+        stub.Add('*', 'status/summary/', {'status': {'error': 'no'},
+                                          'result': 2})
+        stub.Add('POST', 'incident/delete',
+                 lambda verb, url, body: {'result': statusio.json.loads(body)})
+        api = statusio.Api('id', 'key', transport=stub)
+        self.assertEqual(api.StatusSummary(STATUSPAGE_ID)['result'], 2)
+        self.assertEqual(api.IncidentDelete(STATUSPAGE_ID, 'abc')['result'],
+                         {'statuspage_id': STATUSPAGE_ID,
+                          'incident_id': 'abc'})
+        self.assertEqual(api.IncidentList(STATUSPAGE_ID)['status']['error'],
+                         'yes')
+        self.assertEqual([r[0] for r in stub.requests],
+                         ['GET', 'POST', 'GET'])
+
+    def testByName(self):
+        api = statusio.Api('id', 'key', transport='stub')
+        self.assertIsInstance(api.transport, statusio.StubTransport)
+        self.assertRaises(statusio.StatusioError, statusio.Api, 'id', 'key',
+                          transport='carrier-pigeon')
@@ -0,0 +1,113 @@
+# encoding: utf-8
+
+import threading
+import unittest
+import statusio
+
+from tests.fake_api import (FakeApi, Clock, STATUSPAGE_ID, COMPONENT,
+                            CONTAINER, error)
+
+
+class ComponentStatusUpdaterTest(unittest.TestCase):
+
+    def setUp(self):
+        self._api = FakeApi()
+        self._clock = Clock()
+
+    def _Updater(self, **kwargs):
+        return statusio.ComponentStatusUpdater(self._api, clock=self._clock,
+                                               **kwargs)
+
+    def _Update(self, updater, status):
+        return updater.Update(STATUSPAGE_ID, COMPONENT, CONTAINER,
+                              'details %s' % status, status)
+
+    def testDropNoop(self):
+        # Updates matching the seeded status are dropped
+        updater = self._Updater()
+        self.assertIsNone(self._Update(updater, 100))
+        self.assertEqual(self._api.Count('StatusSummary'), 1)
+        self.assertIsNotNone(self._Update(updater, 300))
+        self.assertIsNone(self._Update(updater, '300'))
+        self.assertEqual(self._api.Count('ComponentStatusUpdate'), 1)
+        self.assertEqual(updater.stats['dropped'], 2)
+
+    def testDebounce(self):
+        # Bursts are coalesced into the final status
+        updater = self._Updater(debounce=10)
+        for status in (300, 400, 500, 400):
+            self._Update(updater, status)
+            self._clock.now += 2
+        self.assertEqual(updater.Flush(), 0)
+        self._clock.now += 10
+        self.assertEqual(updater.Flush(), 1)
+        self.assertEqual(self._api.calls[-1][-2:], ('details 400', 400))
+        self.assertEqual(self._api.Count('ComponentStatusUpdate'), 1)
+
+    def testFlapBack(self):
+        # A status that flaps back before it is written is never sent
+        updater = self._Updater(debounce=10)
+        self._Update(updater, 500)
+        self._Update(updater, 100)
+        self._clock.now += 20
+        self.assertEqual(updater.Flush(), 0)
+        self.assertEqual(updater.Pending(), 0)
+        self.assertEqual(self._api.Count('ComponentStatusUpdate'), 0)
+
+    def testHoldDown(self):
+        # Writes for one component are spaced by hold_down seconds
+        updater = self._Updater(hold_down=60)
+        self._Update(updater, 300)
+        self._clock.now += 1
+        self.assertIsNone(self._Update(updater, 500))
+        self._clock.now += 30
+        self.assertEqual(updater.Flush(), 0)
+        self._clock.now += 30
+        self.assertEqual(updater.Flush(), 1)
+        self.assertEqual(self._api.Count('ComponentStatusUpdate'), 2)
+
+    def testMaxDelay(self):
+        # A status that keeps changing is written after max_delay
+        updater = self._Updater(debounce=10, max_delay=15)
+        for status in (300, 400, 300, 400, 300, 400, 300, 400):
+            self._Update(updater, status)
+            self._clock.now += 3
+        self.assertEqual(self._api.Count('ComponentStatusUpdate'), 1)
+
+    def testFailedWriteRetried(self):
+        # Failed background writes stay pending
+        updater = self._Updater(debounce=1)
+        self._Update(updater, 300)
+        update = self._api.ComponentStatusUpdate
+        self._api.ComponentStatusUpdate = lambda *args: error('Boom')
+        self._clock.now += 2
+        self.assertEqual(updater.Flush(), 0)
+        self.assertEqual(updater.Pending(), 1)
+        self._api.ComponentStatusUpdate = update
+        self.assertEqual(updater.Flush(), 1)
+        self.assertEqual(updater.stats['failed'], 1)
+
+    def testOneWriteInFlight(self):
+        # Updates reported while a component is being written wait for it
+        updater = self._Updater()
+        self._Update(updater, 100)
+        started, release = threading.Event(), threading.Event()
+        update = self._api.ComponentStatusUpdate
+
+        def slow(*args):
+            started.set()
+            release.wait(5)
+            return update(*args)
+        self._api.ComponentStatusUpdate = slow
+        writer = threading.Thread(target=self._Update, args=(updater, 300))
+        writer.start()
+        self.assertTrue(started.wait(5))
+        self.assertIsNone(self._Update(updater, 300))
+        self.assertIsNone(self._Update(updater, 500))
+        self.assertEqual(updater.Flush(force=True), 0)
+        self.assertEqual(updater.Pending(), 1)
+        release.set()
+        writer.join()
+        self.assertEqual(updater.Flush(), 1)
+        self.assertEqual([c[-1] for c in self._api.calls
+                          if c[0] == 'ComponentStatusUpdate'], [300, 500])
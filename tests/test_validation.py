@@ -0,0 +1,65 @@
+# encoding: utf-8
+
+import unittest
+import statusio
+from statusio.errors import ValidationError
+
+from tests.fake_api import STATUSPAGE_ID, COMPONENT, CONTAINER
+
+COMBO = '%s-%s' % (COMPONENT, CONTAINER)
+
+
+def series(size):
+    return (['2030-01-01T00:00:00+00:00'] * size, [1.5] * size)
+
+
+class ValidationTest(unittest.TestCase):
+
+    def setUp(self):
+        self._stub = statusio.StubTransport()
+        self._stub.Add('*', '', {'status': {'error': 'no'}})
+        self._api = statusio.Api('id', 'key', transport=self._stub)
+
+    def _Metric(self, day=24, week=7, month=30):
+        return self._api.MetricUpdate(
+            STATUSPAGE_ID, 'metric', 1, 0, *(
+                series(day) + (1, 0) + series(week) + (1, 0) + series(month)))
+
+    def assertInvalid(self, field, func, *args):
+        with self.assertRaises(ValidationError) as context:
+            func(*args)
+        self.assertEqual(context.exception.field, field)
+
+    def testInvalid(self):
+        # Invalid payloads raise before any request is sent
+        self.assertInvalid('current_status', self._api.ComponentStatusUpdate,
+                           STATUSPAGE_ID, COMPONENT, CONTAINER, 'x', 350)
+        self.assertInvalid('infrastructure_affected', self._api.IncidentCreate,
+                           STATUSPAGE_ID, [COMPONENT], 'name', 'x', 300, 100)
+        self.assertInvalid('infrastructure_affected', self._api.IncidentCreate,
+                           STATUSPAGE_ID, COMBO, 'name', 'x', 300, 100)
+        self.assertInvalid('current_state', self._api.IncidentUpdate,
+                           STATUSPAGE_ID, 'id', 'x', 300, 'Identified')
+        self.assertInvalid('infrastructure_affected',
+                           self._api.MaintenanceSchedule, STATUSPAGE_ID,
+                           [COMBO + '-x'], 'name', 'x', '2030/01/01', '10:00',
+                           '2030/01/01', '11:00')
+        self.assertInvalid('method', self._api.SubscriberAdd, STATUSPAGE_ID,
+                           'pager', '555')
+        self.assertInvalid(None, self._Metric, 23)
+        self.assertInvalid(None, self._Metric, 24, 7, 29)
+        self.assertEqual(self._stub.requests, [])
+
+    def testValid(self):
+        self._api.ComponentStatusUpdate(STATUSPAGE_ID, COMPONENT, CONTAINER,
+                                        'x', '300')
+        self._api.IncidentCreate(STATUSPAGE_ID, [COMBO], 'name', 'x', 300,
+                                 100)
+        self._api.SubscriberAdd(STATUSPAGE_ID, 'webhook', 'https://x')
+        self._Metric()
+        self.assertEqual(len(self._stub.requests), 4)
+
+    def testDisabled(self):
+        api = statusio.Api('id', 'key', transport=self._stub, validate=False)
+        api.SubscriberAdd(STATUSPAGE_ID, 'pager', '555')
+        self.assertEqual(len(self._stub.requests), 1)
@@ -0,0 +1,97 @@
+# encoding: utf-8
+
+import json
+import unittest
+import statusio
+
+try:
+    # python 3
+    from urllib.request import Request, urlopen
+    from urllib.error import HTTPError
+except ImportError:
+    from urllib2 import Request, urlopen, HTTPError
+
+from tests.fake_api import (FakeApi, STATUSPAGE_ID, COMPONENT, CONTAINER,
+                            COMPONENT2)
+
+INCIDENT_ID = '5ae8c1d33b2c3ac3a1000000'
+INCIDENT = {
+    'id': INCIDENT_ID,
+    'datetime': '2018-05-01T18:36:03.557Z',
+    'current_status': 'Degraded Performance',
+    'current_state': 'Investigating',
+    'incident_url': 'https://status.example.com/pages/incident/%s/%s' % (
+        STATUSPAGE_ID, INCIDENT_ID),
+    'incident_name': 'Slow website',
+    'components': [{'_id': COMPONENT, 'name': 'Website'}],
+    'containers': [{'_id': CONTAINER, 'name': 'US East'}],
+}
+
+
+class WebhookTest(unittest.TestCase):
+
+    def setUp(self):
+        self._cache = statusio.StatusCache()
+        self._cache.Refresh(FakeApi(), STATUSPAGE_ID)
+        self._events = []
+        self._cache.Subscribe(lambda e, c: self._events.append((e, c)))
+
+    def testParse(self):
+        # Test statusio.webhook.parse_webhook
+        event = statusio.webhook.parse_webhook(INCIDENT)
+        self.assertEqual(event.kind, 'incident')
+        self.assertEqual(event.statuspage_id, STATUSPAGE_ID)
+        self.assertEqual(event.status, 300)
+        self.assertEqual(event.components, (COMPONENT,))
+        self.assertRaises(statusio.StatusioError,
+                          statusio.webhook.parse_webhook, {'foo': 'bar'})
+
+    def testApply(self):
+        # Incident webhooks update incidents and component statuses
+        self.assertEqual(
+            self._cache.ComponentStatus(STATUSPAGE_ID, COMPONENT), 100)
+        self._cache.Apply(statusio.webhook.parse_webhook(INCIDENT))
+        self.assertEqual(
+            self._cache.ComponentStatus(STATUSPAGE_ID, COMPONENT), 300)
+        self.assertEqual(
+            self._cache.ComponentStatus(STATUSPAGE_ID, COMPONENT2), 100)
+        self.assertEqual(len(self._cache.Incidents(STATUSPAGE_ID)), 1)
+
+        resolved = dict(INCIDENT, current_status='Operational',
+                        current_state='Resolved')
+        changes = self._cache.Apply(statusio.webhook.parse_webhook(resolved))
+        self.assertEqual(
+            self._cache.ComponentStatus(STATUSPAGE_ID, COMPONENT), 100)
+        self.assertEqual(self._cache.Incidents(STATUSPAGE_ID), [])
+        self.assertEqual(len(changes), 2)
+        self.assertEqual(len(self._events), 2)
+
+    def testApplyWithoutId(self):
+        # Incidents without an ID are not stored, statuses are still applied
+        payload = dict(INCIDENT, incident_url='')
+        del payload['id']
+        event = statusio.webhook.parse_webhook(payload, STATUSPAGE_ID)
+        self.assertEqual(event.id, None)
+        changes = self._cache.Apply(event)
+        self.assertEqual(self._cache.Incidents(STATUSPAGE_ID), [])
+        self.assertEqual([c[0] for c in changes], ['component'])
+        self.assertEqual(
+            self._cache.ComponentStatus(STATUSPAGE_ID, COMPONENT), 300)
+
+    def testServer(self):
+        # Test the statusio.WebhookReceiver HTTP server
+        receiver = statusio.WebhookReceiver(self._cache, token='s3cret')
+        port = receiver.Start('127.0.0.1', 0)
+        try:
+            url = 'http://127.0.0.1:%d/%s' % (port, STATUSPAGE_ID)
+            body = json.dumps(INCIDENT).encode('utf-8')
+            self.assertRaises(HTTPError, urlopen, Request(url, body))
+            self.assertRaises(HTTPError, urlopen,
+                              Request(url + '?token=s3cret', b'nope'))
+            urlopen(Request(url + '?token=s3cret', body)).read()
+        finally:
+            receiver.Stop()
+        self.assertEqual(len(self._events), 1)
+        self.assertEqual(
+            self._cache.ComponentStatus(STATUSPAGE_ID, COMPONENT, CONTAINER),
+            300)